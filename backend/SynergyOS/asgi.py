@@ -3,6 +3,10 @@ ASGI config for SynergyOS project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The regular API is served by the WSGI app (SynergyOS/wsgi.py); this app
+runs as its own service for the long-lived /api/events/ stream (see
+realtime/asgi.py), where an idle connection costs no thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +17,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SynergyOS.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from realtime.asgi import route_events  # noqa: E402 (needs the app registry)
+
+application = route_events(django_application)
@@ -3,6 +3,7 @@ Celery configuration for SynergyOS
 """
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 # Set default Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SynergyOS.settings')
@@ -35,6 +36,11 @@ app.conf.beat_schedule = {
         'task': 'notifications.tasks.clean_old_notifications',
         'schedule': 604800.0,  # Every week
     },
+    'reconcile-unread-counters': {
+        'task': 'notifications.tasks.reconcile_unread_counters',
+        'schedule': 900.0,  # Every 15 minutes
+        'options': {'expires': 900}
+    },
     'send-daily-digest': {
         'task': 'notifications.tasks.send_daily_digest',
         'schedule': 86400.0,  # Every day
@@ -50,6 +56,31 @@ app.conf.beat_schedule = {
         'schedule': 2592000.0,  # Every 30 days
         'options': {'expires': 3600}
     },
+    'flush-project-activity': {
+        'task': 'projects.tasks.flush_project_activity',
+        'schedule': 30.0,  # Every 30 seconds
+        'options': {'expires': 30}
+    },
+    'reconcile-daily-rollups': {
+        'task': 'projects.tasks.reconcile_daily_rollups',
+        'schedule': crontab(hour=3, minute=0),  # Nightly at 3 AM
+        'options': {'expires': 3600}
+    },
+    'snapshot-active-sprints': {
+        'task': 'projects.tasks.snapshot_active_sprints',
+        'schedule': crontab(hour=0, minute=5),  # Start of every day
+        'options': {'expires': 3600}
+    },
+    'materialize-recurring-tasks': {
+        'task': 'projects.tasks.materialize_recurring_tasks',
+        'schedule': 900.0,  # Every 15 minutes
+        'options': {'expires': 900}
+    },
+    'mark-missed-milestones': {
+        'task': 'projects.tasks.mark_missed_milestones',
+        'schedule': crontab(hour=0, minute=10),  # Start of every day
+        'options': {'expires': 3600}
+    },
 }
 
 
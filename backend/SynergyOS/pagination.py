@@ -0,0 +1,154 @@
+"""
+Keyset (cursor) pagination for SynergyOS list endpoints.
+
+Pages are selected with a WHERE clause on ``(created_at, id)`` instead of an
+OFFSET, so fetching any page costs the same no matter how deep it is. Each
+paginated table has a matching composite index.
+
+Pagination is opt-in: a request without ``cursor`` or ``page_size`` gets
+the bare, unpaginated list the endpoint has always returned, in its usual
+order, so existing clients keep working until they move to pages.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a composite ``(created_at, id)`` key.
+
+    Used when the request passes ``cursor`` or ``page_size``; responses then
+    have the shape ``{"next": url, "previous": url, "results": [...]}`` and
+    run newest first, whatever the unpaginated order (messages, for one,
+    are listed oldest first without pagination). Follow ``next`` for
+    older rows.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.requested(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+
+        position, reverse = self.decode_cursor(request)
+        ordering = self._invert(self.ordering) if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(position, ordering))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        self.page = results[:page_size]
+        if reverse:
+            self.page.reverse()
+
+        # When walking backwards, an extra row means there is an earlier page
+        if reverse:
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def requested(self, request):
+        """Whether the client asked for pages"""
+        return any(
+            param in request.query_params for param in (self.cursor_query_param, self.page_size_query_param)
+        )
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, item, reverse):
+        """Build a page URL positioned at ``item``"""
+        time_field, key_field = self._fields(self.ordering)
+        payload = {
+            'p': [getattr(item, time_field).isoformat(), str(getattr(item, key_field))],
+            'r': int(reverse),
+        }
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """Return ``((created_at, id), reverse)`` or ``(None, False)`` for the first page"""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('ascii'))
+            timestamp, key = payload['p']
+            created_at = parse_datetime(timestamp)
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (created_at, key), reverse
+
+    @staticmethod
+    def _fields(ordering):
+        return tuple(field.lstrip('-') for field in ordering)
+
+    @staticmethod
+    def _invert(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    def _after(self, position, ordering):
+        """Rows strictly past ``position`` in ``ordering``"""
+        time_field, key_field = self._fields(ordering)
+        lookup = 'lt' if ordering[0].startswith('-') else 'gt'
+        created_at, key = position
+        return (
+            Q(**{f'{time_field}__{lookup}': created_at}) |
+            Q(**{time_field: created_at, f'{key_field}__{lookup}': key})
+        )
@@ -57,6 +57,8 @@ INSTALLED_APPS = [
     'webhooks',
     'notifications',
     'reports',
+    'search',
+    'realtime',
 ]
 
 MIDDLEWARE = [
@@ -298,6 +300,16 @@ CACHES = {
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
 
+# Project activity log (projects/activity.py): 'sync' inserts inside the request
+# transaction (default), 'redis' writes behind through a queue shared across
+# processes, 'buffer' writes behind from an in-process queue and loses whatever
+# is still queued when a worker is killed or recycled (opt-in)
+PROJECT_ACTIVITY_LOG = {
+    'MODE': config('PROJECT_ACTIVITY_LOG_MODE', default='sync'),
+    'BATCH_SIZE': config('PROJECT_ACTIVITY_BATCH_SIZE', default=100, cast=int),
+    'FLUSH_INTERVAL': config('PROJECT_ACTIVITY_FLUSH_INTERVAL', default=2.0, cast=float),
+}
+
 # ============================================================================
 # Celery Configuration
 # ============================================================================
@@ -21,6 +21,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('accounts.urls')),
     path('api/reports/', include('reports.urls')),  # Move reports BEFORE generic api/ routes
+    path('api/search/', include('search.urls')),
     path('api/', include('projects.urls')),
     path('api/', include('webhooks.urls')),
     path('api/', include('notifications.urls')),
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SecurityEvent
+from .models import DashboardInsights, SecurityEvent
 
 
 @admin.register(SecurityEvent)
@@ -8,3 +8,10 @@ class SecurityEventAdmin(admin.ModelAdmin):
 	list_filter = ("event_type", "created_at")
 	search_fields = ("username", "description", "ip_address")
 	readonly_fields = ("event_type", "user", "username", "ip_address", "description", "metadata", "created_at")
+
+
+@admin.register(DashboardInsights)
+class DashboardInsightsAdmin(admin.ModelAdmin):
+	list_display = ("user", "generated_at")
+	search_fields = ("user__username",)
+	readonly_fields = ("user", "insights", "source_stats", "generated_at")
@@ -0,0 +1,133 @@
+"""
+Dashboard stats and the AI insights generated from them.
+
+Insights come from a Gemini round-trip, so they are never generated on
+the request path. ``refresh_dashboard_insights`` (accounts/tasks.py)
+generates them in the background and stores them per user in
+DashboardInsights together with the stats they were based on.
+
+On each dashboard read ``dashboard_insights(user, stats)`` returns the
+stored insights at once and queues a refresh when they are missing,
+older than INSIGHTS_MAX_AGE, or were generated from stats that differ
+materially from the current ones (see ``changed_materially``). Refreshes
+are deduplicated per user with a short cache lock.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+# Stats sent to the model; only changes to these make insights stale
+INSIGHT_INPUTS = ('total_projects', 'active_projects', 'completed_tasks_week', 'overdue_tasks', 'team_members')
+INSIGHT_FIELDS = (
+    'productivity_score', 'trend', 'key_insights', 'predictions', 'automation_suggestions', 'focus_areas'
+)
+
+INSIGHTS_MAX_AGE = timedelta(hours=24)
+# A stat has changed materially when it moved by more than this share of its old value
+MATERIAL_CHANGE = 0.2
+REFRESH_LOCK_TIMEOUT = 60 * 5
+
+
+def _refresh_key(user_id):
+    return f'dashboard-insights:refresh:{user_id}'
+
+
+def dashboard_stats(user):
+    """Project and task figures for the user's dashboard, in three aggregate queries"""
+    from projects.access import accessible_project_ids
+    from projects.models import Project, Task
+
+    project_ids = accessible_project_ids(user)
+    projects = Project.objects.filter(pk__in=project_ids).aggregate(
+        active=Count('id', filter=Q(status='active'))
+    )
+
+    now = timezone.now()
+    tasks = Task.objects.filter(project_id__in=project_ids).aggregate(
+        active=Count('id', filter=~Q(status='done')),
+        completed=Count('id', filter=Q(status='done')),
+        completed_week=Count('id', filter=Q(status='done', completed_at__gte=now - timedelta(days=7))),
+        overdue=Count('id', filter=Q(due_date__lt=now.date(), status__in=['todo', 'in_progress'])),
+    )
+
+    team_members = Project.team_members.through.objects.filter(project_id__in=project_ids).count()
+
+    return {
+        'total_projects': len(project_ids),
+        'active_projects': projects['active'],
+        'active_tasks': tasks['active'],
+        'completed_tasks': tasks['completed'],
+        'completed_tasks_week': tasks['completed_week'],
+        'overdue_tasks': tasks['overdue'],
+        'team_members': team_members,
+    }
+
+
+def insight_inputs(stats):
+    return {field: stats[field] for field in INSIGHT_INPUTS}
+
+
+def changed_materially(before, after):
+    """Whether any insight input moved by more than MATERIAL_CHANGE of its old value"""
+    for field in INSIGHT_INPUTS:
+        if field not in before:
+            return True
+        if abs(after[field] - before[field]) > MATERIAL_CHANGE * before[field]:
+            return True
+    return False
+
+
+def request_refresh(user_id):
+    """Queue a refresh of the user's insights unless one is already pending"""
+    if not cache.add(_refresh_key(user_id), 1, REFRESH_LOCK_TIMEOUT):
+        return False
+    from .tasks import refresh_dashboard_insights
+
+    transaction.on_commit(lambda: refresh_dashboard_insights.delay(user_id))
+    return True
+
+
+def refresh_finished(user_id):
+    cache.delete(_refresh_key(user_id))
+
+
+def refresh_pending(user_id):
+    return cache.get(_refresh_key(user_id)) is not None
+
+
+def dashboard_insights(user, stats):
+    """The ``ai_insights`` section of the dashboard: stored insights and their freshness"""
+    from ai_service import ai_service
+    from .models import DashboardInsights
+
+    stored = DashboardInsights.objects.filter(user=user).first()
+    insights = stored.insights if stored else {}
+    section = {
+        'enabled': ai_service.enabled,
+        'productivity_score': insights.get('productivity_score', 0),
+        'trend': insights.get('trend', 'stable'),
+        'key_insights': insights.get('key_insights', []),
+        'predictions': insights.get('predictions', []),
+        'automation_suggestions': insights.get('automation_suggestions', []),
+        'focus_areas': insights.get('focus_areas', []),
+        'generated_at': stored.generated_at if stored else None,
+        'stale': False,
+        'refreshing': False,
+    }
+    if not ai_service.enabled:
+        return section
+
+    section['stale'] = (
+        stored is None
+        or stored.generated_at < timezone.now() - INSIGHTS_MAX_AGE
+        or changed_materially(stored.source_stats, insight_inputs(stats))
+    )
+    if section['stale']:
+        request_refresh(user.pk)
+        section['refreshing'] = True
+    else:
+        section['refreshing'] = refresh_pending(user.pk)
+    return section
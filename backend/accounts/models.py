@@ -86,3 +86,19 @@ class SecurityEvent(models.Model):
 from django.db import models
 
 # Create your models here.
+
+
+class DashboardInsights(models.Model):
+    """AI dashboard insights for one user, generated in the background (see accounts/insights.py)"""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='dashboard_insights')
+    insights = models.JSONField(default=dict, blank=True)
+    source_stats = models.JSONField(default=dict, blank=True,
+                                    help_text="Dashboard stats the insights were generated from")
+    generated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'Dashboard insights'
+
+    def __str__(self):
+        return f"Dashboard insights for {self.user.username}"
@@ -0,0 +1,34 @@
+"""
+Celery tasks for the accounts app
+"""
+from celery import shared_task
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from realtime.events import publish_to_users
+
+from .insights import INSIGHT_FIELDS, dashboard_stats, insight_inputs, refresh_finished
+from .models import DashboardInsights
+
+
+@shared_task(name='accounts.tasks.refresh_dashboard_insights', soft_time_limit=120)
+def refresh_dashboard_insights(user_id):
+    """Generate a user's dashboard insights (Gemini call) and store them with their source stats"""
+    from ai_service import ai_service
+
+    try:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return
+
+        inputs = insight_inputs(dashboard_stats(user))
+        generated = ai_service.generate_insights(dict(inputs, avg_completion_time='N/A'))
+        insights = {field: generated[field] for field in INSIGHT_FIELDS if field in generated}
+
+        stored, _ = DashboardInsights.objects.update_or_create(
+            user=user,
+            defaults={'insights': insights, 'source_stats': inputs, 'generated_at': timezone.now()}
+        )
+        publish_to_users([user_id], 'dashboard.insights', {'generated_at': stored.generated_at})
+    finally:
+        refresh_finished(user_id)
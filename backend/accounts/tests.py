@@ -1,3 +1,101 @@
+import sys
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from projects.models import Project
+
+from .insights import changed_materially, dashboard_insights, dashboard_stats, refresh_pending, request_refresh
+from .models import DashboardInsights
+
+GENERATED = {'productivity_score': 80, 'trend': 'up', 'key_insights': ['Ship it'], 'model_notes': 'dropped'}
+
+
+class DashboardInsightsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner')
+        Project.objects.create(name='Apollo', owner=self.user)
+        # Never call Gemini from tests
+        self.ai = SimpleNamespace(enabled=True, generate_insights=mock.Mock(return_value=GENERATED))
+        patcher = mock.patch.dict(sys.modules, {'ai_service': SimpleNamespace(ai_service=self.ai)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def insights(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return dashboard_insights(self.user, dashboard_stats(self.user))
+
+    def test_changed_materially(self):
+        before = {'total_projects': 10, 'active_projects': 5, 'completed_tasks_week': 0, 'overdue_tasks': 4,
+                  'team_members': 3}
+        self.assertFalse(changed_materially(before, dict(before, total_projects=12)))
+        self.assertTrue(changed_materially(before, dict(before, total_projects=13)))
+        self.assertTrue(changed_materially(before, dict(before, completed_tasks_week=1)))
+        self.assertTrue(changed_materially({}, before))
+
+    def test_missing_insights_are_generated_in_the_background(self):
+        section = self.insights()
+
+        self.assertEqual((section['stale'], section['refreshing'], section['key_insights']), (True, True, []))
+        stored = DashboardInsights.objects.get(user=self.user)
+        self.assertEqual(stored.insights, {'productivity_score': 80, 'trend': 'up', 'key_insights': ['Ship it']})
+        self.assertEqual(stored.source_stats['total_projects'], 1)
+        self.assertFalse(refresh_pending(self.user.pk))
+
+        section = self.insights()
+        self.assertEqual(
+            (section['stale'], section['refreshing'], section['key_insights']), (False, False, ['Ship it'])
+        )
+        self.assertEqual(self.ai.generate_insights.call_count, 1)
+
+    def test_material_changes_and_age_trigger_a_refresh(self):
+        self.insights()
+
+        Project.objects.create(name='Gemini', owner=self.user)
+        self.assertTrue(self.insights()['stale'])
+        self.assertEqual(self.ai.generate_insights.call_count, 2)
+
+        DashboardInsights.objects.update(generated_at=timezone.now() - timedelta(hours=25))
+        self.assertTrue(self.insights()['stale'])
+        self.assertEqual(self.ai.generate_insights.call_count, 3)
+
+    def test_refreshes_are_deduplicated(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(request_refresh(self.user.pk))
+            self.assertFalse(request_refresh(self.user.pk))
+            section = dashboard_insights(self.user, dashboard_stats(self.user))
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertTrue(section['refreshing'])
+        self.assertTrue(refresh_pending(self.user.pk))
+
+    def test_disabled_ai_never_refreshes(self):
+        self.ai.enabled = False
+
+        section = self.insights()
+
+        self.assertEqual((section['enabled'], section['stale'], section['refreshing']), (False, False, False))
+        self.assertFalse(DashboardInsights.objects.exists())
+        self.ai.generate_insights.assert_not_called()
+
+    def test_dashboard_shows_new_insights_despite_response_cache(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = client.get(reverse('dashboard'))
+        self.assertEqual(first.json()['ai_insights']['key_insights'], [])
 
-# Create your tests here.
+        second = client.get(reverse('dashboard'))
+        self.assertEqual(second['X-Cache'], 'MISS')
+        self.assertEqual(second.json()['ai_insights']['key_insights'], ['Ship it'])
+        self.assertEqual(client.get(reverse('dashboard'))['X-Cache'], 'HIT')
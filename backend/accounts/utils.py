@@ -162,8 +162,7 @@ def create_invited_user(email, first_name, last_name, role, department, position
             profile.save()
             
             # Add user to project team if not already added
-            if user not in project.team_members.all():
-                project.team_members.add(user)
+            project.add_member(user)
             
             return user, password, custom_email
         else:
@@ -204,7 +203,7 @@ def create_invited_user(email, first_name, last_name, role, department, position
             profile.save()
             
             # Add user to project team
-            project.team_members.add(user)
+            project.add_member(user)
             
             return user, password, custom_email
         
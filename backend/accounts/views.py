@@ -20,11 +20,13 @@ from django.utils.decorators import method_decorator
 from django_ratelimit.exceptions import Ratelimited
 from datetime import timedelta
 import random
+from projects.response_cache import cache_response, user_projects
 from .serializers import (
     RegisterSerializer, UserSerializer, SecurityEventSerializer,
     UserProfileSerializer, TeamMemberInvitationSerializer, UserDetailSerializer
 )
-from .models import SecurityEvent, UserProfile
+from .insights import dashboard_insights, dashboard_stats, refresh_pending
+from .models import DashboardInsights, SecurityEvent, UserProfile
 from .utils import create_invited_user, send_invitation_email
 from rest_framework import generics
 
@@ -273,59 +275,27 @@ class ChangePasswordView(APIView):
         )
 
 
+def _dashboard_vary(request):
+    """What the dashboard shows beyond project data: echoed user fields and the insights state"""
+    user = request.user
+    generated_at = DashboardInsights.objects.filter(user=user).values_list('generated_at', flat=True).first()
+    return [
+        user.username, user.email, user.first_name, user.last_name, user.last_login,
+        generated_at, refresh_pending(user.pk),
+    ]
+
+
 class DashboardStatsView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @cache_response(projects=user_projects, vary_on=_dashboard_vary)
     def get(self, request):
-        from projects.models import Project, Task
-        from datetime import datetime, timedelta, timezone
-        from ai_service import ai_service
-        
         user = request.user
         
-        # Get real project and task statistics
-        projects = Project.objects.filter(
-            models.Q(owner=user) | models.Q(team_members=user)
-        ).distinct()
-        
-        total_projects = projects.count()
-        active_projects = projects.filter(status='active').count()
-        
-        # Get tasks
-        all_tasks = Task.objects.filter(project__in=projects)
-        active_tasks = all_tasks.exclude(status='completed').count()
-        completed_tasks = all_tasks.filter(status='completed').count()
-        
-        # Recent tasks (this week)
-        week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-        completed_tasks_week = all_tasks.filter(
-            status='completed',
-            updated_at__gte=week_ago
-        ).count()
-        
-        # Overdue tasks
-        now = datetime.now(timezone.utc)
-        overdue_tasks = all_tasks.filter(
-            due_date__lt=now.date(),
-            status__in=['todo', 'in_progress']
-        ).count()
-        
-        # Team members count
-        team_members_count = 0
-        for project in projects:
-            team_members_count += project.team_members.count()
-        
-        # Generate AI insights
-        user_data = {
-            'total_projects': total_projects,
-            'active_projects': active_projects,
-            'completed_tasks_week': completed_tasks_week,
-            'overdue_tasks': overdue_tasks,
-            'team_members': team_members_count,
-            'avg_completion_time': 'N/A'
-        }
-        
-        ai_insights_data = ai_service.generate_insights(user_data) if ai_service.enabled else {}
+        # Aggregate queries only; AI insights are read from their stored copy
+        # and refreshed in the background (see accounts/insights.py)
+        dashboard = dashboard_stats(user)
+        ai_insights = dashboard_insights(user, dashboard)
         
         stats = {
             'user': {
@@ -336,22 +306,14 @@ class DashboardStatsView(APIView):
                 'member_since': user.date_joined,
             },
             'stats': {
-                'total_projects': total_projects,
-                'active_tasks': active_tasks,
-                'completed_tasks': completed_tasks,
-                'team_members': team_members_count,
-                'overdue_tasks': overdue_tasks,
+                'total_projects': dashboard['total_projects'],
+                'active_tasks': dashboard['active_tasks'],
+                'completed_tasks': dashboard['completed_tasks'],
+                'team_members': dashboard['team_members'],
+                'overdue_tasks': dashboard['overdue_tasks'],
             },
             'recent_activity': [],  # Could be populated from ProjectActivity
-            'ai_insights': {
-                'enabled': ai_service.enabled,
-                'productivity_score': ai_insights_data.get('productivity_score', 0),
-                'trend': ai_insights_data.get('trend', 'stable'),
-                'key_insights': ai_insights_data.get('key_insights', []),
-                'predictions': ai_insights_data.get('predictions', []),
-                'automation_suggestions': ai_insights_data.get('automation_suggestions', []),
-                'focus_areas': ai_insights_data.get('focus_areas', []),
-            },
+            'ai_insights': ai_insights,
             'security': {
                 'mfa_enabled': False,
                 'last_login': user.last_login,
@@ -736,8 +698,8 @@ class RemoveTeamMemberView(APIView):
             )
         
         # Remove user from project
-        if user_to_remove in project.team_members.all():
-            project.team_members.remove(user_to_remove)
+        if project.team_members.filter(pk=user_to_remove.pk).exists():
+            project.remove_member(user_to_remove)
             
             # Log removal event
             try:
@@ -787,19 +749,14 @@ class TeamMemberListView(generics.ListAPIView):
         if hasattr(user, 'profile') and user.profile.role in ['manager', 'admin']:
             return User.objects.all().select_related('profile').distinct()
         
-        # Get all projects where user is owner or team member
-        from projects.models import Project
-        user_projects = Project.objects.filter(
-            models.Q(owner=user) | models.Q(team_members=user)
-        ).distinct()
-        
-        # Get all team members from these projects
-        team_member_ids = set()
-        for project in user_projects:
-            team_member_ids.update(project.team_members.values_list('id', flat=True))
-            team_member_ids.add(project.owner.id)
+        # Owners and team members of every project the user can access
+        from projects.access import accessible_project_ids
+        from projects.models import ProjectMembership
+        team_member_ids = ProjectMembership.objects.filter(
+            project_id__in=accessible_project_ids(user)
+        ).values('user_id')
         
-        return User.objects.filter(id__in=team_member_ids).select_related('profile').distinct()
+        return User.objects.filter(id__in=team_member_ids).select_related('profile')
 
 
 @method_decorator(ratelimit(key='ip', rate='3/5m', method='POST', block=True), name='dispatch')
@@ -48,7 +48,7 @@ class Notification(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['recipient', '-created_at']),
+            models.Index(fields=['recipient', '-created_at', '-id']),
             models.Index(fields=['recipient', 'read']),
         ]
     
@@ -60,6 +60,11 @@ class Notification(models.Model):
             self.read = True
             self.read_at = timezone.now()
             self.save(update_fields=['read', 'read_at'])
+            
+            from realtime.events import publish_to_users
+            from .unread import NOTIFICATIONS, adjust
+            adjust(NOTIFICATIONS, {self.recipient_id: -1})
+            publish_to_users([self.recipient_id], 'notification.read', {'id': self.id})
 
 
 class NotificationPreference(models.Model):
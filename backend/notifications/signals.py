@@ -3,7 +3,7 @@ from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from projects.models import Task, Project, ProjectMessage, Comment
 from .models import Notification, NotificationPreference, NotificationType
-from .utils import create_notification
+from .utils import create_notification, task_update_notifications
 
 User = get_user_model()
 
@@ -52,22 +52,8 @@ def handle_task_notifications(sender, instance, created, **kwargs):
                     }
                 )
     else:
-        # TODO: Implement change tracking for task updates
-        # For now, only handle task completion
-        if instance.status == 'done':
-            # Notify project owner
-            if instance.project.owner:
-                create_notification(
-                    recipient=instance.project.owner,
-                    notification_type=NotificationType.TASK_COMPLETED,
-                    title='Task Completed',
-                    message=f'Task "{instance.title}" was completed',
-                    action_url=f'/tasks/{instance.id}',
-                    metadata={
-                        'task_id': instance.id,
-                        'project_id': instance.project.id,
-                    }
-                )
+        for entry in task_update_notifications(instance, instance.tracker.changed_fields()):
+            create_notification(**entry)
 
 
 # Project-related notifications
@@ -110,25 +96,25 @@ def handle_project_notifications(sender, instance, created, **kwargs):
 def handle_message_notifications(sender, instance, created, **kwargs):
     """Generate notifications for mentions in messages"""
     
-    if created and instance.content:
+    if created and instance.message:
         # Look for @mentions in the message content
         import re
-        mentions = re.findall(r'@(\w+)', instance.content)
+        mentions = re.findall(r'@(\w+)', instance.message)
         
         for username in mentions:
             try:
                 mentioned_user = User.objects.get(username=username)
-                if mentioned_user != instance.user:
+                if mentioned_user != instance.sender:
                     create_notification(
                         recipient=mentioned_user,
                         notification_type=NotificationType.MENTION,
                         title='You Were Mentioned',
-                        message=f'{instance.user.username} mentioned you in {instance.project.name}',
+                        message=f'{instance.sender.username} mentioned you in {instance.project.name}',
                         action_url=f'/projects/{instance.project.id}',
                         metadata={
                             'message_id': instance.id,
                             'project_id': instance.project.id,
-                            'mentioned_by': instance.user.username,
+                            'mentioned_by': instance.sender.username,
                         }
                     )
             except User.DoesNotExist:
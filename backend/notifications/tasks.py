@@ -182,3 +182,19 @@ def send_daily_digest():
             pass
     
     return f"Sent daily digest to {users_with_digest.count()} users"
+
+
+@shared_task
+def reconcile_unread_counters():
+    """Rewrite the Redis unread counters from the database to correct drift"""
+    from django.contrib.auth import get_user_model
+    from projects.read_cursors import message_counts
+    from .unread import MESSAGES, NOTIFICATIONS, notification_counts, reconcile
+    
+    User = get_user_model()
+    user_ids = list(User.objects.filter(is_active=True).values_list('id', flat=True))
+    
+    reconcile(NOTIFICATIONS, notification_counts(), user_ids)
+    reconcile(MESSAGES, message_counts(), user_ids)
+    
+    return f"Reconciled unread counters for {len(user_ids)} users"
@@ -0,0 +1,120 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Notification, NotificationType
+from .tasks import reconcile_unread_counters
+from .unread import NOTIFICATIONS, adjust, counter_key, forget
+from .utils import create_notification, create_notifications
+
+
+class UnreadCounterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def notify(self, recipient=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_notification(
+                recipient or self.user, NotificationType.TASK_ASSIGNED, 'Task Assigned', 'You were assigned'
+            )
+
+    def unread(self):
+        response = self.client.get(reverse('notification-unread-count'))
+        self.assertEqual(response.status_code, 200)
+        return response.json()['count']
+
+    def cached(self):
+        return cache.get(counter_key(NOTIFICATIONS, self.user.pk))
+
+    def test_counter_is_loaded_on_first_read(self):
+        Notification.objects.create(recipient=self.user, notification_type=NotificationType.MENTION, title='Hi')
+        self.assertIsNone(self.cached())
+
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(self.cached(), 1)
+        # Answered from the counter from now on
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread(), 1)
+
+    def test_writes_adjust_a_loaded_counter(self):
+        self.assertEqual(self.unread(), 0)
+        first, second, third = self.notify(), self.notify(), self.notify()
+        self.assertEqual(self.cached(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('notification-mark-read', args=[first.pk]))
+        self.assertEqual(self.cached(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('notification-detail', args=[second.pk]), {'read': True}, format='json')
+        self.assertEqual(self.cached(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('notification-detail', args=[second.pk]), {'read': False}, format='json')
+        self.assertEqual(self.cached(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('notification-detail', args=[third.pk]))
+            self.client.delete(reverse('notification-detail', args=[first.pk]))
+        self.assertEqual(self.unread(), 1)
+
+    def test_bulk_creation_counts_each_recipient(self):
+        other = User.objects.create_user(username='other')
+        self.assertEqual(self.unread(), 0)
+        entry = {'notification_type': NotificationType.MENTION, 'title': 'Mention', 'message': 'Hi'}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_notifications([{**entry, 'recipient': self.user}] * 2 + [{**entry, 'recipient': other}])
+
+        self.assertEqual(self.cached(), 2)
+        # Not loaded yet, so left for the next read
+        self.assertIsNone(cache.get(counter_key(NOTIFICATIONS, other.pk)))
+
+    def test_mark_all_read_resets_the_counter(self):
+        self.notify()
+        self.notify()
+        self.assertEqual(self.unread(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('notification-mark-all-read'))
+
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(self.cached(), 0)
+        self.assertEqual(self.unread(), 0)
+
+    def test_counter_never_goes_below_zero(self):
+        self.assertEqual(self.unread(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust(NOTIFICATIONS, {self.user.pk: -3})
+        self.assertEqual(self.unread(), 0)
+
+        self.notify()
+        self.assertEqual(self.unread(), 1)
+
+    def test_forget_reloads_from_the_database(self):
+        self.assertEqual(self.unread(), 0)
+        Notification.objects.create(recipient=self.user, notification_type=NotificationType.MENTION, title='Hi')
+        self.assertEqual(self.unread(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            forget(NOTIFICATIONS, [self.user.pk])
+
+        self.assertEqual(self.unread(), 1)
+
+    def test_reconcile_repairs_drift(self):
+        other = User.objects.create_user(username='other')
+        self.notify()
+        self.notify(other)
+        cache.set(counter_key(NOTIFICATIONS, self.user.pk), 7, timeout=None)
+        cache.set(counter_key(NOTIFICATIONS, other.pk), 0, timeout=None)
+
+        self.assertEqual(reconcile_unread_counters(), 'Reconciled unread counters for 2 users')
+
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(cache.get(counter_key(NOTIFICATIONS, other.pk)), 1)
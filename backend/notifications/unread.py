@@ -0,0 +1,141 @@
+"""
+Unread counters kept in Redis.
+
+The unread badges the frontend polls (``NotificationViewSet.unread_count``
+and ``ProjectMessageViewSet.unread``) read one counter per user and kind
+instead of counting rows:
+
+    unread:notifications:<user id>
+    unread:messages:<user id>
+
+A counter is loaded from the database the first time it is read and kept
+without expiry. From then on writers adjust it atomically, after their
+transaction commits:
+
+    adjust(kind, {user_id: delta})   creation (+) and marking read (-)
+    reset(kind, user_id)             mark all read
+    forget(kind, user_ids)           the set being counted changed; reload on next read
+
+Adjustments only touch counters that exist (a missing one is reloaded with
+the right value anyway) and never take a counter below zero. Races between
+a reload and a concurrent adjustment can still leave a counter off by a
+few, so the ``reconcile_unread_counters`` job periodically rewrites every
+counter from the database.
+
+With the django_redis cache all adjustments for one write are a single
+script call; other cache backends (local development) fall back to
+``cache.incr``.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+NOTIFICATIONS = 'notifications'
+MESSAGES = 'messages'
+
+RECONCILE_BATCH_SIZE = 1000
+
+# KEYS are counters, ARGV[i] the delta for KEYS[i]; missing counters are skipped
+_ADJUST_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        if redis.call('INCRBY', key, ARGV[i]) < 0 then
+            redis.call('SET', key, 0)
+        end
+    end
+end
+"""
+
+
+def counter_key(kind, user_id):
+    return f'unread:{kind}:{user_id}'
+
+
+def _redis():
+    """Raw client behind the default cache, or None when it is not django_redis"""
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        return None
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        return None
+
+
+def unread_count(kind, user, load):
+    """Counter for ``user``; ``load()`` counts from the database when it is not cached"""
+    key = counter_key(kind, user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = load()
+        cache.add(key, count, timeout=None)
+    return max(count, 0)
+
+
+def _apply(kind, deltas):
+    redis = _redis()
+    if redis is not None:
+        user_ids = list(deltas)
+        keys = [cache.make_key(counter_key(kind, user_id)) for user_id in user_ids]
+        redis.eval(_ADJUST_SCRIPT, len(keys), *keys, *[deltas[user_id] for user_id in user_ids])
+        return
+
+    for user_id, delta in deltas.items():
+        key = counter_key(kind, user_id)
+        try:
+            if cache.incr(key, delta) < 0:
+                cache.set(key, 0, timeout=None)
+        except ValueError:
+            pass  # Not loaded yet
+
+
+def adjust(kind, deltas):
+    """Add ``deltas`` ({user id: change}) to loaded counters once the transaction commits"""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if user_id and delta}
+    if deltas:
+        transaction.on_commit(lambda: _apply(kind, deltas))
+
+
+def reset(kind, user_id, count=0):
+    """Set a user's counter once the transaction commits"""
+    transaction.on_commit(lambda: cache.set(counter_key(kind, user_id), count, timeout=None))
+
+
+def forget(kind, user_ids):
+    """Drop counters so they are reloaded from the database, now and after commit"""
+    keys = [counter_key(kind, user_id) for user_id in set(user_ids)]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def reconcile(kind, counts, user_ids):
+    """Rewrite the counters of ``user_ids`` from ``counts`` ({user id: unread}, missing means 0)"""
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), RECONCILE_BATCH_SIZE):
+        cache.set_many(
+            {counter_key(kind, user_id): counts.get(user_id, 0) for user_id in user_ids[start:start + RECONCILE_BATCH_SIZE]},
+            timeout=None,
+        )
+    return len(user_ids)
+
+
+def notification_counts(user_ids=None):
+    """Unread notifications per user from the database (one grouped query)"""
+    from django.db.models import Count
+
+    from .models import Notification
+
+    notifications = Notification.objects.filter(read=False)
+    if user_ids is not None:
+        notifications = notifications.filter(recipient_id__in=user_ids)
+    return dict(
+        notifications.order_by().values_list('recipient_id').annotate(unread=Count('id'))
+    )
+
+
+def unread_notification_count(user):
+    """Unread notifications of ``user``, answered from the counter"""
+    return unread_count(NOTIFICATIONS, user, lambda: notification_counts([user.pk]).get(user.pk, 0))
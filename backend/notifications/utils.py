@@ -1,4 +1,9 @@
+from collections import Counter
+
+from realtime.events import publish_to_users
+
 from .models import Notification, NotificationPreference, NotificationType
+from .unread import NOTIFICATIONS, adjust
 from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
@@ -40,6 +45,8 @@ def create_notification(recipient, notification_type, title, message, action_url
         action_url=action_url,
         metadata=metadata or {}
     )
+    adjust(NOTIFICATIONS, {recipient.pk: 1})
+    _publish([notification])
     
     # Check if email should be sent
     email_enabled = _check_email_enabled(prefs, notification_type)
@@ -49,6 +56,123 @@ def create_notification(recipient, notification_type, title, message, action_url
     return notification
 
 
+def create_notifications(entries):
+    """
+    Create many notifications at once, honouring each recipient's preferences
+    
+    Args:
+        entries: List of dicts with create_notification() keyword arguments
+    
+    Returns:
+        List of created Notification objects
+    """
+    recipients = {entry['recipient'].pk: entry['recipient'] for entry in entries}
+    if not recipients:
+        return []
+    
+    prefs = {
+        pref.user_id: pref
+        for pref in NotificationPreference.objects.filter(user_id__in=recipients)
+    }
+    missing = [NotificationPreference(user_id=user_id) for user_id in recipients if user_id not in prefs]
+    if missing:
+        NotificationPreference.objects.bulk_create(missing, ignore_conflicts=True)
+        prefs.update((pref.user_id, pref) for pref in missing)
+    
+    notifications = [
+        Notification(
+            recipient=entry['recipient'],
+            notification_type=entry['notification_type'],
+            title=entry['title'],
+            message=entry['message'],
+            action_url=entry.get('action_url'),
+            metadata=entry.get('metadata') or {}
+        )
+        for entry in entries
+        if _check_notification_enabled(prefs[entry['recipient'].pk], entry['notification_type'])
+    ]
+    Notification.objects.bulk_create(notifications)
+    adjust(NOTIFICATIONS, Counter(notification.recipient_id for notification in notifications))
+    _publish(notifications)
+    
+    for notification in notifications:
+        recipient = notification.recipient
+        if recipient.email and _check_email_enabled(prefs[recipient.pk], notification.notification_type):
+            _send_notification_email(recipient, notification)
+    
+    return notifications
+
+
+def task_update_notifications(task, changed):
+    """
+    Notifications for an update to ``task`` that changed the ``changed`` fields
+    
+    Returns a list of create_notification() keyword arguments.
+    """
+    entries = []
+    
+    # Notify a newly assigned user
+    if 'assigned_to' in changed and task.assigned_to:
+        entries.append({
+            'recipient': task.assigned_to,
+            'notification_type': NotificationType.TASK_ASSIGNED,
+            'title': 'Task Assigned',
+            'message': f'You were assigned to task "{task.title}"',
+            'action_url': f'/tasks/{task.id}',
+            'metadata': {
+                'task_id': task.id,
+                'project_id': task.project_id,
+                'task_title': task.title,
+            }
+        })
+    
+    if 'status' in changed:
+        if task.status == 'done':
+            # Notify project owner
+            if task.project.owner:
+                entries.append({
+                    'recipient': task.project.owner,
+                    'notification_type': NotificationType.TASK_COMPLETED,
+                    'title': 'Task Completed',
+                    'message': f'Task "{task.title}" was completed',
+                    'action_url': f'/tasks/{task.id}',
+                    'metadata': {
+                        'task_id': task.id,
+                        'project_id': task.project_id,
+                    }
+                })
+        elif task.assigned_to and 'assigned_to' not in changed:
+            # Let the assignee know their task moved
+            entries.append({
+                'recipient': task.assigned_to,
+                'notification_type': NotificationType.TASK_UPDATED,
+                'title': 'Task Updated',
+                'message': f'Task "{task.title}" moved to {task.get_status_display()}',
+                'action_url': f'/tasks/{task.id}',
+                'metadata': {
+                    'task_id': task.id,
+                    'project_id': task.project_id,
+                    'previous_status': task.tracker.previous('status'),
+                    'status': task.status,
+                }
+            })
+    
+    return entries
+
+
+def _publish(notifications):
+    """Push new notifications to their recipients' event streams"""
+    for notification in notifications:
+        publish_to_users([notification.recipient_id], 'notification.created', {
+            'id': notification.id,
+            'notification_type': notification.notification_type,
+            'title': notification.title,
+            'message': notification.message,
+            'action_url': notification.action_url,
+            'created_at': notification.created_at,
+        })
+
+
 def _check_notification_enabled(prefs, notification_type):
     """Check if in-app notification is enabled for this type"""
     mapping = {
@@ -122,4 +246,9 @@ def bulk_create_notifications(notifications_data):
         Notification(**data)
         for data in notifications_data
     ]
-    return Notification.objects.bulk_create(notifications)
+    Notification.objects.bulk_create(notifications)
+    adjust(NOTIFICATIONS, Counter(
+        notification.recipient_id for notification in notifications if not notification.read
+    ))
+    _publish(notifications)
+    return notifications
@@ -3,13 +3,17 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
+from SynergyOS.pagination import KeysetPagination
+from realtime.events import publish_to_users
 from .models import Notification, NotificationPreference
 from .serializers import NotificationSerializer, NotificationPreferenceSerializer
+from .unread import NOTIFICATIONS, adjust, reset, unread_notification_count
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         user = self.request.user
@@ -30,6 +34,17 @@ class NotificationViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def perform_update(self, serializer):
+        was_read = serializer.instance.read
+        notification = serializer.save()
+        if notification.read != was_read:
+            adjust(NOTIFICATIONS, {notification.recipient_id: -1 if notification.read else 1})
+    
+    def perform_destroy(self, instance):
+        if not instance.read:
+            adjust(NOTIFICATIONS, {instance.recipient_id: -1})
+        instance.delete()
+    
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
         """Mark all notifications as read for the current user"""
@@ -37,6 +52,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
             recipient=request.user,
             read=False
         ).update(read=True)
+        reset(NOTIFICATIONS, request.user.pk)
+        publish_to_users([request.user.pk], 'notifications.read_all', {})
         
         return Response({
             'message': f'Marked {updated} notifications as read',
@@ -56,13 +73,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        """Get count of unread notifications"""
-        count = Notification.objects.filter(
-            recipient=request.user,
-            read=False
-        ).count()
-        
-        return Response({'count': count})
+        """Get count of unread notifications (from the Redis counter, see notifications/unread.py)"""
+        return Response({'count': unread_notification_count(request.user)})
     
     @action(detail=False, methods=['delete'])
     def delete_all_read(self, request):
@@ -0,0 +1,75 @@
+"""
+Project access lookups backed by the ProjectMembership index.
+
+``accessible_project_ids(user)`` returns the set of project ids a user owns or
+is a team member of. The set is read from a single indexed query on
+ProjectMembership and cached per user, so list endpoints can filter with
+``project_id__in=...`` instead of joining owner/team_members and calling
+``distinct()``.
+
+The cache entry is dropped by ``invalidate_project_access`` whenever a
+membership row for the user is written (see projects/signals.py), together
+with the user's unread message counter and team dashboard snapshot, which
+cover the same projects, and the user's open event streams are told to
+follow the new set.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+from notifications.unread import MESSAGES, forget
+from realtime.events import publish_to_users
+
+from .team_dashboard import forget_sections
+
+ACCESS_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(user_id):
+    return f'project-access:{user_id}'
+
+
+def accessible_project_ids(user):
+    """Frozen set of ids of projects the user owns or is a member of"""
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    key = _cache_key(user.pk)
+    project_ids = cache.get(key)
+    if project_ids is None:
+        from .models import ProjectMembership
+
+        project_ids = frozenset(
+            ProjectMembership.objects.filter(user_id=user.pk).values_list('project_id', flat=True)
+        )
+        cache.set(key, project_ids, ACCESS_CACHE_TIMEOUT)
+    return project_ids
+
+
+def accessible_projects(user):
+    """Queryset of projects the user can access"""
+    from .models import Project
+
+    return Project.objects.filter(pk__in=accessible_project_ids(user))
+
+
+def has_project_access(user, project):
+    """Whether the user owns or is a member of ``project`` (instance or id)"""
+    project_id = getattr(project, 'pk', project)
+    return project_id in accessible_project_ids(user)
+
+
+def invalidate_project_access(user_ids):
+    """Drop cached access sets for the given users, now and after commit"""
+    user_ids = set(user_ids)
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    # A concurrent reader may re-cache the old set before this transaction
+    # commits, so clear it again once the new rows are visible.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+    forget(MESSAGES, user_ids)
+    forget_sections(user_ids)
+    # Open event streams follow the new set of projects
+    publish_to_users(user_ids, 'access.changed', {})
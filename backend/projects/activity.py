@@ -0,0 +1,189 @@
+"""
+Write-behind recorder for ProjectActivity.
+
+Views call ``record_activity`` (or ``record_activities`` for bulk paths)
+instead of ``ProjectActivity.objects.create``. In the queued modes events
+are queued once the surrounding transaction commits (and dropped if it
+rolls back), then written with ``bulk_create`` when the queue reaches
+``BATCH_SIZE`` or ``FLUSH_INTERVAL`` seconds after the first queued event,
+whichever is first.
+
+``settings.PROJECT_ACTIVITY_LOG['MODE']`` picks the queue:
+
+    'sync'    no queue: insert inside the caller's transaction, so an
+              event is stored exactly when its write is (default)
+    'redis'   shared Redis list, drained by any process and by the
+              periodic ``flush_project_activity`` task; events survive a
+              worker dying, not a Redis flush
+    'buffer'  in-process list, flushed by a timer thread in each worker
+              and at a clean exit. Opt-in only: events still queued when
+              a worker is killed or recycled (SIGKILL, OOM, gunicorn
+              max_requests) are lost without a trace
+"""
+import atexit
+import json
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils.dateparse import parse_datetime
+
+DEFAULTS = {
+    'MODE': 'sync',
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+}
+REDIS_QUEUE_KEY = 'project-activity:queue'
+
+
+def _config():
+    return {**DEFAULTS, **getattr(settings, 'PROJECT_ACTIVITY_LOG', {})}
+
+
+def _insert(activities):
+    """bulk_create, skipping events whose project or user was deleted meanwhile"""
+    from django.contrib.auth.models import User
+
+    from .models import Project, ProjectActivity
+
+    if not activities:
+        return 0
+    try:
+        with transaction.atomic():
+            ProjectActivity.objects.bulk_create(activities, batch_size=500)
+        return len(activities)
+    except IntegrityError:
+        project_ids = set(Project.objects.filter(
+            id__in={activity.project_id for activity in activities}
+        ).values_list('id', flat=True))
+        user_ids = set(User.objects.filter(
+            id__in={activity.user_id for activity in activities if activity.user_id}
+        ).values_list('id', flat=True))
+        activities = [
+            activity for activity in activities
+            if activity.project_id in project_ids and (activity.user_id is None or activity.user_id in user_ids)
+        ]
+        ProjectActivity.objects.bulk_create(activities, batch_size=500)
+        return len(activities)
+
+
+class ActivityRecorder:
+    """Queues activity events and writes them in batches"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+
+    def record(self, activities):
+        activities = [self._detach(activity) for activity in activities]
+        config = _config()
+        if config['MODE'] == 'sync':
+            _insert(activities)
+            return
+        # Runs immediately outside a transaction, after commit inside one
+        transaction.on_commit(lambda: self._enqueue(activities, config))
+
+    def _enqueue(self, activities, config):
+        if config['MODE'] == 'redis':
+            from django_redis import get_redis_connection
+
+            redis = get_redis_connection('default')
+            size = redis.rpush(REDIS_QUEUE_KEY, *[self._dumps(activity) for activity in activities])
+        else:
+            with self._lock:
+                self._pending.extend(activities)
+                size = len(self._pending)
+
+        if size >= config['BATCH_SIZE']:
+            self.flush()
+        else:
+            self._schedule(config['FLUSH_INTERVAL'])
+
+    def _schedule(self, interval):
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread has its own database connections
+            connections.close_all()
+
+    def flush(self, shared=True):
+        """Write every queued event now (``shared``: Redis queue too); returns the number written"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            activities, self._pending = self._pending, []
+
+        if shared and _config()['MODE'] == 'redis':
+            activities += self._drain_redis()
+        return _insert(activities)
+
+    def _drain_redis(self):
+        from django_redis import get_redis_connection
+
+        redis = get_redis_connection('default')
+        with redis.pipeline() as pipe:
+            pipe.lrange(REDIS_QUEUE_KEY, 0, -1)
+            pipe.delete(REDIS_QUEUE_KEY)
+            payloads, _ = pipe.execute()
+        return [self._loads(payload) for payload in payloads]
+
+    @staticmethod
+    def _detach(activity):
+        """Copy holding only ids, so queued events don't pin (or trip over) model instances"""
+        from .models import ProjectActivity
+
+        return ProjectActivity(**{
+            field.attname: getattr(activity, field.attname)
+            for field in ProjectActivity._meta.concrete_fields if not field.primary_key
+        })
+
+    @staticmethod
+    def _dumps(activity):
+        return json.dumps({
+            'project_id': activity.project_id,
+            'user_id': activity.user_id,
+            'action': activity.action,
+            'description': activity.description,
+            'metadata': activity.metadata,
+            'created_at': activity.created_at.isoformat(),
+        }, default=str)
+
+    @staticmethod
+    def _loads(payload):
+        from .models import ProjectActivity
+
+        data = json.loads(payload)
+        data['created_at'] = parse_datetime(data['created_at'])
+        return ProjectActivity(**data)
+
+
+recorder = ActivityRecorder()
+# Don't lose this process's buffer on shutdown; the Redis queue outlives it
+atexit.register(recorder.flush, shared=False)
+
+
+def record_activity(**fields):
+    """Queue one ProjectActivity (same keyword arguments as objects.create)"""
+    from .models import ProjectActivity
+
+    recorder.record([ProjectActivity(**fields)])
+
+
+def record_activities(activities):
+    """Queue unsaved ProjectActivity instances as one batch"""
+    recorder.record(list(activities))
+
+
+def flush_activity():
+    """Write queued activity immediately (e.g. before reading the feed in a test)"""
+    return recorder.flush()
@@ -50,7 +50,7 @@ class ProjectMessageAdmin(admin.ModelAdmin):
     list_display = ['sender', 'project', 'message_preview', 'created_at', 'is_edited']
     list_filter = ['project', 'created_at', 'is_edited']
     search_fields = ['message', 'sender__username']
-    filter_horizontal = ['mentions', 'read_by']
+    filter_horizontal = ['mentions']
     
     def message_preview(self, obj):
         return obj.message[:50] + '...' if len(obj.message) > 50 else obj.message
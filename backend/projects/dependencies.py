@@ -0,0 +1,213 @@
+"""
+Per-project task dependency graph.
+
+All ``Task.depends_on`` edges of a project are loaded with one query into an
+adjacency map (task id -> tuple of task ids) in both directions. Every
+traversal is iterative and linear in the size of the graph, so deep chains
+of dependencies cannot hit the recursion limit.
+
+Graphs are cached per project and dropped by
+``invalidate_dependency_graph`` when edges change (see projects/signals.py).
+Tasks may depend on tasks of other projects, so cycle checks run over
+``DependencyGraph.spanning``, which joins the graphs of every project a
+walk from the new dependencies can reach.
+"""
+from collections import deque
+
+from django.core.cache import cache
+from django.db import transaction
+
+GRAPH_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(project_id):
+    return f'task-dependencies:{project_id}'
+
+
+class DependencyGraph:
+    """Adjacency view of task dependencies (``task -> tasks it depends on``)"""
+
+    __slots__ = ('depends_on', 'dependents')
+
+    def __init__(self, edges=()):
+        depends_on = {}
+        dependents = {}
+        for task_id, dependency_id in edges:
+            depends_on.setdefault(task_id, []).append(dependency_id)
+            dependents.setdefault(dependency_id, []).append(task_id)
+        self.depends_on = {node: tuple(targets) for node, targets in depends_on.items()}
+        self.dependents = {node: tuple(sources) for node, sources in dependents.items()}
+
+    @classmethod
+    def for_project(cls, project_id):
+        """Cached graph for a project, loaded with one query on a miss"""
+        key = _cache_key(project_id)
+        graph = cache.get(key)
+        if graph is None:
+            graph = cls.load(project_id)
+            cache.set(key, graph, GRAPH_CACHE_TIMEOUT)
+        return graph
+
+    @classmethod
+    def load(cls, project_id):
+        """Build the graph from the dependency edges of one project"""
+        from .models import Task
+
+        edges = Task.depends_on.through.objects.filter(
+            from_task__project_id=project_id
+        ).values_list('from_task_id', 'to_task_id')
+        return cls(edges)
+
+    @classmethod
+    def spanning(cls, project_id, task_ids):
+        """
+        Graph of every project reachable from ``project_id`` and ``task_ids``
+        along dependency edges, from the cached per-project graphs plus one
+        query per hop into projects not seen yet.
+        """
+        from .models import Task
+
+        edges = []
+        loaded = set()
+        placed = set()
+        pending = {project_id}
+        unplaced = set(task_ids)
+        while pending or unplaced:
+            if unplaced:
+                for task_id, task_project_id in Task.objects.filter(pk__in=unplaced).values_list('id', 'project_id'):
+                    if task_project_id not in loaded:
+                        pending.add(task_project_id)
+                placed |= unplaced
+            if not pending:
+                break
+
+            new_edges = []
+            for next_project_id in pending:
+                new_edges.extend(cls.for_project(next_project_id).edges())
+            loaded |= pending
+            pending = set()
+            edges.extend(new_edges)
+            # Sources of the loaded graphs belong to loaded projects; targets may not
+            placed.update(task_id for task_id, _ in new_edges)
+            unplaced = {target for _, target in new_edges} - placed
+        return cls(edges)
+
+    def edges(self):
+        return [(node, target) for node, targets in self.depends_on.items() for target in targets]
+
+    def nodes(self):
+        return self.depends_on.keys() | self.dependents.keys()
+
+    def _reachable(self, start, adjacency):
+        seen = set()
+        queue = deque(adjacency.get(start, ()))
+        while queue:
+            node = queue.popleft()
+            if node in seen:
+                continue
+            seen.add(node)
+            queue.extend(adjacency.get(node, ()))
+        seen.discard(start)
+        return seen
+
+    def blockers(self, task_id):
+        """Every task ``task_id`` depends on, directly or transitively"""
+        return self._reachable(task_id, self.depends_on)
+
+    def dependents_of(self, task_id):
+        """Every task that depends on ``task_id``, directly or transitively"""
+        return self._reachable(task_id, self.dependents)
+
+    def cycle_with(self, task_id, dependency_ids):
+        """
+        Cycle that replacing ``task_id``'s dependencies with ``dependency_ids``
+        would create, as a list of task ids starting and ending at ``task_id``.
+        Returns None if the new edges are safe.
+        """
+        dependency_ids = list(dependency_ids)
+        if task_id in dependency_ids:
+            return [task_id, task_id]
+
+        # Breadth-first from the new dependencies along depends_on edges;
+        # reaching task_id again means the new edges close a loop. The
+        # task's current outgoing edges are ignored since they get replaced.
+        parents = {node: None for node in dependency_ids}
+        queue = deque(dependency_ids)
+        while queue:
+            node = queue.popleft()
+            for target in self.depends_on.get(node, ()):
+                if target in parents:
+                    continue
+                parents[target] = node
+                if target == task_id:
+                    path = [task_id]
+                    while node is not None:
+                        path.append(node)
+                        node = parents[node]
+                    return [task_id] + path[:0:-1] + [task_id]
+                queue.append(target)
+        return None
+
+    def strongly_connected_components(self):
+        """Tarjan's algorithm, iterative, O(V + E)"""
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+
+        for root in self.nodes():
+            if root in index:
+                continue
+
+            work = [(root, iter(self.depends_on.get(root, ())))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, targets = work[-1]
+                for target in targets:
+                    if target not in index:
+                        index[target] = lowlink[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self.depends_on.get(target, ()))))
+                        break
+                    if target in on_stack:
+                        lowlink[node] = min(lowlink[node], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+        return components
+
+    def cycles(self):
+        """Groups of tasks that depend on each other in a loop"""
+        return [
+            component for component in self.strongly_connected_components()
+            if len(component) > 1 or component[0] in self.depends_on.get(component[0], ())
+        ]
+
+
+def invalidate_dependency_graph(project_ids):
+    """Drop cached graphs for the given projects, now and after commit"""
+    keys = [_cache_key(project_id) for project_id in set(project_ids) if project_id]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,271 @@
+"""
+Streaming bulk task import from CSV or NDJSON.
+
+Rows are read one at a time from the stored upload and handled in chunks:
+each chunk is validated, its assignees resolved with one user query, its
+tasks inserted with ``bulk_create`` and its multi-assignee rows with one
+through-table insert. Dependencies may point at rows further down the file,
+so they are collected as ``external_id`` pairs and inserted in batches once
+every row has a task. Each chunk is added to the search index in bulk, and
+project aggregates are rebuilt once at the end.
+
+Supported columns / keys (only ``title`` is required):
+
+    external_id, title, description, status, priority, impact, due_date,
+    estimated_hours, story_points, assigned_to, assignees, depends_on
+
+``assigned_to`` is a username or email. ``assignees`` and ``depends_on`` are
+lists (``;``-separated in CSV). ``depends_on`` entries are ``external_id``
+values from the same file, or ids of tasks already in the project.
+"""
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from realtime.events import publish_tasks
+from search.indexing import index_tasks
+
+from .activity import record_activity
+from .dependencies import DependencyGraph, invalidate_dependency_graph
+from .models import Project, Task
+from .rollups import rebuild_rollups
+from .team_dashboard import forget_task_sections
+
+CHUNK_SIZE = 1000
+EDGE_BATCH_SIZE = 5000
+MAX_STORED_ERRORS = 100
+
+# Plain model fields that can be imported as-is
+VALUE_FIELDS = ('title', 'description', 'status', 'priority', 'impact',
+                'due_date', 'estimated_hours', 'story_points')
+
+
+def _as_list(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split(';') if item.strip()]
+
+
+class TaskImporter:
+    """Runs one TaskImportJob"""
+
+    def __init__(self, job, chunk_size=CHUNK_SIZE):
+        self.job = job
+        self.chunk_size = chunk_size
+        self.project_id = job.project_id
+        self.external_ids = {}      # external_id -> created task id
+        self.pending_edges = []     # (task id, dependency reference)
+        self.row_number = 0
+
+    def rows(self, raw):
+        """Yield one dict per row without reading the whole file"""
+        text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        if self.job.file_format == 'ndjson':
+            for line in text:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError('Each NDJSON line must be a JSON object')
+                yield row
+        else:
+            yield from csv.DictReader(text)
+
+    def run(self):
+        job = self.job
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+
+        size = job.file.size or 1
+        with job.file.open('rb') as raw:
+            chunk = []
+            try:
+                for row in self.rows(raw):
+                    self.row_number += 1
+                    chunk.append((self.row_number, row))
+                    if len(chunk) >= self.chunk_size:
+                        self.import_chunk(chunk)
+                        chunk = []
+                        self.report_progress(min(99, int(raw.tell() * 100 / size)))
+            except (ValueError, csv.Error) as exc:
+                # Unparseable line (bad JSON/CSV or encoding): stop at that row
+                self.add_error(self.row_number + 1, {'file': str(exc)})
+            if chunk:
+                self.import_chunk(chunk)
+
+        self.import_dependencies()
+        self.finish()
+
+    def report_progress(self, progress):
+        job = self.job
+        job.progress = progress
+        job.processed_rows = self.row_number
+        job.save(update_fields=['progress', 'processed_rows', 'created_count',
+                                'error_count', 'errors'])
+
+    def add_error(self, row_number, errors):
+        job = self.job
+        job.error_count += 1
+        if len(job.errors) < MAX_STORED_ERRORS:
+            job.errors.append({'row': row_number, 'errors': errors})
+
+    def clean_row(self, row):
+        """Coerce one row into Task field values; raises ValidationError"""
+        values = {}
+        errors = {}
+        for name in VALUE_FIELDS:
+            raw_value = row.get(name)
+            if raw_value in (None, '') and name != 'title':
+                continue
+            field = Task._meta.get_field(name)
+            try:
+                value = field.to_python(raw_value)
+                field.clean(value, None)
+                values[name] = value
+            except ValidationError as exc:
+                errors[name] = exc.messages
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    def resolve_users(self, chunk):
+        """Map every username/email referenced in the chunk to a user id (one query)"""
+        names = set()
+        for _, row in chunk:
+            names.update(_as_list(row.get('assigned_to')))
+            names.update(_as_list(row.get('assignees')))
+        users = {}
+        if names:
+            for user_id, username, email in User.objects.filter(
+                Q(username__in=names) | Q(email__in=names)
+            ).values_list('id', 'username', 'email'):
+                users[username] = user_id
+                if email:
+                    users.setdefault(email, user_id)
+        return users
+
+    def import_chunk(self, chunk):
+        users = self.resolve_users(chunk)
+        tasks = []
+        extras = []
+        for row_number, row in chunk:
+            assignee = _as_list(row.get('assigned_to'))
+            assignees = _as_list(row.get('assignees'))
+            errors = {}
+            try:
+                values = self.clean_row(row)
+            except ValidationError as exc:
+                errors = exc.message_dict
+            unknown = [name for name in assignee + assignees if name not in users]
+            if unknown:
+                errors['assignees'] = [f'Unknown user: {name}' for name in unknown]
+            if errors:
+                self.add_error(row_number, errors)
+                continue
+
+            task = Task(project_id=self.project_id, **values)
+            if assignee:
+                task.assigned_to_id = users[assignee[0]]
+            if task.status == 'done':
+                task.completed_at = timezone.now()
+            tasks.append(task)
+            extras.append((
+                str(row.get('external_id') or '').strip(),
+                {users[name] for name in assignees},
+                _as_list(row.get('depends_on')),
+            ))
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+
+            Assignment = Task.assigned_to_multiple.through
+            Assignment.objects.bulk_create([
+                Assignment(task_id=task.id, user_id=user_id)
+                for task, (_, user_ids, _) in zip(tasks, extras)
+                for user_id in user_ids
+            ])
+            index_tasks(tasks)
+            publish_tasks('tasks.created', tasks)
+            forget_task_sections(tasks)
+
+        for task, (external_id, _, dependencies) in zip(tasks, extras):
+            if external_id:
+                self.external_ids[external_id] = task.id
+            self.pending_edges.extend((task.id, reference) for reference in dependencies)
+
+        self.job.created_count += len(tasks)
+
+    def import_dependencies(self):
+        """Resolve collected depends_on references and insert them in batches"""
+        existing = set()
+        numeric = {int(ref) for _, ref in self.pending_edges if ref not in self.external_ids and ref.isdigit()}
+        if numeric:
+            existing = set(
+                Task.objects.filter(project_id=self.project_id, id__in=numeric).values_list('id', flat=True)
+            )
+
+        edges = set()
+        for task_id, reference in self.pending_edges:
+            target = self.external_ids.get(reference)
+            if target is None and reference.isdigit() and int(reference) in existing:
+                target = int(reference)
+            if target is None:
+                self.add_error(None, {'depends_on': [f'Unknown task reference: {reference}']})
+            elif target != task_id:
+                edges.add((task_id, target))
+        self.pending_edges = []
+
+        # Drop imported edges that would close a dependency loop
+        graph = DependencyGraph(DependencyGraph.load(self.project_id).edges() + list(edges))
+        for component in graph.cycles():
+            members = set(component)
+            looping = {edge for edge in edges if edge[0] in members and edge[1] in members}
+            if looping:
+                edges -= looping
+                self.add_error(None, {'depends_on': [
+                    f'Skipped {len(looping)} dependencies forming a cycle between tasks {sorted(members)}'
+                ]})
+
+        Edge = Task.depends_on.through
+        edges = list(edges)
+        for start in range(0, len(edges), EDGE_BATCH_SIZE):
+            Edge.objects.bulk_create(
+                [Edge(from_task_id=source, to_task_id=target)
+                 for source, target in edges[start:start + EDGE_BATCH_SIZE]],
+                ignore_conflicts=True,
+            )
+        self.job.dependency_count = len(edges)
+
+    def finish(self):
+        job = self.job
+        with transaction.atomic():
+            # bulk_create skipped Task.save, so aggregates and rollups are rebuilt once here
+            Project.rebuild_aggregates(project_ids=[self.project_id])
+            rebuild_rollups([self.project_id])
+            Project.bump_version([self.project_id])
+            invalidate_dependency_graph([self.project_id])
+
+            if job.created_count:
+                record_activity(
+                    project_id=self.project_id,
+                    user=job.created_by,
+                    action='tasks_imported',
+                    description=f'Imported {job.created_count} task(s)',
+                    metadata={'import_job_id': job.id, 'errors': job.error_count}
+                )
+
+            job.status = 'completed'
+            job.progress = 100
+            job.processed_rows = self.row_number
+            job.finished_at = timezone.now()
+            job.save()
@@ -0,0 +1,89 @@
+"""
+Benchmark the task dependency graph on large projects.
+
+Builds a throw-away project of random acyclic dependencies inside a
+transaction that is rolled back, then times loading the graph, cycle
+validation for new edges, transitive queries and a full Tarjan pass.
+"""
+import random
+import time
+from statistics import mean
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from projects.dependencies import DependencyGraph
+from projects.models import Project, Task
+
+
+class Command(BaseCommand):
+    help = 'Measure dependency graph load, cycle detection and transitive queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[1000, 10000],
+            help='Number of tasks per benchmark project'
+        )
+        parser.add_argument(
+            '--edges-per-task', type=int, default=3,
+            help='Average number of dependencies per task'
+        )
+        parser.add_argument(
+            '--queries', type=int, default=200,
+            help='Number of timed cycle checks and transitive queries'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _time(self, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        return result, (time.perf_counter() - start) * 1000
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            owner = User.objects.create(username='benchmark-dependency-graph')
+
+            for size in options['sizes']:
+                project = Project.objects.create(name=f'Benchmark {size}', owner=owner)
+                Task.objects.bulk_create(
+                    Task(project=project, title=f'Task {i}') for i in range(size)
+                )
+                task_ids = list(Task.objects.filter(project=project).order_by('id').values_list('id', flat=True))
+
+                # Only depend on earlier tasks so the generated graph is acyclic
+                Edge = Task.depends_on.through
+                edges = {
+                    (task_ids[i], task_ids[rng.randrange(i)])
+                    for i in range(1, size)
+                    for _ in range(options['edges_per_task'])
+                }
+                Edge.objects.bulk_create(
+                    (Edge(from_task_id=source, to_task_id=target) for source, target in edges),
+                    batch_size=5000
+                )
+
+                graph, load_ms = self._time(DependencyGraph.load, project.id)
+                cycles, tarjan_ms = self._time(graph.cycles)
+                if cycles:
+                    raise CommandError('Generated dependency graph is not acyclic')
+
+                samples = [rng.choice(task_ids) for _ in range(options['queries'])]
+                check_ms = [
+                    self._time(graph.cycle_with, task_id, [rng.choice(task_ids)])[1]
+                    for task_id in samples
+                ]
+                blockers_ms = [self._time(graph.blockers, task_id)[1] for task_id in samples]
+                dependents_ms = [self._time(graph.dependents_of, task_id)[1] for task_id in samples]
+
+                self.stdout.write(
+                    f'{size:>8} tasks, {len(edges):>7} edges: load {load_ms:.1f} ms, '
+                    f'tarjan {tarjan_ms:.1f} ms, '
+                    f'cycle check mean {mean(check_ms):.3f} ms (max {max(check_ms):.3f}), '
+                    f'blockers mean {mean(blockers_ms):.3f} ms, '
+                    f'dependents mean {mean(dependents_ms):.3f} ms'
+                )
+
+            transaction.set_rollback(True)
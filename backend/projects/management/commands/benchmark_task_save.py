@@ -0,0 +1,54 @@
+"""
+Benchmark Task.save latency as project size grows.
+
+Each run builds throw-away projects inside a transaction that is rolled back,
+so it is safe to run against a development database.
+"""
+import time
+from statistics import mean
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.models import Project, Task
+
+
+class Command(BaseCommand):
+    help = 'Measure Task.save latency for status flips across growing project sizes'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[100, 1000, 10000],
+            help='Number of tasks per benchmark project'
+        )
+        parser.add_argument(
+            '--saves', type=int, default=200,
+            help='Number of timed status flips per project size'
+        )
+    
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            owner = User.objects.create(username='benchmark-task-save')
+            
+            for size in options['sizes']:
+                project = Project.objects.create(name=f'Benchmark {size}', owner=owner)
+                Task.objects.bulk_create(
+                    Task(project=project, title=f'Task {i}', impact=1) for i in range(size)
+                )
+                Project.rebuild_aggregates(project_ids=[project.id])
+                
+                tasks = list(Task.objects.filter(project=project)[:options['saves']])
+                timings = []
+                for task in tasks:
+                    task.status = 'todo' if task.status == 'done' else 'done'
+                    start = time.perf_counter()
+                    task.save()
+                    timings.append((time.perf_counter() - start) * 1000)
+                
+                self.stdout.write(
+                    f'{size:>8} tasks: mean {mean(timings):.3f} ms, '
+                    f'max {max(timings):.3f} ms over {len(timings)} saves'
+                )
+            
+            transaction.set_rollback(True)
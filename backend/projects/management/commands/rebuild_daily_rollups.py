@@ -0,0 +1,21 @@
+"""
+Rebuild daily time and throughput rollups from time entries and tasks
+"""
+from django.core.management.base import BaseCommand
+
+from projects.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily time/throughput rollups for projects (drift repair)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'project_ids', nargs='*', type=int,
+            help='Only rebuild these projects (default: all projects)'
+        )
+    
+    def handle(self, *args, **options):
+        project_ids = options['project_ids'] or None
+        count = rebuild_rollups(project_ids=project_ids)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt daily rollups for {count} project(s)'))
@@ -0,0 +1,21 @@
+"""
+Rebuild denormalized project progress aggregates from the task table
+"""
+from django.core.management.base import BaseCommand
+
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Recompute task counts, impact totals and progress for projects (drift repair)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'project_ids', nargs='*', type=int,
+            help='Only rebuild these projects (default: all projects)'
+        )
+    
+    def handle(self, *args, **options):
+        project_ids = options['project_ids'] or None
+        changed = Project.rebuild_aggregates(project_ids=project_ids)
+        self.stdout.write(self.style.SUCCESS(f'Repaired aggregates for {changed} project(s)'))
@@ -0,0 +1,21 @@
+"""
+Report hit/miss counts of the versioned response cache (projects/response_cache.py)
+"""
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+from projects.response_cache import response_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show response cache hits, misses and coalesced waits per cached endpoint'
+
+    def handle(self, *args, **options):
+        # Import every view so the cached handlers are registered
+        get_resolver().url_patterns
+
+        for name, counts in response_cache_stats().items():
+            self.stdout.write(
+                f"{name}: {counts['hit']} hits, {counts['miss']} misses, "
+                f"{counts['coalesced']} coalesced ({counts['hit_rate']:.1%} served from cache)"
+            )
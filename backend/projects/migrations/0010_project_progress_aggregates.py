@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:13
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_progress_aggregates(apps, schema_editor):
+    """Populate the new aggregate columns from existing tasks and derive progress from them"""
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    
+    # Progress is read-only from here on; projects without tasks are at 0
+    Project.objects.update(progress=0)
+    
+    rows = Task.objects.values('project_id').annotate(
+        count=Count('id'),
+        done=Count('id', filter=Q(status='done')),
+        impact_sum=Sum('impact'),
+        done_impact=Sum('impact', filter=Q(status='done')),
+    ).order_by()
+    
+    for row in rows:
+        total_impact = row['impact_sum'] or 0
+        done_impact = row['done_impact'] or 0
+        # Same rule as projects.models.calculate_progress, frozen here
+        if total_impact > 0:
+            progress = min(100, int((done_impact / total_impact) * 100))
+        else:
+            progress = int(row['done'] * 100 / row['count'])
+        Project.objects.filter(pk=row['project_id']).update(
+            task_count=row['count'],
+            done_task_count=row['done'],
+            total_impact=total_impact,
+            done_impact=done_impact,
+            progress=progress,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_task_story_points_sprint_task_sprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='done_impact',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='done_task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='total_impact',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_progress_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_project_progress_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectactivity',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='projects_pr_project_8041fc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectmessage',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='projects_pr_project_715f8d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='projects_ta_project_82fc1c_idx'),
+        ),
+    ]
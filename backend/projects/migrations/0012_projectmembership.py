@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_memberships(apps, schema_editor):
+    """Index every existing owner and team member"""
+    Project = apps.get_model('projects', 'Project')
+    ProjectMembership = apps.get_model('projects', 'ProjectMembership')
+    
+    memberships = [
+        ProjectMembership(user_id=owner_id, project_id=project_id, role='owner')
+        for project_id, owner_id in Project.objects.values_list('id', 'owner_id')
+    ]
+    memberships += [
+        ProjectMembership(user_id=row.user_id, project_id=row.project_id, role='member')
+        for row in Project.team_members.through.objects.all()
+    ]
+    # Owners listed as team members keep their owner row (created first)
+    ProjectMembership.objects.bulk_create(memberships, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Owner'), ('member', 'Member')], default='member', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'project'), name='unique_project_membership')],
+            },
+        ),
+        migrations.RunPython(backfill_memberships, migrations.RunPython.noop),
+    ]
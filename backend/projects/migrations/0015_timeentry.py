@@ -0,0 +1,116 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:39
+
+from datetime import datetime
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _parse_datetime(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def copy_time_logs(apps, schema_editor):
+    """Move every Task.time_logs JSON entry into its own TimeEntry row"""
+    Task = apps.get_model('projects', 'Task')
+    TimeEntry = apps.get_model('projects', 'TimeEntry')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    user_ids = set(User.objects.values_list('id', flat=True))
+    
+    entries = []
+    tasks = Task.objects.exclude(time_logs=[]).exclude(time_logs__isnull=True)
+    for task_id, logs, updated_at in tasks.values_list('id', 'time_logs', 'updated_at').iterator():
+        for log in logs or []:
+            start_time = _parse_datetime(log.get('start_time'))
+            end_time = _parse_datetime(log.get('end_time'))
+            logged_at = _parse_datetime(log.get('logged_at')) or end_time or updated_at
+            worked_at = start_time or logged_at
+            entries.append(TimeEntry(
+                task_id=task_id,
+                user_id=log.get('user_id') if log.get('user_id') in user_ids else None,
+                username=log.get('username') or '',
+                date=timezone.localdate(worked_at),
+                start_time=start_time,
+                end_time=end_time,
+                duration_minutes=max(int(log.get('duration_minutes') or 0), 0),
+                note=log.get('note') or '',
+                manual_entry=bool(log.get('manual_entry')),
+                logged_at=logged_at,
+            ))
+        if len(entries) >= 1000:
+            TimeEntry.objects.bulk_create(entries)
+            entries = []
+    TimeEntry.objects.bulk_create(entries)
+
+
+def restore_time_logs(apps, schema_editor):
+    """Rebuild the JSON arrays from TimeEntry rows"""
+    Task = apps.get_model('projects', 'Task')
+    TimeEntry = apps.get_model('projects', 'TimeEntry')
+    
+    logs = {}
+    for entry in TimeEntry.objects.order_by('logged_at', 'id').iterator():
+        log = {
+            'user_id': entry.user_id,
+            'username': entry.username,
+            'start_time': entry.start_time.isoformat() if entry.start_time else None,
+            'end_time': entry.end_time.isoformat() if entry.end_time else None,
+            'duration_minutes': entry.duration_minutes,
+            'note': entry.note,
+            'logged_at': entry.logged_at.isoformat(),
+        }
+        if entry.manual_entry:
+            log['manual_entry'] = True
+        logs.setdefault(entry.task_id, []).append(log)
+    
+    tasks = list(Task.objects.filter(id__in=logs))
+    for task in tasks:
+        task.time_logs = logs[task.id]
+    Task.objects.bulk_update(tasks, ['time_logs'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0014_taskimportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(blank=True, help_text='Username at the time of logging', max_length=150)),
+                ('date', models.DateField(help_text='Day the work was done')),
+                ('start_time', models.DateTimeField(blank=True, null=True)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('duration_minutes', models.PositiveIntegerField()),
+                ('note', models.TextField(blank=True)),
+                ('manual_entry', models.BooleanField(default=False)),
+                ('logged_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_entries', to='projects.task')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='time_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['logged_at', 'id'],
+                'indexes': [models.Index(fields=['task', 'date'], name='projects_ti_task_id_7171e6_idx'), models.Index(fields=['user', 'date'], name='projects_ti_user_id_b5bb9d_idx')],
+            },
+        ),
+        migrations.RunPython(copy_time_logs, restore_time_logs),
+        migrations.RemoveField(
+            model_name='task',
+            name='time_logs',
+        ),
+    ]
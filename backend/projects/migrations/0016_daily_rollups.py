@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    """Build daily rollups from existing time entries and tasks"""
+    Task = apps.get_model('projects', 'Task')
+    TimeEntry = apps.get_model('projects', 'TimeEntry')
+    DailyTimeRollup = apps.get_model('projects', 'DailyTimeRollup')
+    DailyTaskRollup = apps.get_model('projects', 'DailyTaskRollup')
+    
+    DailyTimeRollup.objects.bulk_create(
+        (
+            DailyTimeRollup(
+                project_id=row['task__project_id'], user_id=row['user_id'], date=row['date'],
+                minutes=row['minutes'], entry_count=row['entries']
+            )
+            for row in TimeEntry.objects.order_by().values('task__project_id', 'user_id', 'date').annotate(
+                minutes=Sum('duration_minutes'), entries=Count('id')
+            )
+        ),
+        batch_size=1000
+    )
+    
+    rollups = {}
+    for row in Task.objects.annotate(day=TruncDate('created_at')).order_by().values(
+        'project_id', 'day'
+    ).annotate(total=Count('id')):
+        rollups[row['project_id'], row['day']] = DailyTaskRollup(
+            project_id=row['project_id'], date=row['day'], created_count=row['total']
+        )
+    for row in Task.objects.filter(status='done', completed_at__isnull=False).annotate(
+        day=TruncDate('completed_at')
+    ).order_by().values('project_id', 'day').annotate(total=Count('id')):
+        rollup = rollups.setdefault(
+            (row['project_id'], row['day']),
+            DailyTaskRollup(project_id=row['project_id'], date=row['day'])
+        )
+        rollup.completed_count = row['total']
+    DailyTaskRollup.objects.bulk_create(rollups.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0015_timeentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('created_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_tasks', to='projects.project')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'date'), name='unique_daily_task_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyTimeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('minutes', models.BigIntegerField(default=0)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_time', to='projects.project')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_time', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'date'], name='projects_da_user_id_9d4372_idx')],
+                'constraints': [models.UniqueConstraint(fields=('project', 'user', 'date'), name='unique_daily_time_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
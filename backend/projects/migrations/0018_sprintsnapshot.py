@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def snapshot_open_sprints(apps, schema_editor):
+    """Start the burndown series of planned and active sprints at today"""
+    Sprint = apps.get_model('projects', 'Sprint')
+    SprintSnapshot = apps.get_model('projects', 'SprintSnapshot')
+    
+    today = timezone.localdate()
+    done = Q(tasks__status='done')
+    SprintSnapshot.objects.bulk_create(
+        (
+            SprintSnapshot(sprint_id=row['id'], date=today, **{
+                name: value for name, value in row.items() if name != 'id'
+            })
+            for row in Sprint.objects.exclude(status='completed').order_by().annotate(
+                total_points=Coalesce(Sum('tasks__story_points'), 0),
+                completed_points=Coalesce(Sum('tasks__story_points', filter=done), 0),
+                task_count=Count('tasks__id'),
+                completed_task_count=Count('tasks__id', filter=done),
+            ).values('id', 'total_points', 'completed_points', 'task_count', 'completed_task_count')
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0017_projectactivity_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SprintSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_points', models.IntegerField(default=0)),
+                ('completed_points', models.IntegerField(default=0)),
+                ('task_count', models.PositiveIntegerField(default=0)),
+                ('completed_task_count', models.PositiveIntegerField(default=0)),
+                ('recorded_at', models.DateTimeField(auto_now=True)),
+                ('sprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='projects.sprint')),
+            ],
+            options={
+                'ordering': ['sprint', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('sprint', 'date'), name='unique_sprint_snapshot_day')],
+            },
+        ),
+        migrations.RunPython(snapshot_open_sprints, migrations.RunPython.noop),
+    ]
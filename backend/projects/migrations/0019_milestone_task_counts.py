@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_task_counts(apps, schema_editor):
+    """Count linked tasks per milestone and derive progress from the counts"""
+    Milestone = apps.get_model('projects', 'Milestone')
+    MilestoneTask = Milestone.tasks.through
+    
+    links = MilestoneTask.objects.filter(milestone_id=OuterRef('pk')).order_by().values('milestone_id')
+    Milestone.objects.update(
+        task_count=Coalesce(Subquery(
+            links.annotate(total=Count('id')).values('total'), output_field=models.IntegerField()
+        ), 0),
+        done_task_count=Coalesce(Subquery(
+            links.filter(task__status='done').annotate(total=Count('id')).values('total'),
+            output_field=models.IntegerField()
+        ), 0),
+    )
+    Milestone.objects.filter(task_count__gt=0).update(
+        progress=models.F('done_task_count') * 100 / models.F('task_count')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0018_sprintsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='milestone',
+            name='done_task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='milestone',
+            name='task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_task_counts, migrations.RunPython.noop),
+    ]
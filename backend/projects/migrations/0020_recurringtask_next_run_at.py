@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+from projects.recurring import next_run_at
+
+
+def schedule_recurring_tasks(apps, schema_editor):
+    """Compute next_run_at from each row's last run; repair tasks created with status 'pending'"""
+    RecurringTask = apps.get_model('projects', 'RecurringTask')
+    Task = apps.get_model('projects', 'Task')
+    
+    rows = list(RecurringTask.objects.only('id', 'start_date', 'end_date', 'frequency', 'last_created'))
+    for row in rows:
+        row.next_run_at = next_run_at(row.start_date, row.end_date, row.frequency, after=row.last_created)
+    RecurringTask.objects.bulk_update(rows, ['next_run_at'], batch_size=500)
+    
+    # RecurringTask.create_task_instance used to write this invalid status
+    Task.objects.filter(status='pending').update(status='todo')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0019_milestone_task_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recurringtask',
+            name='next_run_at',
+            field=models.DateTimeField(blank=True, help_text='Start of the next occurrence (empty once past end_date)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recurringtask',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['next_run_at'], name='recurring_task_due_idx'),
+        ),
+        migrations.RunPython(schedule_recurring_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:58
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+BATCH_SIZE = 1000
+
+
+def collapse_read_by(apps, schema_editor):
+    """One cursor per (user, project) at the newest message the user had read there"""
+    ProjectMessage = apps.get_model('projects', 'ProjectMessage')
+    MessageReadCursor = apps.get_model('projects', 'MessageReadCursor')
+
+    rows = ProjectMessage.read_by.through.objects.values(
+        'user_id', 'projectmessage__project_id'
+    ).annotate(last_read=Max('projectmessage_id')).order_by()
+    MessageReadCursor.objects.bulk_create(
+        [
+            MessageReadCursor(
+                user_id=row['user_id'],
+                project_id=row['projectmessage__project_id'],
+                last_read_message_id=row['last_read'],
+            )
+            for row in rows.iterator(chunk_size=BATCH_SIZE)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def restore_read_by(apps, schema_editor):
+    """Mark every message up to each cursor as read by its user"""
+    ProjectMessage = apps.get_model('projects', 'ProjectMessage')
+    MessageReadCursor = apps.get_model('projects', 'MessageReadCursor')
+    Through = ProjectMessage.read_by.through
+
+    for cursor in MessageReadCursor.objects.iterator(chunk_size=BATCH_SIZE):
+        message_ids = ProjectMessage.objects.filter(
+            project_id=cursor.project_id, id__lte=cursor.last_read_message_id
+        ).values_list('id', flat=True)
+        Through.objects.bulk_create(
+            [Through(projectmessage_id=message_id, user_id=cursor.user_id) for message_id in message_ids],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0020_recurringtask_next_run_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageReadCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.PositiveBigIntegerField(default=0, help_text='Messages up to this id are read')),
+                ('last_read_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='projectmessage',
+            index=models.Index(fields=['project', 'id'], name='projects_pr_project_2625f1_idx'),
+        ),
+        migrations.AddField(
+            model_name='messagereadcursor',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='message_read_cursors', to='projects.project'),
+        ),
+        migrations.AddField(
+            model_name='messagereadcursor',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='message_read_cursors', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='messagereadcursor',
+            constraint=models.UniqueConstraint(fields=('user', 'project'), name='unique_message_read_cursor'),
+        ),
+        migrations.RunPython(collapse_read_by, restore_read_by),
+        migrations.RemoveField(
+            model_name='projectmessage',
+            name='read_by',
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_rows_without_user(apps, schema_editor):
+    """Sum duplicate (project, date) rows without a user into one before they become unique"""
+    DailyTimeRollup = apps.get_model('projects', 'DailyTimeRollup')
+
+    duplicates = DailyTimeRollup.objects.filter(user__isnull=True).order_by().values('project_id', 'date').annotate(
+        rows=Count('id'), keep=Min('id'), minutes_total=Sum('minutes'), entries_total=Sum('entry_count')
+    ).filter(rows__gt=1)
+    for row in duplicates:
+        DailyTimeRollup.objects.filter(pk=row['keep']).update(
+            minutes=row['minutes_total'], entry_count=row['entries_total']
+        )
+        DailyTimeRollup.objects.filter(
+            project_id=row['project_id'], date=row['date'], user__isnull=True
+        ).exclude(pk=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0021_message_read_cursors'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailytimerollup',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_time', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(merge_rows_without_user, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailytimerollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('project', 'date'), name='unique_daily_time_rollup_without_user'),
+        ),
+    ]
@@ -1,7 +1,40 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Floor, Least
+from django.db.models.lookups import Exact, GreaterThan
 from django.contrib.auth.models import User
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from .rollups import apply_task_changes, move_task_time, record_time, task_key
+from .recurring import build_task, next_run_at
+from .sprints import METRIC_FIELDS, completion_percentage, metric_aggregates, record_sprint_snapshots
+from .tracker import FieldTracker
+
+
+def calculate_progress(task_count, done_task_count, total_impact, done_impact):
+    """Calculate project progress (0-100) from its task aggregates"""
+    if total_impact > 0:
+        return min(100, int((done_impact / total_impact) * 100))
+    # If no tasks have impact assigned, fall back to simple count
+    return int(done_task_count * 100 / task_count) if task_count > 0 else 0
+
+
+def progress_expression(task_count, done_task_count, total_impact, done_impact):
+    """SQL equivalent of calculate_progress over aggregate column expressions"""
+    return Case(
+        When(
+            GreaterThan(total_impact, 0),
+            then=Least(
+                Value(100),
+                Cast(Floor(done_impact * 100 / total_impact), models.IntegerField())
+            )
+        ),
+        When(GreaterThan(task_count, 0), then=done_task_count * 100 / task_count),
+        default=Value(0),
+        output_field=models.IntegerField()
+    )
 
 
 class Project(models.Model):
@@ -34,14 +67,152 @@ class Project(models.Model):
     budget = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
     progress = models.IntegerField(default=0, help_text="Progress percentage (0-100)")
     
+    # Denormalized task aggregates backing progress (kept in sync by Task.save/delete)
+    task_count = models.IntegerField(default=0)
+    done_task_count = models.IntegerField(default=0)
+    total_impact = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    done_impact = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    # Bumped on every write shown by the project's read endpoints; keys derived
+    # caches (schedule) and response ETags (projects/versions.py)
+    version = models.PositiveIntegerField(default=0)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    tracker = FieldTracker(['name', 'status', 'priority', 'owner', 'start_date', 'end_date'])
+    
+    # Only ever written with F() updates; a stale instance must not save them back
+    DERIVED_FIELDS = ('progress', 'task_count', 'done_task_count', 'total_impact', 'done_impact', 'version')
+    
     class Meta:
         ordering = ['-created_at']
     
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        """Save user-editable fields, leaving the derived counters to their atomic updates"""
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def bump_version(cls, project_ids, also_bump=None):
+        """Atomically increment the version of the given projects (and of ``also_bump``)"""
+        projects = Q(pk__in=project_ids)
+        if also_bump is not None:
+            projects |= Q(pk__in=also_bump)
+        return cls.objects.filter(projects).update(version=F('version') + 1)
+    
+    @classmethod
+    def apply_task_delta(cls, project_id, tasks=0, done_tasks=0, impact=0, done_impact=0, also_bump=None):
+        """
+        Atomically shift a project's task aggregates, recompute progress and
+        bump the version in a single UPDATE, without reading any task rows.
+        
+        ``also_bump`` (project ids or a values() subquery) names further
+        projects whose version the same UPDATE increments, without
+        touching their aggregates.
+        """
+        task_count = F('task_count') + tasks
+        done_task_count = F('done_task_count') + done_tasks
+        total_impact = F('total_impact') + Value(Decimal(str(impact)))
+        new_done_impact = F('done_impact') + Value(Decimal(str(done_impact)))
+        aggregates = {
+            'task_count': task_count,
+            'done_task_count': done_task_count,
+            'total_impact': total_impact,
+            'done_impact': new_done_impact,
+            'progress': progress_expression(task_count, done_task_count, total_impact, new_done_impact),
+        }
+        
+        projects = cls.objects.filter(pk=project_id)
+        if also_bump is not None:
+            projects = cls.objects.filter(Q(pk=project_id) | Q(pk__in=also_bump))
+            aggregates = {
+                field: Case(When(pk=project_id, then=value), default=F(field))
+                for field, value in aggregates.items()
+            }
+        return projects.update(version=F('version') + 1, **aggregates)
+    
+    @classmethod
+    def rebuild_aggregates(cls, project_ids=None):
+        """
+        Recompute task aggregates and progress from the task table.
+        
+        Used to repair drift and after bulk task writes that bypass Task.save.
+        Runs one grouped aggregate query plus one UPDATE per project.
+        Returns the number of projects whose stored aggregates changed.
+        """
+        projects = cls.objects.all()
+        if project_ids is not None:
+            projects = projects.filter(pk__in=project_ids)
+        
+        totals = {
+            row['project_id']: row
+            for row in Task.objects.filter(project__in=projects).values('project_id').annotate(
+                count=Count('id'),
+                done=Count('id', filter=Q(status='done')),
+                impact_sum=Sum('impact'),
+                done_impact=Sum('impact', filter=Q(status='done')),
+            ).order_by()
+        }
+        
+        changed = 0
+        fields = ('id', 'task_count', 'done_task_count', 'total_impact', 'done_impact', 'progress')
+        for project in projects.only(*fields).iterator():
+            row = totals.get(project.id, {})
+            values = {
+                'task_count': row.get('count') or 0,
+                'done_task_count': row.get('done') or 0,
+                'total_impact': row.get('impact_sum') or Decimal('0'),
+                'done_impact': row.get('done_impact') or Decimal('0'),
+            }
+            values['progress'] = calculate_progress(**values)
+            
+            if any(getattr(project, field) != value for field, value in values.items()):
+                cls.objects.filter(pk=project.id).update(version=F('version') + 1, **values)
+                changed += 1
+        
+        return changed
+    
+    def add_member(self, user):
+        """Add a user to the team (membership index is synced by signal)"""
+        self.team_members.add(user)
+    
+    def remove_member(self, user):
+        """Remove a user from the team (membership index is synced by signal)"""
+        self.team_members.remove(user)
+
+
+class ProjectMembership(models.Model):
+    """
+    Materialized access index: one row per user who can see a project,
+    covering both the owner and the team members. Maintained by the
+    signal receivers in projects/signals.py.
+    """
+    
+    ROLE_CHOICES = [
+        ('owner', 'Owner'),
+        ('member', 'Member'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_memberships')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='memberships')
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='member')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project'], name='unique_project_membership'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.project.name} ({self.role})"
 
 
 class Task(models.Model):
@@ -90,9 +261,7 @@ class Task(models.Model):
     sprint = models.ForeignKey('Sprint', on_delete=models.SET_NULL, null=True, blank=True, 
                                related_name='tasks', help_text="Sprint this task belongs to")
     
-    # Time tracking
-    time_logs = models.JSONField(default=list, blank=True, 
-                                 help_text="Array of time log entries {user_id, start_time, end_time, duration_minutes, note}")
+    # Time tracking (logged time lives in TimeEntry)
     active_timer = models.JSONField(null=True, blank=True, 
                                     help_text="Currently running timer {user_id, start_time}")
     
@@ -100,15 +269,26 @@ class Task(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    # JSON fields are left untracked and always written
+    tracker = FieldTracker([
+        'project', 'title', 'description', 'status', 'priority', 'assigned_to',
+        'impact', 'due_date', 'estimated_hours', 'actual_hours', 'story_points',
+        'sprint', 'created_at', 'completed_at',
+    ])
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', '-created_at', '-id']),
+        ]
     
     def save(self, *args, **kwargs):
-        """Override save to update project progress when task status changes"""
+        """Override save to keep project progress aggregates in sync with status changes"""
         # Check if this is an update (not a new task)
-        if self.pk:
-            old_task = Task.objects.get(pk=self.pk)
-            old_status = old_task.status
+        is_new = self._state.adding
+        
+        if not is_new:
+            old_status = self.tracker.previous('status')
             new_status = self.status
             
             # If task is being marked as done and wasn't done before
@@ -117,37 +297,104 @@ class Task(models.Model):
             # If task is being unmarked from done
             elif old_status == 'done' and new_status != 'done':
                 self.completed_at = None
+            
+            # Only write what changed; Django already narrows saves of deferred instances
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None and not self.get_deferred_fields():
+                kwargs['update_fields'] = self.tracker.update_fields()
+            elif update_fields is not None and 'status' in update_fields:
+                kwargs['update_fields'] = set(update_fields) | {'completed_at'}
+            
+            old_project_id = self.tracker.previous('project')
+            before = self._progress_contribution(old_status, self.tracker.previous('impact'))
+            # Dependents list this task's title and status in blocked_by; their
+            # projects are bumped by the same UPDATE as this task's project
+            dependent_projects = None
+            if self.tracker.has_changed('status') or self.tracker.has_changed('title'):
+                dependent_projects = Task.objects.filter(depends_on=self.pk).values('project_id')
+            counted_before = task_key(
+                old_project_id, old_status,
+                self.tracker.previous('created_at'), self.tracker.previous('completed_at')
+            )
+        
+        # Sprints whose burndown this save moves (joined, left, re-estimated or re-statused)
+        sprint_ids = set()
+        if is_new or any(self.tracker.has_changed(field) for field in ('sprint', 'status', 'story_points')):
+            sprint_ids = {self.sprint_id, None if is_new else self.tracker.previous('sprint')}
         
         super().save(*args, **kwargs)
         
-        # Update project progress after saving the task
-        self.update_project_progress()
-    
-    def update_project_progress(self):
-        """Calculate and update project progress based on completed tasks' impact"""
-        project = self.project
-        tasks = project.tasks.all()
+        record_sprint_snapshots(sprint_ids)
         
-        # Calculate total impact of all tasks
-        total_impact = sum(task.impact for task in tasks)
+        # Linked milestones count done tasks; one UPDATE when this task's done state flips
+        if not is_new and (old_status == 'done') != (self.status == 'done'):
+            Milestone.apply_task_delta(
+                Milestone.objects.filter(tasks=self.pk), done_tasks=1 if self.status == 'done' else -1
+            )
+        
+        # Keep daily created/completed counts (and moved time) in step
+        counted_after = task_key(self.project_id, self.status, self.created_at, self.completed_at)
+        apply_task_changes([(None if is_new else counted_before, counted_after)])
+        if not is_new and old_project_id != self.project_id:
+            move_task_time(self.pk, old_project_id, self.project_id)
         
-        if total_impact > 0:
-            # Calculate impact of completed tasks
-            completed_impact = sum(
-                task.impact for task in tasks if task.status == 'done'
+        # Shift project aggregates by this task's contribution
+        after = self._progress_contribution(self.status, self.impact)
+        if is_new:
+            self._apply_progress_delta(self.project_id, after)
+        elif old_project_id != self.project_id:
+            self._apply_progress_delta(old_project_id, [-value for value in before])
+            self._apply_progress_delta(self.project_id, after, dependent_projects)
+        elif before != after:
+            self._apply_progress_delta(
+                self.project_id, [new - prev for new, prev in zip(after, before)], dependent_projects
             )
-            
-            # Calculate progress percentage
-            progress = min(100, int((completed_impact / total_impact) * 100))
         else:
-            # If no tasks have impact assigned, fall back to simple count
-            total_tasks = tasks.count()
-            completed_tasks = tasks.filter(status='done').count()
-            progress = int((completed_tasks / total_tasks * 100)) if total_tasks > 0 else 0
+            Project.bump_version([self.project_id], dependent_projects)
+    
+    def delete(self, *args, **kwargs):
+        """Remove this task's stored contribution from project and milestone aggregates"""
+        project_id = self.tracker.previous('project')
+        contribution = self._progress_contribution(
+            self.tracker.previous('status'), self.tracker.previous('impact')
+        )
+        counted = task_key(
+            project_id, self.tracker.previous('status'),
+            self.tracker.previous('created_at'), self.tracker.previous('completed_at')
+        )
+        sprint_id = self.tracker.previous('sprint')
+        move_task_time(self.pk, project_id)
+        # The milestone links are about to cascade away without an m2m signal
+        Milestone.apply_task_delta(
+            Milestone.objects.filter(tasks=self.pk),
+            tasks=-1, done_tasks=-int(self.tracker.previous('status') == 'done')
+        )
+        result = super().delete(*args, **kwargs)
+        apply_task_changes([(counted, None)])
+        record_sprint_snapshots([sprint_id])
+        self._apply_progress_delta(project_id, [-value for value in contribution])
+        return result
+    
+    @staticmethod
+    def _progress_contribution(status, impact):
+        """(tasks, done_tasks, impact, done_impact) contributed by one task"""
+        impact = Decimal(str(impact or 0))
+        done = status == 'done'
+        return [1, int(done), impact, impact if done else Decimal('0')]
+    
+    def _apply_progress_delta(self, project_id, delta, also_bump=None):
+        """Apply an aggregate delta and refresh the cached project, if loaded"""
+        Project.apply_task_delta(project_id, *delta, also_bump=also_bump)
         
-        # Update project progress
-        project.progress = progress
-        project.save(update_fields=['progress'])
+        project = self._state.fields_cache.get('project')
+        if project is not None and project.pk == project_id:
+            project.refresh_from_db(
+                fields=['task_count', 'done_task_count', 'total_impact', 'done_impact', 'progress', 'version']
+            )
+    
+    def update_project_progress(self):
+        """Recalculate project progress from scratch (drift repair)"""
+        Project.rebuild_aggregates(project_ids=[self.project_id])
     
     def get_blocked_by(self):
         """Get tasks that are blocking this task (dependencies not completed)"""
@@ -163,9 +410,7 @@ class Task(models.Model):
     
     def get_total_time_logged(self):
         """Calculate total time logged in hours"""
-        if not self.time_logs:
-            return 0
-        total_minutes = sum(entry.get('duration_minutes', 0) for entry in self.time_logs)
+        total_minutes = self.time_entries.aggregate(total=Sum('duration_minutes'))['total'] or 0
         return round(total_minutes / 60, 2)
     
     def __str__(self):
@@ -225,6 +470,8 @@ class Sprint(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    tracker = FieldTracker(['name', 'status', 'start_date', 'end_date'])
+    
     class Meta:
         ordering = ['-created_at']
         unique_together = [['project', 'name']]  # Unique sprint names per project
@@ -232,28 +479,28 @@ class Sprint(models.Model):
     def __str__(self):
         return f"{self.name} ({self.project.name})"
     
+    def get_metrics(self, refresh=False):
+        """
+        Story point and task totals. Read from the annotations added by
+        SprintSerializer.optimize_queryset when present, otherwise computed
+        with one aggregate query and kept on the instance.
+        """
+        if refresh or not all(name in self.__dict__ for name in METRIC_FIELDS):
+            self.__dict__.update(self.tasks.aggregate(**metric_aggregates(prefix='')))
+        return {name: self.__dict__[name] for name in METRIC_FIELDS}
+    
     def get_total_points(self):
         """Get total story points in this sprint"""
-        return self.tasks.filter(story_points__isnull=False).aggregate(
-            total=models.Sum('story_points')
-        )['total'] or 0
+        return self.get_metrics()['total_points']
     
     def get_completed_points(self):
         """Get completed story points in this sprint"""
-        return self.tasks.filter(
-            status='done', 
-            story_points__isnull=False
-        ).aggregate(
-            total=models.Sum('story_points')
-        )['total'] or 0
+        return self.get_metrics()['completed_points']
     
     def get_completion_percentage(self):
         """Calculate sprint completion percentage based on story points"""
-        total = self.get_total_points()
-        if total == 0:
-            return 0
-        completed = self.get_completed_points()
-        return round((completed / total) * 100, 1)
+        metrics = self.get_metrics()
+        return completion_percentage(metrics['total_points'], metrics['completed_points'])
     
     def save(self, *args, **kwargs):
         """Mark completion timestamp when sprint is completed"""
@@ -264,6 +511,27 @@ class Sprint(models.Model):
         super().save(*args, **kwargs)
 
 
+class SprintSnapshot(models.Model):
+    """Sprint metrics at the end of one day (burndown/velocity series, see projects/sprints.py)"""
+    
+    sprint = models.ForeignKey(Sprint, on_delete=models.CASCADE, related_name='snapshots')
+    date = models.DateField()
+    total_points = models.IntegerField(default=0)
+    completed_points = models.IntegerField(default=0)
+    task_count = models.PositiveIntegerField(default=0)
+    completed_task_count = models.PositiveIntegerField(default=0)
+    recorded_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['sprint', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['sprint', 'date'], name='unique_sprint_snapshot_day'),
+        ]
+    
+    def __str__(self):
+        return f"{self.sprint.name} on {self.date}: {self.completed_points}/{self.total_points} points"
+
+
 class Comment(models.Model):
     """Comment model for task discussions"""
     
@@ -280,6 +548,75 @@ class Comment(models.Model):
         return f"Comment by {self.user.username} on {self.task.title}"
 
 
+class TimeEntry(models.Model):
+    """Time logged on a task, from a stopped timer or a manual entry"""
+    
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='time_entries')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='time_entries')
+    username = models.CharField(max_length=150, blank=True, help_text="Username at the time of logging")
+    date = models.DateField(help_text="Day the work was done")
+    start_time = models.DateTimeField(null=True, blank=True)
+    end_time = models.DateTimeField(null=True, blank=True)
+    duration_minutes = models.PositiveIntegerField()
+    note = models.TextField(blank=True)
+    manual_entry = models.BooleanField(default=False)
+    logged_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['logged_at', 'id']
+        indexes = [
+            models.Index(fields=['task', 'date']),
+            models.Index(fields=['user', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.username} - {self.duration_minutes}m on {self.task_id}"
+    
+    def save(self, *args, **kwargs):
+        """Add new entries to the daily time rollup"""
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        if is_new:
+            record_time(self.task.project_id, self.user_id, self.date, self.duration_minutes)
+
+
+class DailyTimeRollup(models.Model):
+    """Minutes logged per project, user and day (maintained by projects/rollups.py)"""
+    
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='daily_time')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='daily_time')
+    date = models.DateField()
+    minutes = models.BigIntegerField(default=0)
+    entry_count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'user', 'date'], name='unique_daily_time_rollup'),
+            # NULLs are distinct in the constraint above; time of deleted users shares one row per day
+            models.UniqueConstraint(fields=['project', 'date'], condition=Q(user__isnull=True),
+                                    name='unique_daily_time_rollup_without_user'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
+
+
+class DailyTaskRollup(models.Model):
+    """Tasks created and completed per project and day (maintained by projects/rollups.py)"""
+    
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='daily_tasks')
+    date = models.DateField()
+    created_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'date'], name='unique_daily_task_rollup'),
+        ]
+
+
 class TaskAttachment(models.Model):
     """File attachments for tasks (proof of completion, documents, etc.)"""
     
@@ -328,11 +665,15 @@ class ProjectActivity(models.Model):
     action = models.CharField(max_length=100)
     description = models.TextField()
     metadata = models.JSONField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens; the row may be written later (projects/activity.py)
+    created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'Project activities'
+        indexes = [
+            models.Index(fields=['project', '-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.project.name} - {self.action}"
@@ -350,20 +691,40 @@ class ProjectMessage(models.Model):
     # Optional: mention specific users
     mentions = models.ManyToManyField(User, related_name='mentioned_in_messages', blank=True)
     
-    # Read status tracking
-    read_by = models.ManyToManyField(User, related_name='read_messages', blank=True)
-    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_edited = models.BooleanField(default=False)
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['project', '-created_at', '-id']),
+            # Unread counts are id ranges per project past a read cursor
+            models.Index(fields=['project', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.sender.username} in {self.project.name}: {self.message[:50]}"
 
 
+class MessageReadCursor(models.Model):
+    """How far a user has read a project's messages (see projects/read_cursors.py)"""
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='message_read_cursors')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='message_read_cursors')
+    last_read_message_id = models.PositiveBigIntegerField(default=0,
+                                                          help_text="Messages up to this id are read")
+    last_read_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project'], name='unique_message_read_cursor'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} read {self.project.name} up to {self.last_read_message_id}"
+
+
 class Milestone(models.Model):
     """Project milestones to track key deliverables"""
     
@@ -386,38 +747,140 @@ class Milestone(models.Model):
     # Progress tracking
     progress = models.IntegerField(default=0, help_text="Progress percentage (0-100)")
     
+    # Denormalized counts of linked tasks (kept in sync by Task.save/delete and the tasks m2m signal)
+    task_count = models.IntegerField(default=0)
+    done_task_count = models.IntegerField(default=0)
+    
     completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Only ever written with F() updates; a stale instance must not save them back
+    DERIVED_FIELDS = ('progress', 'task_count', 'done_task_count')
+    
     class Meta:
         ordering = ['due_date']
     
     def __str__(self):
         return f"{self.project.name} - {self.name}"
     
-    def update_progress(self):
-        """Calculate milestone progress based on associated tasks"""
-        tasks = self.tasks.all()
-        if tasks.count() == 0:
-            return
-        
-        completed_tasks = tasks.filter(status='done').count()
-        self.progress = int((completed_tasks / tasks.count()) * 100)
-        
-        # Auto-update status
-        if self.progress == 100:
-            self.status = 'completed'
-            if not self.completed_at:
-                self.completed_at = timezone.now()
-        elif self.progress > 0:
-            self.status = 'in_progress'
+    def save(self, *args, **kwargs):
+        """Save user-editable fields, leaving the derived counters to their atomic updates"""
+        is_new = self._state.adding
+        if not is_new and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        if not is_new:
+            # A stale instance may have written back an old status; derive it from the counts again
+            self.update_progress()
+    
+    @staticmethod
+    def derived_values(task_count, done_task_count):
+        """
+        progress, status and completed_at as SQL expressions of the task
+        counts. Milestones without tasks keep their status; otherwise they
+        are completed when every task is done, missed when past due,
+        in progress once a task is done, and pending before that.
+        """
+        empty = Exact(task_count, 0)
+        complete = Exact(done_task_count, task_count)
+        return {
+            'progress': Case(
+                When(empty, then=Value(0)),
+                default=done_task_count * 100 / task_count,
+                output_field=models.IntegerField()
+            ),
+            'status': Case(
+                When(empty, then=F('status')),
+                When(complete, then=Value('completed')),
+                When(due_date__lt=timezone.localdate(), then=Value('missed')),
+                When(GreaterThan(done_task_count, 0), then=Value('in_progress')),
+                default=Value('pending'),
+                output_field=models.CharField()
+            ),
+            'completed_at': Case(
+                When(empty, then=F('completed_at')),
+                When(complete, then=Coalesce(F('completed_at'), Value(timezone.now()))),
+                default=Value(None),
+                output_field=models.DateTimeField()
+            ),
+        }
+    
+    @classmethod
+    def apply_task_delta(cls, milestones, tasks=0, done_tasks=0):
+        """
+        Shift the task counts of a milestone queryset and re-derive progress
+        and status in a single UPDATE, without reading any task rows.
+        """
+        task_count = F('task_count') + tasks
+        done_task_count = F('done_task_count') + done_tasks
+        return milestones.update(
+            task_count=task_count,
+            done_task_count=done_task_count,
+            **cls.derived_values(task_count, done_task_count)
+        )
+    
+    @classmethod
+    def apply_task_status_changes(cls, became_done=(), became_undone=()):
+        """Adjust the milestones of tasks whose done state flipped (bulk status updates)"""
+        deltas = {}
+        MilestoneTask = cls.tasks.through
+        for task_ids, sign in ((became_done, 1), (became_undone, -1)):
+            if not task_ids:
+                continue
+            for milestone_id, total in MilestoneTask.objects.filter(task_id__in=task_ids).values(
+                'milestone_id'
+            ).annotate(total=Count('id')).values_list('milestone_id', 'total').order_by():
+                deltas[milestone_id] = deltas.get(milestone_id, 0) + sign * total
         
-        # Check if missed
-        if self.due_date < timezone.now().date() and self.status != 'completed':
-            self.status = 'missed'
+        # One UPDATE per distinct delta (usually one)
+        by_delta = {}
+        for milestone_id, delta in deltas.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(milestone_id)
+        for delta, milestone_ids in by_delta.items():
+            cls.apply_task_delta(cls.objects.filter(pk__in=milestone_ids), done_tasks=delta)
+    
+    @classmethod
+    def rebuild_counters(cls, milestone_ids=None):
+        """Recompute task counts, progress and status from the task links in one UPDATE (drift repair)"""
+        milestones = cls.objects.all()
+        if milestone_ids is not None:
+            milestones = milestones.filter(pk__in=milestone_ids)
         
-        self.save(update_fields=['progress', 'status', 'completed_at'])
+        links = cls.tasks.through.objects.filter(milestone_id=OuterRef('pk')).order_by().values('milestone_id')
+        task_count = Coalesce(Subquery(
+            links.annotate(total=Count('id')).values('total'), output_field=models.IntegerField()
+        ), 0)
+        done_task_count = Coalesce(Subquery(
+            links.filter(task__status='done').annotate(total=Count('id')).values('total'),
+            output_field=models.IntegerField()
+        ), 0)
+        return milestones.update(
+            task_count=task_count,
+            done_task_count=done_task_count,
+            **cls.derived_values(task_count, done_task_count)
+        )
+    
+    @classmethod
+    def mark_missed(cls):
+        """Flip every overdue, unfinished milestone that has tasks to 'missed' in one UPDATE"""
+        overdue = cls.objects.filter(
+            due_date__lt=timezone.localdate(), task_count__gt=0
+        ).exclude(status__in=['completed', 'missed'])
+        with transaction.atomic():
+            project_ids = set(overdue.values_list('project_id', flat=True))
+            updated = overdue.update(status='missed')
+            Project.bump_version(project_ids)
+        return updated
+    
+    def update_progress(self):
+        """Re-derive progress and status from the stored task counts (e.g. after a due date change)"""
+        Milestone.apply_task_delta(Milestone.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['progress', 'task_count', 'done_task_count', 'status', 'completed_at'])
 
 
 class ProjectTemplate(models.Model):
@@ -531,6 +994,8 @@ class RecurringTask(models.Model):
     start_date = models.DateField(default=timezone.now)
     end_date = models.DateField(null=True, blank=True, help_text="Optional end date for recurring task")
     last_created = models.DateTimeField(null=True, blank=True)
+    next_run_at = models.DateTimeField(null=True, blank=True,
+                                       help_text="Start of the next occurrence (empty once past end_date)")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -538,56 +1003,75 @@ class RecurringTask(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Due-work lookups scan only active rows, in run order
+            models.Index(fields=['next_run_at'], condition=Q(is_active=True), name='recurring_task_due_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.frequency})"
     
+    def save(self, *args, **kwargs):
+        """Reschedule from the last run whenever the schedule itself is saved"""
+        if isinstance(self.start_date, datetime):
+            # The field default is timezone.now
+            self.start_date = timezone.localdate(self.start_date)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'next_run_at' in update_fields:
+            self.next_run_at = next_run_at(self.start_date, self.end_date, self.frequency, after=self.last_created)
+        super().save(*args, **kwargs)
+    
     def should_create_task(self):
         """Check if it's time to create a new task instance"""
-        if not self.is_active:
-            return False
-        
-        # Check if end date has passed
-        if self.end_date and timezone.now().date() > self.end_date:
-            return False
-        
-        # If never created, create now
-        if not self.last_created:
-            return True
-        
-        # Calculate next due date based on frequency
-        from datetime import timedelta
-        last_date = self.last_created.date()
-        today = timezone.now().date()
-        
-        if self.frequency == 'daily':
-            return (today - last_date).days >= 1
-        elif self.frequency == 'weekly':
-            return (today - last_date).days >= 7
-        elif self.frequency == 'biweekly':
-            return (today - last_date).days >= 14
-        elif self.frequency == 'monthly':
-            return (today - last_date).days >= 30
-        elif self.frequency == 'quarterly':
-            return (today - last_date).days >= 90
-        
-        return False
+        return self.is_active and self.next_run_at is not None and self.next_run_at <= timezone.now()
     
     def create_task_instance(self):
-        """Create a new task instance from this recurring task"""
-        task = Task.objects.create(
-            project=self.project,
-            title=self.title,
-            description=self.description,
-            status='pending',
-            priority=self.priority,
-            assigned_to=self.assigned_to,
-            estimated_hours=self.estimated_hours,
-            impact=self.impact,
-            due_date=timezone.now().date() + timedelta(days=7)  # Default 7 days from creation
-        )
+        """Create a task instance for the current occurrence now and move on to the next one"""
+        today = timezone.localdate()
+        task = build_task(self, today)
+        task.save()
         
         self.last_created = timezone.now()
         self.save()
         
         return task
+
+
+class TaskImportJob(models.Model):
+    """Bulk task import from an uploaded CSV/NDJSON file, processed by Celery"""
+    
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='import_jobs')
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_import_jobs')
+    file = models.FileField(upload_to='task_imports/%Y/%m/%d/')
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    # Progress, updated after every chunk
+    progress = models.IntegerField(default=0, help_text="Percentage of the file processed (0-100)")
+    processed_rows = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    dependency_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="First row errors, capped")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Import into {self.project.name} ({self.status})"
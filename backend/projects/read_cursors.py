@@ -0,0 +1,170 @@
+"""
+Per-user read cursors for project messages.
+
+Instead of one row per (message, reader), each user has at most one
+MessageReadCursor per project holding the id of the last message they have
+read there. A message counts as read by a user if it is theirs or its id is
+at or below their cursor for its project, so:
+
+    mark_read(user, project_id, message_id)   one UPDATE (plus an INSERT the first time)
+    unread_messages(user, project_ids)        one range per project on (project, id)
+    read_positions(user, project_ids)         cursors for is_read checks (one query)
+
+Cursors only move forward.
+
+Each user's unread total is also kept as a Redis counter (see
+notifications/unread.py): messages count up for every other project member
+when created (see projects/signals.py) and marking read counts the messages
+the cursor moved past down, so ``unread_message_count`` never queries.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from notifications.unread import MESSAGES, adjust, unread_count
+
+from .team_dashboard import RECENT_MESSAGES, forget_sections
+
+
+def read_positions(user, project_ids=None):
+    """Map of project id -> id of the last message the user has read there"""
+    from .models import MessageReadCursor
+
+    cursors = MessageReadCursor.objects.filter(user_id=user.pk)
+    if project_ids is not None:
+        cursors = cursors.filter(project_id__in=project_ids)
+    return dict(cursors.values_list('project_id', 'last_read_message_id'))
+
+
+def is_read(message, user, positions):
+    """Whether ``user`` has read ``message``, given their ``read_positions``"""
+    return message.sender_id == user.pk or message.id <= positions.get(message.project_id, 0)
+
+
+def mark_read(user, project_id, message_id):
+    """Move the user's cursor in a project forward to ``message_id``; returns the number of messages newly read"""
+    from .models import MessageReadCursor, ProjectMessage
+
+    previous = read_positions(user, [project_id]).get(project_id)
+    if previous is not None and previous >= message_id:
+        return 0
+
+    now = timezone.now()
+    moved = MessageReadCursor.objects.filter(
+        user_id=user.pk, project_id=project_id, last_read_message_id__lt=message_id
+    ).update(last_read_message_id=message_id, last_read_at=now)
+    if not moved:
+        try:
+            with transaction.atomic():
+                MessageReadCursor.objects.create(
+                    user_id=user.pk, project_id=project_id, last_read_message_id=message_id, last_read_at=now
+                )
+        except IntegrityError:
+            # Already at or past message_id, or created concurrently: move forward only
+            moved = MessageReadCursor.objects.filter(
+                user_id=user.pk, project_id=project_id, last_read_message_id__lt=message_id
+            ).update(last_read_message_id=message_id, last_read_at=now)
+            if not moved:
+                return 0
+
+    newly_read = ProjectMessage.objects.filter(
+        project_id=project_id, id__gt=previous or 0, id__lte=message_id
+    ).exclude(sender_id=user.pk).count()
+    adjust(MESSAGES, {user.pk: -newly_read})
+    if newly_read:
+        # Their dashboard shows those messages as unread
+        forget_sections([user.pk], [RECENT_MESSAGES])
+    return newly_read
+
+
+def mark_project_read(user, project_id):
+    """Move the user's cursor to the latest message in the project; returns it (None if no messages)"""
+    from .models import ProjectMessage
+
+    latest = ProjectMessage.objects.filter(project_id=project_id).order_by('-id').values_list(
+        'id', flat=True
+    ).first()
+    if latest is not None:
+        mark_read(user, project_id, latest)
+    return latest
+
+
+def unread_filter(user, project_ids):
+    """Q matching messages in ``project_ids`` past the user's cursors (None when there are no projects)"""
+    project_ids = list(project_ids)
+    if not project_ids:
+        return None
+    positions = read_positions(user, project_ids)
+    ranges = reduce(or_, (
+        Q(project_id=project_id, id__gt=positions.get(project_id, 0)) for project_id in sorted(project_ids)
+    ))
+    return ranges & ~Q(sender_id=user.pk)
+
+
+def unread_messages(user, project_ids):
+    """Queryset of messages the user has not read in the given projects"""
+    from .models import ProjectMessage
+
+    condition = unread_filter(user, project_ids)
+    if condition is None:
+        return ProjectMessage.objects.none()
+    return ProjectMessage.objects.filter(condition)
+
+
+def unread_message_count(user):
+    """Unread messages across the user's projects, answered from the counter"""
+    from .access import accessible_project_ids
+
+    return unread_count(MESSAGES, user, lambda: unread_messages(user, accessible_project_ids(user)).count())
+
+
+def message_created(message):
+    """Count a new message as unread for every project member but its sender"""
+    from .models import ProjectMembership
+
+    member_ids = ProjectMembership.objects.filter(project_id=message.project_id).exclude(
+        user_id=message.sender_id
+    ).values_list('user_id', flat=True)
+    adjust(MESSAGES, {user_id: 1 for user_id in member_ids})
+
+
+def message_deleted(message):
+    """Stop counting a deleted message for the members who had not read it"""
+    from .models import MessageReadCursor, ProjectMembership
+
+    read = MessageReadCursor.objects.filter(
+        user_id=OuterRef('user_id'), project_id=message.project_id, last_read_message_id__gte=message.id
+    )
+    member_ids = ProjectMembership.objects.filter(project_id=message.project_id).exclude(
+        user_id=message.sender_id
+    ).exclude(Exists(read)).values_list('user_id', flat=True)
+    adjust(MESSAGES, {user_id: -1 for user_id in member_ids})
+
+
+def message_counts(user_ids=None):
+    """Unread messages per user from the database, for reconciliation (one query)"""
+    from .models import MessageReadCursor, ProjectMembership, ProjectMessage
+
+    cursor = MessageReadCursor.objects.filter(
+        user_id=OuterRef(OuterRef('user_id')), project_id=OuterRef(OuterRef('project_id'))
+    ).values('last_read_message_id')[:1]
+    unread = ProjectMessage.objects.filter(
+        project_id=OuterRef('project_id'), id__gt=Coalesce(Subquery(cursor), 0)
+    ).exclude(sender_id=OuterRef('user_id')).order_by().values('project_id').annotate(
+        unread=Count('id')
+    ).values('unread')
+
+    memberships = ProjectMembership.objects.all()
+    if user_ids is not None:
+        memberships = memberships.filter(user_id__in=user_ids)
+
+    counts = {}
+    for user_id, count in memberships.annotate(
+        unread=Coalesce(Subquery(unread), 0)
+    ).values_list('user_id', 'unread').iterator():
+        counts[user_id] = counts.get(user_id, 0) + count
+    return counts
@@ -0,0 +1,182 @@
+"""
+Scheduling and materialization of recurring tasks.
+
+A RecurringTask runs on occurrence dates derived from its ``start_date``
+and ``frequency`` (day steps, or calendar months anchored to the start day
+so that monthly runs stay on the same day of the month). ``next_run_at``
+holds the start of the next occurrence, and a partial index over active
+rows makes finding due work an index range scan.
+
+``materialize_due_tasks`` (driven by the ``materialize_recurring_tasks``
+beat job) claims due rows in batches with ``SELECT ... FOR UPDATE SKIP
+LOCKED`` so several workers can share the load, creates their task
+instances with ``bulk_create`` and advances ``next_run_at`` past now.
+After downtime only the latest ``MAX_CATCH_UP_RUNS`` missed occurrences
+of a row are created; older ones are skipped.
+"""
+import calendar
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+BATCH_SIZE = 500
+MAX_CATCH_UP_RUNS = 3
+DUE_IN_DAYS = 7
+
+# frequency -> (unit, step)
+FREQUENCY_STEPS = {
+    'daily': ('days', 1),
+    'weekly': ('days', 7),
+    'biweekly': ('days', 14),
+    'monthly': ('months', 1),
+    'quarterly': ('months', 3),
+}
+
+
+def occurrence(start_date, frequency, index):
+    """Date of the ``index``-th run (0 is the start date)"""
+    unit, step = FREQUENCY_STEPS[frequency]
+    if unit == 'days':
+        return start_date + timedelta(days=step * index)
+
+    months = start_date.month - 1 + step * index
+    year, month = start_date.year + months // 12, months % 12 + 1
+    return start_date.replace(
+        year=year, month=month, day=min(start_date.day, calendar.monthrange(year, month)[1])
+    )
+
+
+def last_occurrence_index(start_date, frequency, day):
+    """Index of the last run on or before ``day`` (-1 if ``day`` precedes the first run)"""
+    if day < start_date:
+        return -1
+    unit, step = FREQUENCY_STEPS[frequency]
+    if unit == 'days':
+        return (day - start_date).days // step
+
+    index = ((day.year - start_date.year) * 12 + day.month - start_date.month) // step
+    if occurrence(start_date, frequency, index) > day:
+        index -= 1
+    return index
+
+
+def run_time(day):
+    """Moment an occurrence becomes due: the start of its day in the current time zone"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def next_run_at(start_date, end_date, frequency, after=None):
+    """
+    Start of the first occurrence after the moment ``after`` (the first
+    occurrence when None), or None once the schedule is past ``end_date``.
+    """
+    index = 0
+    if after is not None:
+        index = last_occurrence_index(start_date, frequency, timezone.localdate(after)) + 1
+    day = occurrence(start_date, frequency, index)
+    if end_date and day > end_date:
+        return None
+    return run_time(day)
+
+
+def _runs(recurring, now):
+    """Occurrence dates due by ``now`` for a claimed row, oldest first, bounded by MAX_CATCH_UP_RUNS"""
+    start_date, frequency = recurring.start_date, recurring.frequency
+    first = last_occurrence_index(start_date, frequency, timezone.localdate(recurring.next_run_at))
+    last = last_occurrence_index(start_date, frequency, timezone.localdate(now))
+    if recurring.end_date:
+        last = min(last, last_occurrence_index(start_date, frequency, recurring.end_date))
+    first = max(first, last - MAX_CATCH_UP_RUNS + 1)
+    return [occurrence(start_date, frequency, index) for index in range(first, last + 1)]
+
+
+def build_task(recurring, day):
+    """Unsaved task instance of a recurring task for the occurrence on ``day``"""
+    from .models import Task
+
+    return Task(
+        project_id=recurring.project_id,
+        title=recurring.title,
+        description=recurring.description,
+        status='todo',
+        priority=recurring.priority,
+        assigned_to_id=recurring.assigned_to_id,
+        estimated_hours=recurring.estimated_hours,
+        impact=recurring.impact,
+        due_date=day + timedelta(days=DUE_IN_DAYS),
+    )
+
+
+def _created(tasks):
+    """Aggregates, rollups, search, live updates and notifications that Task.save would have handled"""
+    from notifications.utils import create_notifications, task_update_notifications
+    from realtime.events import publish_tasks
+    from search.indexing import index_tasks
+
+    from .models import Project
+    from .rollups import apply_task_changes, task_key
+    from .team_dashboard import forget_task_sections
+
+    per_project = defaultdict(lambda: [0, 0])
+    for task in tasks:
+        totals = per_project[task.project_id]
+        totals[0] += 1
+        totals[1] += task.impact or 0
+    for project_id, (count, impact) in per_project.items():
+        Project.apply_task_delta(project_id, tasks=count, impact=impact)
+
+    apply_task_changes([
+        (None, task_key(task.project_id, task.status, task.created_at, None)) for task in tasks
+    ])
+    index_tasks(tasks)
+    publish_tasks('tasks.created', tasks)
+    forget_task_sections(tasks)
+
+    assigned = [task for task in tasks if task.assigned_to_id]
+    if assigned:
+        def notify():
+            from .models import Task
+
+            create_notifications([
+                entry
+                for task in Task.objects.filter(id__in=[task.id for task in assigned]).select_related('assigned_to')
+                for entry in task_update_notifications(task, ['assigned_to'])
+            ])
+        transaction.on_commit(notify)
+
+
+def materialize_due_tasks(now=None, batch_size=BATCH_SIZE):
+    """Create the task instances of every due recurring task; returns the number of tasks created"""
+    from .models import RecurringTask, Task
+
+    now = now or timezone.now()
+    created = 0
+    while True:
+        with transaction.atomic():
+            due = list(
+                RecurringTask.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(is_active=True, next_run_at__lte=now)
+                .order_by('next_run_at')[:batch_size]
+            )
+            if not due:
+                return created
+
+            tasks = []
+            for recurring in due:
+                tasks.extend(build_task(recurring, day) for day in _runs(recurring, now))
+                recurring.last_created = now
+                recurring.next_run_at = next_run_at(
+                    recurring.start_date, recurring.end_date, recurring.frequency, after=now
+                )
+                recurring.updated_at = now
+
+            Task.objects.bulk_create(tasks)
+            RecurringTask.objects.bulk_update(due, ['last_created', 'next_run_at', 'updated_at'])
+            if tasks:
+                _created(tasks)
+            created += len(tasks)
+
+        if len(due) < batch_size:
+            return created
@@ -0,0 +1,174 @@
+"""
+Versioned caching of expensive read responses.
+
+Decorate a DRF handler (an APIView method or a viewset action) with the
+projects its response is computed from:
+
+    @cache_response(projects=url_project)
+    def stats(self, request, pk=None): ...
+
+    @cache_response(projects=user_projects, vary_on=lambda request: [...])
+    def get(self, request): ...
+
+The cache key holds the handler name, the user, the query parameters and
+URL kwargs, the day, any ``vary_on`` values and the (id, version) of every
+project involved. Project.version is bumped by each write those responses
+show (see projects/versions.py), so a write moves readers to a new key
+instead of waiting for a TTL; the old entry just expires. The project
+list is the user's access set, so membership changes are covered too.
+
+Concurrent misses on one key are single-flighted: the first request takes
+a short lock (``cache.add``) and computes, the others wait for its entry
+for up to LOCK_WAIT seconds before computing themselves.
+
+Hits, misses and coalesced waits are counted per handler in the cache
+(``response_cache_stats``, ``manage.py response_cache_stats``) and each
+response says which it was in an ``X-Cache`` header.
+"""
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .access import accessible_project_ids, has_project_access
+from .versions import project_versions
+
+CACHE_TIMEOUT = 60 * 10
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 5
+POLL_INTERVAL = 0.05
+
+HIT = 'hit'
+MISS = 'miss'
+COALESCED = 'coalesced'
+OUTCOMES = (HIT, MISS, COALESCED)
+
+# Names of every decorated handler, for response_cache_stats()
+registry = set()
+
+
+def user_projects(view, request, *args, **kwargs):
+    """Every project the user can access"""
+    return accessible_project_ids(request.user)
+
+
+def url_project(view, request, *args, **kwargs):
+    """The project named by the ``pk`` URL kwarg; None (not cached) when inaccessible"""
+    pk = str(kwargs.get('pk', ''))
+    if pk.isdigit() and has_project_access(request.user, int(pk)):
+        return [int(pk)]
+    return None
+
+
+def _stats_key(name, outcome):
+    return f'response-cache:stats:{name}:{outcome}'
+
+
+def record(name, outcome):
+    key = _stats_key(name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # First event of its kind; a concurrent first one may be lost
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def response_cache_stats(names=None):
+    """{name: {'hit': n, 'miss': n, 'coalesced': n, 'hit_rate': float}}"""
+    names = sorted(registry if names is None else names)
+    keys = {(name, outcome): _stats_key(name, outcome) for name in names for outcome in OUTCOMES}
+    values = cache.get_many(keys.values())
+
+    stats = {}
+    for name in names:
+        counts = {outcome: values.get(keys[name, outcome], 0) for outcome in OUTCOMES}
+        served = sum(counts.values())
+        counts['hit_rate'] = round((counts[HIT] + counts[COALESCED]) / served, 3) if served else 0
+        stats[name] = counts
+    return stats
+
+
+def response_key(name, request, project_ids, kwargs, vary):
+    parts = [
+        sorted(request.query_params.lists()),
+        sorted((key, str(value)) for key, value in kwargs.items()),
+        str(timezone.localdate()),
+        list(vary),
+        project_versions(project_ids),
+    ]
+    digest = hashlib.sha1(json.dumps(parts, cls=DjangoJSONEncoder).encode()).hexdigest()
+    return f'response:{name}:{request.user.pk}:{digest}'
+
+
+def _cached(data):
+    response = Response(data)
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def _wait_for(key):
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        data = cache.get(key)
+        if data is not None:
+            return data
+    return None
+
+
+def cache_response(projects, timeout=CACHE_TIMEOUT, vary_on=None, name=None):
+    """
+    Cache the data of a handler's 200 responses under a versioned key.
+
+    ``projects(view, request, *args, **kwargs)`` returns the ids of the
+    projects the response is computed from, or None to skip the cache.
+    ``vary_on(request)`` returns extra values the response depends on
+    (e.g. user fields it echoes).
+    """
+    def decorator(method):
+        cache_name = name or method.__qualname__
+        registry.add(cache_name)
+
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            project_ids = projects(view, request, *args, **kwargs)
+            if project_ids is None:
+                return method(view, request, *args, **kwargs)
+
+            vary = vary_on(request) if vary_on else ()
+            key = response_key(cache_name, request, project_ids, kwargs, vary)
+            data = cache.get(key)
+            if data is not None:
+                record(cache_name, HIT)
+                return _cached(data)
+
+            lock = f'{key}:lock'
+            locked = cache.add(lock, 1, LOCK_TIMEOUT)
+            if not locked:
+                # Someone else is computing this response; use theirs
+                data = _wait_for(key)
+                if data is not None:
+                    record(cache_name, COALESCED)
+                    return _cached(data)
+
+            try:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    cache.set(key, response.data, timeout)
+            finally:
+                if locked:
+                    cache.delete(lock)
+            record(cache_name, MISS)
+            response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
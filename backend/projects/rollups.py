@@ -0,0 +1,165 @@
+"""
+Daily rollups of logged time and task throughput.
+
+``DailyTimeRollup`` holds minutes logged per (project, user, day) and
+``DailyTaskRollup`` holds tasks created and completed per (project, day).
+Reports read these instead of scanning time entries and tasks, so a range
+costs one row per day per project (and user) however much was logged.
+
+Rows are adjusted incrementally as time is logged and tasks are created,
+completed, reopened, moved or deleted (see TimeEntry.save, Task.save,
+Task.delete and TaskViewSet.bulk_update). A deleted user's time stays
+logged, so their rows are folded into the project's user-less rows just as
+their time entries are detached from them. Bulk imports and template
+instantiation rebuild their project with ``rebuild_rollups``, and the
+nightly ``reconcile_daily_rollups`` job rebuilds every project to settle
+any drift.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+RECONCILE_BATCH_SIZE = 200
+
+
+def _add(model, keys, deltas):
+    """Increment counters on the row identified by ``keys``, creating it if needed"""
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    increments = {name: F(name) + value for name, value in deltas.items()}
+    if model.objects.filter(**keys).update(**increments):
+        return
+    if all(value < 0 for value in deltas.values()):
+        # Nothing recorded to remove from; reconciliation settles it
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**keys, **deltas)
+    except IntegrityError:
+        # Created concurrently; add to that row instead
+        model.objects.filter(**keys).update(**increments)
+
+
+def record_time(project_id, user_id, day, minutes, entries=1):
+    """Add (or with negative values, remove) logged time"""
+    from .models import DailyTimeRollup
+
+    _add(
+        DailyTimeRollup,
+        {'project_id': project_id, 'user_id': user_id, 'date': day},
+        {'minutes': minutes, 'entry_count': entries},
+    )
+
+
+def move_task_time(task_id, from_project_id, to_project_id=None):
+    """Move a task's logged time between projects (or drop it when to_project_id is None)"""
+    from .models import TimeEntry
+
+    rows = TimeEntry.objects.filter(task_id=task_id).order_by().values('user_id', 'date').annotate(
+        minutes=Sum('duration_minutes'), entries=Count('id')
+    )
+    for row in rows:
+        record_time(from_project_id, row['user_id'], row['date'], -row['minutes'], -row['entries'])
+        if to_project_id:
+            record_time(to_project_id, row['user_id'], row['date'], row['minutes'], row['entries'])
+
+
+def release_user_time(user_id):
+    """Fold a user's rows into the user-less rows, as their time entries lose the user on delete"""
+    from .models import DailyTimeRollup
+
+    rows = DailyTimeRollup.objects.filter(user_id=user_id)
+    for row in rows.values('project_id', 'date', 'minutes', 'entry_count'):
+        record_time(row['project_id'], None, row['date'], row['minutes'], row['entry_count'])
+    rows.delete()
+
+
+def local_day(value):
+    """Calendar day of a datetime in the current time zone (what TruncDate groups by)"""
+    if value is None:
+        return None
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def task_key(project_id, status, created_at, completed_at):
+    """(project, created day, completed day) a task is counted under"""
+    return project_id, local_day(created_at), local_day(completed_at) if status == 'done' else None
+
+
+def apply_task_changes(changes):
+    """
+    Apply (before, after) task_key pairs to DailyTaskRollup, netting them
+    per project and day first. None stands for a task not counted (before
+    creation, after deletion).
+    """
+    from .models import DailyTaskRollup
+
+    deltas = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for key, sign in ((before, -1), (after, 1)):
+            if key is None:
+                continue
+            project_id, created_day, completed_day = key
+            deltas.setdefault((project_id, created_day), [0, 0])[0] += sign
+            if completed_day is not None:
+                deltas.setdefault((project_id, completed_day), [0, 0])[1] += sign
+
+    for (project_id, day), (created, completed) in deltas.items():
+        _add(
+            DailyTaskRollup,
+            {'project_id': project_id, 'date': day},
+            {'created_count': created, 'completed_count': completed},
+        )
+
+
+def rebuild_rollups(project_ids=None):
+    """Recompute rollup rows from time entries and tasks; returns the number of projects"""
+    from .models import DailyTaskRollup, DailyTimeRollup, Project, Task, TimeEntry
+
+    if project_ids is None:
+        project_ids = Project.objects.order_by('id').values_list('id', flat=True)
+    project_ids = list(project_ids)
+
+    for start in range(0, len(project_ids), RECONCILE_BATCH_SIZE):
+        batch = project_ids[start:start + RECONCILE_BATCH_SIZE]
+
+        time_rows = [
+            DailyTimeRollup(
+                project_id=row['task__project_id'], user_id=row['user_id'], date=row['date'],
+                minutes=row['minutes'], entry_count=row['entries']
+            )
+            for row in TimeEntry.objects.filter(task__project_id__in=batch).order_by().values(
+                'task__project_id', 'user_id', 'date'
+            ).annotate(minutes=Sum('duration_minutes'), entries=Count('id'))
+        ]
+
+        task_rows = {}
+        created = Task.objects.filter(project_id__in=batch).annotate(
+            day=TruncDate('created_at')
+        ).order_by().values('project_id', 'day').annotate(total=Count('id'))
+        for row in created:
+            task_rows[row['project_id'], row['day']] = DailyTaskRollup(
+                project_id=row['project_id'], date=row['day'], created_count=row['total']
+            )
+        completed = Task.objects.filter(
+            project_id__in=batch, status='done', completed_at__isnull=False
+        ).annotate(day=TruncDate('completed_at')).order_by().values('project_id', 'day').annotate(total=Count('id'))
+        for row in completed:
+            rollup = task_rows.setdefault(
+                (row['project_id'], row['day']),
+                DailyTaskRollup(project_id=row['project_id'], date=row['day'])
+            )
+            rollup.completed_count = row['total']
+
+        with transaction.atomic():
+            DailyTimeRollup.objects.filter(project_id__in=batch).delete()
+            DailyTaskRollup.objects.filter(project_id__in=batch).delete()
+            DailyTimeRollup.objects.bulk_create(time_rows, batch_size=1000)
+            DailyTaskRollup.objects.bulk_create(task_rows.values(), batch_size=1000)
+
+    return len(project_ids)
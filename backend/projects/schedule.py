@@ -0,0 +1,190 @@
+"""
+Critical path (CPM) scheduling over task dependencies.
+
+Durations come from ``Task.estimated_hours``. The dependency graph is split
+into topological levels; the forward and backward passes then walk the levels
+and handle each one with vectorised NumPy operations. The Python loop runs
+once per level, not once per task or edge.
+
+Results are cached under the project's version, which every task and
+dependency write increments, so an unchanged project is served from cache.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+
+from .dependencies import DependencyGraph
+
+HOURS_PER_DAY = 8
+SCHEDULE_CACHE_TIMEOUT = 60 * 60 * 24
+EPSILON = 1e-6
+
+
+class DependencyCycleError(ValueError):
+    """Raised when the dependencies loop, so no schedule exists"""
+
+    def __init__(self, cycles):
+        super().__init__('Task dependencies contain a cycle')
+        self.cycles = cycles
+
+
+def _csr(keys, count):
+    """Edge indices grouped by ``keys`` plus per-node offsets into them"""
+    order = np.argsort(keys, kind='stable')
+    offsets = np.searchsorted(keys[order], np.arange(count + 1))
+    return order, offsets
+
+
+def _gather(nodes, order, offsets):
+    """Indices of every edge whose key is one of ``nodes``"""
+    counts = offsets[nodes + 1] - offsets[nodes]
+    total = counts.sum()
+    if not total:
+        return np.empty(0, dtype=np.int64)
+    starts = np.repeat(offsets[nodes], counts)
+    steps = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return order[starts + steps]
+
+
+def _levels(count, pred, succ):
+    """Topological level of every node (Kahn's algorithm, a frontier at a time); -1 if on a cycle"""
+    level = np.full(count, -1, dtype=np.int64)
+    indegree = np.bincount(succ, minlength=count)
+    order, offsets = _csr(pred, count)
+
+    frontier = np.flatnonzero(indegree == 0)
+    depth = 0
+    while frontier.size:
+        level[frontier] = depth
+        targets = succ[_gather(frontier, order, offsets)]
+        indegree -= np.bincount(targets, minlength=count)
+        candidates = np.unique(targets)
+        frontier = candidates[indegree[candidates] == 0]
+        depth += 1
+    return level, depth
+
+
+def _split_by_level(values, level, depth):
+    """``values`` grouped into one array per level"""
+    order = np.argsort(level, kind='stable')
+    bounds = np.searchsorted(level[order], np.arange(1, depth))
+    return np.split(values[order], bounds)
+
+
+def compute_schedule(project):
+    """Forward/backward CPM pass over all tasks of ``project``"""
+    rows = list(
+        project.tasks.order_by('id').values_list('id', 'title', 'estimated_hours', 'due_date')
+    )
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    duration = np.fromiter((float(row[2] or 0) for row in rows), dtype=np.float64, count=len(rows))
+    count = len(rows)
+
+    # depends_on edges point from a task to its prerequisite; CPM runs prerequisite -> task
+    edges = np.array(DependencyGraph.for_project(project.id).edges(), dtype=np.int64).reshape(-1, 2)
+    succ_ids, pred_ids = edges[:, 0], edges[:, 1]
+    internal = np.isin(succ_ids, ids) & np.isin(pred_ids, ids)
+    succ = np.searchsorted(ids, succ_ids[internal])
+    pred = np.searchsorted(ids, pred_ids[internal])
+
+    level, depth = _levels(count, pred, succ)
+    if (level < 0).any():
+        raise DependencyCycleError(DependencyGraph(edges.tolist()).cycles())
+
+    nodes_by_level = _split_by_level(np.arange(count), level, depth)
+    out_by_level = _split_by_level(np.arange(len(pred)), level[pred], depth)
+    in_by_level = _split_by_level(np.arange(len(succ)), level[succ], depth)
+
+    # Forward pass: earliest start is the latest finish among prerequisites
+    earliest_start = np.zeros(count)
+    earliest_finish = np.zeros(count)
+    for nodes, out_edges in zip(nodes_by_level, out_by_level):
+        earliest_finish[nodes] = earliest_start[nodes] + duration[nodes]
+        np.maximum.at(earliest_start, succ[out_edges], earliest_finish[pred[out_edges]])
+
+    # Backward pass: latest finish is the earliest latest-start among dependents
+    finish = earliest_finish.max() if count else 0.0
+    latest_start = np.zeros(count)
+    latest_finish = np.full(count, finish)
+    for nodes, in_edges in zip(reversed(nodes_by_level), reversed(in_by_level)):
+        latest_start[nodes] = latest_finish[nodes] - duration[nodes]
+        np.minimum.at(latest_finish, pred[in_edges], latest_start[succ[in_edges]])
+
+    slack = latest_start - earliest_start
+    critical = slack <= EPSILON
+
+    tasks = [
+        {
+            'id': row[0],
+            'title': row[1],
+            'duration': dur,
+            'earliest_start': es,
+            'earliest_finish': ef,
+            'latest_start': ls,
+            'latest_finish': lf,
+            'slack': sl,
+            'critical': crit,
+            'due_date': row[3],
+        }
+        for row, dur, es, ef, ls, lf, sl, crit in zip(
+            rows,
+            duration.round(2).tolist(),
+            earliest_start.round(2).tolist(),
+            earliest_finish.round(2).tolist(),
+            latest_start.round(2).tolist(),
+            latest_finish.round(2).tolist(),
+            slack.round(2).tolist(),
+            critical.tolist(),
+        )
+    ]
+
+    finish_date = None
+    if project.start_date:
+        # Work finishing within the first HOURS_PER_DAY hours lands on the start date
+        offsets = np.maximum(np.ceil(earliest_finish / HOURS_PER_DAY) - 1, 0).astype(int).tolist()
+        for task, offset in zip(tasks, offsets):
+            task['projected_finish'] = project.start_date + timedelta(days=offset)
+            task['late'] = bool(task['due_date'] and task['projected_finish'] > task['due_date'])
+        finish_date = project.start_date + timedelta(
+            days=max(int(np.ceil(finish / HOURS_PER_DAY)) - 1, 0)
+        )
+
+    return {
+        'project_id': project.id,
+        'version': project.version,
+        'start_date': project.start_date,
+        'finish_date': finish_date,
+        'duration_hours': round(float(finish), 2),
+        'critical_path': _critical_chain(ids, pred, succ, earliest_start, earliest_finish, critical),
+        'tasks': tasks,
+    }
+
+
+def _critical_chain(ids, pred, succ, earliest_start, earliest_finish, critical):
+    """One chain of critical tasks from a project start to the project finish"""
+    if not critical.any():
+        return []
+
+    order, offsets = _csr(succ, len(ids))
+    candidates = np.flatnonzero(critical)
+    node = candidates[np.argmax(earliest_finish[candidates])]
+    chain = [node]
+    while True:
+        preds = pred[order[offsets[node]:offsets[node + 1]]]
+        preds = preds[critical[preds] & (np.abs(earliest_finish[preds] - earliest_start[node]) <= EPSILON)]
+        if not preds.size:
+            break
+        node = preds.min()
+        chain.append(node)
+    return ids[chain[::-1]].tolist()
+
+
+def get_schedule(project):
+    """Schedule for ``project``, cached until its version or start date changes"""
+    key = f'project-schedule:{project.id}:{project.version}:{project.start_date}'
+    schedule = cache.get(key)
+    if schedule is None:
+        schedule = compute_schedule(project)
+        cache.set(key, schedule, SCHEDULE_CACHE_TIMEOUT)
+    return schedule
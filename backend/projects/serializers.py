@@ -1,9 +1,14 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db.models import Count, Exists, IntegerField, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
 from .models import (
     Project, Task, Comment, ProjectActivity, TaskAttachment, ProjectMessage,
-    Milestone, ProjectTemplate, TaskTemplate, MilestoneTemplate, Subtask, Sprint
+    Milestone, ProjectTemplate, TaskTemplate, MilestoneTemplate, Subtask, Sprint,
+    TaskImportJob, TimeEntry
 )
+from .read_cursors import is_read, read_positions
+from .sprints import metric_aggregates
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -52,10 +57,22 @@ class SubtaskSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class TimeEntrySerializer(serializers.ModelSerializer):
+    """Serializer for logged time entries"""
+    task_title = serializers.CharField(source='task.title', read_only=True)
+    
+    class Meta:
+        model = TimeEntry
+        fields = [
+            'id', 'task', 'task_title', 'user_id', 'username', 'date', 'start_time', 'end_time',
+            'duration_minutes', 'note', 'manual_entry', 'logged_at'
+        ]
+        read_only_fields = fields
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     team_members = UserSerializer(many=True, read_only=True)
-    task_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Project
@@ -64,10 +81,7 @@ class ProjectSerializer(serializers.ModelSerializer):
             'team_members', 'start_date', 'end_date', 'budget', 'progress',
             'created_at', 'updated_at', 'task_count'
         ]
-        read_only_fields = ['created_at', 'updated_at']
-    
-    def get_task_count(self, obj):
-        return obj.tasks.count()
+        read_only_fields = ['created_at', 'updated_at', 'progress', 'task_count']
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -90,6 +104,7 @@ class TaskSerializer(serializers.ModelSerializer):
     blocking_tasks = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     blocked_by = serializers.SerializerMethodField()
     can_start = serializers.SerializerMethodField()
+    time_logs = serializers.SerializerMethodField()
     total_time_logged = serializers.SerializerMethodField()
     comment_count = serializers.SerializerMethodField()
     has_attachments = serializers.SerializerMethodField()
@@ -108,7 +123,7 @@ class TaskSerializer(serializers.ModelSerializer):
             'subtasks', 'subtask_progress',
             'created_at', 'updated_at', 'completed_at', 'comment_count', 'has_attachments'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'time_logs', 'active_timer']
+        read_only_fields = ['created_at', 'updated_at', 'active_timer']
     
     def get_blocked_by(self, obj):
         """Get incomplete dependencies"""
@@ -119,6 +134,10 @@ class TaskSerializer(serializers.ModelSerializer):
         """Check if task can be started"""
         return obj.can_start()
     
+    def get_time_logs(self, obj):
+        """Get logged time entries"""
+        return TimeEntrySerializer(obj.time_entries.all(), many=True).data
+    
     def get_total_time_logged(self, obj):
         """Get total time logged in hours"""
         return obj.get_total_time_logged()
@@ -167,23 +186,30 @@ class TaskSerializer(serializers.ModelSerializer):
             task.assigned_to_multiple.set(assigned_to_multiple_ids)
         
         if depends_on is not None:
-            # Validate no circular dependencies
-            self.validate_dependencies(task, depends_on)
             task.depends_on.set(depends_on)
         
         return task
     
+    def validate_depends_on(self, value):
+        """Reject cycles before anything is saved (new tasks have no dependents yet)"""
+        if self.instance is not None:
+            self.validate_dependencies(self.instance, value)
+        return value
+    
     def validate_dependencies(self, task, depends_on):
-        """Validate no circular dependencies"""
-        for dep_task in depends_on:
-            if dep_task.id == task.id:
-                raise serializers.ValidationError("Task cannot depend on itself")
-            
-            # Check if dep_task depends on current task (circular dependency)
-            if task in dep_task.depends_on.all():
-                raise serializers.ValidationError(
-                    f"Circular dependency detected: {dep_task.title} already depends on this task"
-                )
+        """Validate no circular dependencies (of any length, across projects)"""
+        from .dependencies import DependencyGraph
+        
+        dependency_ids = [dep_task.id for dep_task in depends_on]
+        if task.id in dependency_ids:
+            raise serializers.ValidationError("Task cannot depend on itself")
+        
+        cycle = DependencyGraph.spanning(task.project_id, dependency_ids).cycle_with(task.id, dependency_ids)
+        if cycle:
+            titles = dict(Task.objects.filter(id__in=cycle).values_list('id', 'title'))
+            raise serializers.ValidationError(
+                "Circular dependency detected: " + " -> ".join(titles.get(i, str(i)) for i in cycle)
+            )
     
     def validate_impact(self, value):
         """Validate that impact is between 0 and 100"""
@@ -198,6 +224,78 @@ class TaskSerializer(serializers.ModelSerializer):
         return obj.attachments.filter(is_proof_of_completion=True).exists()
 
 
+class TaskListSerializer(TaskSerializer):
+    """
+    TaskSerializer for list endpoints.
+    
+    Reads counts from annotations and relations from prefetch caches, so a
+    page of tasks is served in a fixed number of queries when the queryset
+    is prepared with optimize_queryset(); unprepared instances still work,
+    one query per relation.
+    """
+    
+    @staticmethod
+    def optimize_queryset(queryset):
+        """Annotate counts and prefetch every relation the serializer touches"""
+        comment_count = Comment.objects.filter(task=OuterRef('pk')).order_by().values('task').annotate(
+            total=Count('pk')
+        ).values('total')
+        
+        time_logged = TimeEntry.objects.filter(task=OuterRef('pk')).order_by().values('task').annotate(
+            total=Sum('duration_minutes')
+        ).values('total')
+        
+        return queryset.select_related('project', 'assigned_to').annotate(
+            comment_total=Coalesce(Subquery(comment_count, output_field=IntegerField()), 0),
+            time_logged_minutes=Coalesce(Subquery(time_logged, output_field=IntegerField()), 0),
+            has_proof=Exists(
+                TaskAttachment.objects.filter(task=OuterRef('pk'), is_proof_of_completion=True)
+            ),
+        ).prefetch_related(
+            'assigned_to_multiple',
+            Prefetch('depends_on', queryset=Task.objects.only('id', 'title', 'status')),
+            Prefetch('blocking_tasks', queryset=Task.objects.only('id')),
+            Prefetch('subtasks', queryset=Subtask.objects.select_related('assigned_to', 'completed_by')),
+            'time_entries',
+        )
+    
+    def get_blocked_by(self, obj):
+        """Get incomplete dependencies from the prefetched dependency list"""
+        return [
+            {'id': t.id, 'title': t.title, 'status': t.status}
+            for t in obj.depends_on.all() if t.status != 'done'
+        ]
+    
+    def get_can_start(self, obj):
+        """Check if task can be started"""
+        return all(t.status == 'done' for t in obj.depends_on.all())
+    
+    def get_total_time_logged(self, obj):
+        if not hasattr(obj, 'time_logged_minutes'):
+            return super().get_total_time_logged(obj)
+        return round(obj.time_logged_minutes / 60, 2)
+    
+    def get_comment_count(self, obj):
+        if not hasattr(obj, 'comment_total'):
+            return super().get_comment_count(obj)
+        return obj.comment_total
+    
+    def get_has_attachments(self, obj):
+        if not hasattr(obj, 'has_proof'):
+            return super().get_has_attachments(obj)
+        return obj.has_proof
+    
+    def get_subtask_progress(self, obj):
+        """Calculate subtask completion progress from the prefetched subtasks"""
+        subtasks = obj.subtasks.all()
+        total = len(subtasks)
+        if total == 0:
+            return {'total': 0, 'completed': 0, 'percentage': 0}
+        
+        completed = sum(1 for subtask in subtasks if subtask.is_completed)
+        return {'total': total, 'completed': completed, 'percentage': int((completed / total) * 100)}
+
+
 class CommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
@@ -301,15 +399,30 @@ class ProjectMessageSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at', 'is_edited']
     
+    @staticmethod
+    def optimize_queryset(queryset):
+        """Annotate reply counts and load senders and mentions up front"""
+        reply_count = ProjectMessage.objects.filter(parent=OuterRef('pk')).order_by().values('parent').annotate(
+            total=Count('pk')
+        ).values('total')
+        
+        return queryset.select_related('sender').annotate(
+            reply_total=Coalesce(Subquery(reply_count, output_field=IntegerField()), 0)
+        ).prefetch_related('mentions')
+    
     def get_replies_count(self, obj):
         """Get count of replies to this message"""
+        if hasattr(obj, 'reply_total'):
+            return obj.reply_total
         return obj.replies.count()
     
     def get_is_read(self, obj):
-        """Check if current user has read this message"""
+        """Check the message against the current user's read cursors (loaded once per serializer)"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.read_by.filter(id=request.user.id).exists()
+            if '_read_positions' not in self.context:
+                self.context['_read_positions'] = read_positions(request.user)
+            return is_read(obj, request.user, self.context['_read_positions'])
         return False
     
     def create(self, validated_data):
@@ -324,74 +437,9 @@ class ProjectMessageSerializer(serializers.ModelSerializer):
         return message
 
 
-class TeamMemberDashboardSerializer(serializers.Serializer):
-    """Serializer for team member dashboard data"""
-    projects = serializers.SerializerMethodField()
-    assigned_tasks = serializers.SerializerMethodField()
-    recent_messages = serializers.SerializerMethodField()
-    stats = serializers.SerializerMethodField()
-    
-    def get_projects(self, user):
-        """Get projects where user is owner or team member"""
-        from django.db.models import Q
-        projects = Project.objects.filter(
-            Q(owner=user) | Q(team_members=user)
-        ).distinct()
-        return ProjectSerializer(projects, many=True, context=self.context).data
-    
-    def get_assigned_tasks(self, user):
-        """Get tasks assigned to the user"""
-        tasks = Task.objects.filter(assigned_to=user).select_related(
-            'project', 'assigned_to'
-        ).order_by('-created_at')[:10]
-        return TaskSerializer(tasks, many=True, context=self.context).data
-    
-    def get_recent_messages(self, user):
-        """Get recent messages from projects user is part of"""
-        from django.db.models import Q
-        user_projects = Project.objects.filter(
-            Q(owner=user) | Q(team_members=user)
-        ).distinct()
-        messages = ProjectMessage.objects.filter(
-            project__in=user_projects
-        ).select_related('sender', 'project').prefetch_related(
-            'mentions', 'read_by'
-        ).order_by('-created_at')[:20]
-        return ProjectMessageSerializer(messages, many=True, context=self.context).data
-    
-    def get_stats(self, user):
-        """Get user statistics"""
-        from django.db.models import Q
-        total_projects = Project.objects.filter(
-            Q(owner=user) | Q(team_members=user)
-        ).distinct().count()
-        total_tasks = Task.objects.filter(assigned_to=user).count()
-        completed_tasks = Task.objects.filter(assigned_to=user, status='done').count()
-        pending_tasks = Task.objects.filter(
-            assigned_to=user
-        ).exclude(status='done').count()
-        
-        # Unread messages count
-        user_projects = Project.objects.filter(
-            Q(owner=user) | Q(team_members=user)
-        ).distinct()
-        unread_messages = ProjectMessage.objects.filter(
-            project__in=user_projects
-        ).exclude(read_by=user).count()
-        
-        return {
-            'total_projects': total_projects,
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'pending_tasks': pending_tasks,
-            'unread_messages': unread_messages,
-            'completion_rate': round((completed_tasks / total_tasks * 100), 1) if total_tasks > 0 else 0
-        }
-
-
 class MilestoneSerializer(serializers.ModelSerializer):
     """Serializer for project milestones"""
-    tasks = TaskSerializer(many=True, read_only=True)
+    tasks = TaskListSerializer(many=True, read_only=True)
     task_ids = serializers.ListField(
         child=serializers.IntegerField(),
         write_only=True,
@@ -404,10 +452,12 @@ class MilestoneSerializer(serializers.ModelSerializer):
         model = Milestone
         fields = [
             'id', 'project', 'name', 'description', 'due_date', 'status',
-            'tasks', 'task_ids', 'progress', 'completed_at', 'is_overdue',
-            'created_at', 'updated_at'
+            'tasks', 'task_ids', 'progress', 'task_count', 'done_task_count',
+            'completed_at', 'is_overdue', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'progress', 'task_count', 'done_task_count', 'created_at', 'updated_at', 'completed_at'
         ]
-        read_only_fields = ['progress', 'created_at', 'updated_at', 'completed_at']
     
     def get_is_overdue(self, obj):
         """Check if milestone is overdue"""
@@ -503,6 +553,11 @@ class SprintSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at', 'completed_at']
     
+    @staticmethod
+    def optimize_queryset(queryset):
+        """Annotate every sprint metric with one grouped query"""
+        return queryset.annotate(**metric_aggregates())
+    
     def get_total_points(self, obj):
         """Get total story points in sprint"""
         return obj.get_total_points()
@@ -517,9 +572,23 @@ class SprintSerializer(serializers.ModelSerializer):
     
     def get_task_count(self, obj):
         """Get total number of tasks in sprint"""
-        return obj.tasks.count()
+        return obj.get_metrics()['task_count']
     
     def get_completed_task_count(self, obj):
         """Get number of completed tasks"""
-        return obj.tasks.filter(status='done').count()
+        return obj.get_metrics()['completed_task_count']
 
+
+class TaskImportJobSerializer(serializers.ModelSerializer):
+    """Serializer for bulk task import jobs (progress is read-only)"""
+    created_by = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = TaskImportJob
+        fields = [
+            'id', 'project', 'created_by', 'file_format', 'status',
+            'progress', 'processed_rows', 'created_count', 'dependency_count',
+            'error_count', 'errors',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,267 @@
+from django.contrib.auth.models import User
+from django.db.models import Count, Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .access import invalidate_project_access
+from .dependencies import invalidate_dependency_graph
+from .models import (
+    Comment, Milestone, MilestoneTemplate, Project, ProjectMembership, ProjectMessage, Sprint, Subtask,
+    Task, TaskAttachment, TaskTemplate, TimeEntry
+)
+from .read_cursors import message_created, message_deleted
+from .rollups import release_user_time
+from .team_dashboard import (
+    ASSIGNED_TASKS, PROJECTS, RECENT_MESSAGES, STATS, forget_project_sections, forget_sections
+)
+from .templates import invalidate_compiled_template
+
+
+# Keep the ProjectMembership index in sync with Project.owner
+@receiver(post_save, sender=Project)
+def sync_owner_membership(sender, instance, created, raw=False, **kwargs):
+    """Record the owner's membership on create and move it on ownership change"""
+    if raw:
+        return
+
+    if not created and not instance.tracker.has_changed('owner'):
+        return
+
+    touched = {instance.owner_id}
+    previous_owner_id = None if created else instance.tracker.previous('owner')
+    if previous_owner_id and previous_owner_id != instance.owner_id:
+        touched.add(previous_owner_id)
+        previous = ProjectMembership.objects.filter(project=instance, user_id=previous_owner_id)
+        if instance.team_members.filter(pk=previous_owner_id).exists():
+            previous.update(role='member')
+        else:
+            previous.delete()
+
+    ProjectMembership.objects.update_or_create(
+        project=instance, user_id=instance.owner_id, defaults={'role': 'owner'}
+    )
+    invalidate_project_access(touched)
+
+
+# Keep the ProjectMembership index in sync with Project.team_members
+@receiver(m2m_changed, sender=Project.team_members.through)
+def sync_team_memberships(sender, instance, action, reverse, pk_set, **kwargs):
+    """Mirror team_members add/remove/clear into ProjectMembership"""
+    if action == 'post_add':
+        if reverse:
+            pairs = [(instance.pk, project_id) for project_id in pk_set]
+        else:
+            pairs = [(user_id, instance.pk) for user_id in pk_set]
+        ProjectMembership.objects.bulk_create(
+            [ProjectMembership(user_id=user_id, project_id=project_id, role='member')
+             for user_id, project_id in pairs],
+            ignore_conflicts=True,
+        )
+        invalidate_project_access(user_id for user_id, _ in pairs)
+        # bulk_create sends no post_save for bump_project_version or invalidate_membership_cache
+        project_ids = {project_id for _, project_id in pairs}
+        Project.bump_version(project_ids)
+        forget_project_sections(project_ids, [PROJECTS])
+
+    elif action == 'post_remove':
+        if reverse:
+            removed = ProjectMembership.objects.filter(user_id=instance.pk, project_id__in=pk_set)
+        else:
+            removed = ProjectMembership.objects.filter(project_id=instance.pk, user_id__in=pk_set)
+        # Owners keep access regardless of team membership
+        removed = removed.filter(role='member')
+        user_ids = list(removed.values_list('user_id', flat=True))
+        removed.delete()
+        invalidate_project_access(user_ids)
+
+    elif action == 'post_clear':
+        if reverse:
+            removed = ProjectMembership.objects.filter(user_id=instance.pk, role='member')
+        else:
+            removed = ProjectMembership.objects.filter(project_id=instance.pk, role='member')
+        user_ids = list(removed.values_list('user_id', flat=True))
+        removed.delete()
+        invalidate_project_access(user_ids)
+
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def invalidate_membership_cache(sender, instance, **kwargs):
+    """Direct writes to the index (including project deletion cascades)"""
+    invalidate_project_access([instance.user_id])
+    # The other members' dashboards list the team
+    forget_project_sections([instance.project_id], [PROJECTS])
+
+
+# Drop cached dependency graphs and bump project versions when edges change
+@receiver(m2m_changed, sender=Task.depends_on.through)
+def invalidate_task_dependencies(sender, instance, action, reverse, pk_set, **kwargs):
+    """Any edit to depends_on (or blocking_tasks) invalidates the affected projects"""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    project_ids = {instance.project_id}
+    if reverse:
+        # instance is the dependency; the edges belong to the dependent tasks
+        dependents = Task.objects.filter(pk__in=pk_set) if pk_set else instance.blocking_tasks.all()
+        project_ids.update(dependents.values_list('project_id', flat=True))
+    invalidate_dependency_graph(project_ids)
+    Project.bump_version(project_ids)
+
+
+@receiver(post_save, sender=Task)
+def invalidate_moved_task_dependencies(sender, instance, created, raw=False, **kwargs):
+    """Moving a task to another project moves its edges with it"""
+    if raw or created or not instance.tracker.has_changed('project'):
+        return
+    invalidate_dependency_graph([instance.project_id, instance.tracker.previous('project')])
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_deleted_task_dependencies(sender, instance, **kwargs):
+    """Deleting a task cascades its edges without an m2m_changed signal"""
+    invalidate_dependency_graph([instance.project_id])
+
+
+# Keep milestone task counts (and so progress/status) in step with the task links
+@receiver(m2m_changed, sender=Milestone.tasks.through)
+def sync_milestone_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    """Shift counts on add/remove/clear; removals are counted before the rows go"""
+    if action not in ('post_add', 'pre_remove', 'pre_clear'):
+        return
+    sign = 1 if action == 'post_add' else -1
+
+    if reverse:
+        # instance is a task, pk_set its milestones
+        milestones = Milestone.objects.filter(tasks=instance.pk)
+        if action == 'post_add':
+            milestones = Milestone.objects.filter(pk__in=pk_set)
+        elif action == 'pre_remove':
+            milestones = milestones.filter(pk__in=pk_set)
+        Milestone.apply_task_delta(
+            milestones, tasks=sign, done_tasks=sign * int(instance.status == 'done')
+        )
+        Project.bump_version([instance.project_id])
+        return
+
+    # instance is a milestone, pk_set tasks (post_add only reports newly linked ones)
+    tasks = Task.objects.filter(pk__in=pk_set) if action == 'post_add' else instance.tasks.all()
+    if action == 'pre_remove':
+        tasks = tasks.filter(pk__in=pk_set)
+    totals = tasks.aggregate(count=Count('id'), done=Count('id', filter=Q(status='done')))
+    if totals['count']:
+        Milestone.apply_task_delta(
+            Milestone.objects.filter(pk=instance.pk),
+            tasks=sign * totals['count'], done_tasks=sign * totals['done']
+        )
+        Project.bump_version([instance.project_id])
+
+
+# Bump project versions (ETags of the project read endpoints, see projects/versions.py)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Milestone)
+@receiver(post_delete, sender=Milestone)
+@receiver(post_save, sender=Sprint)
+@receiver(post_delete, sender=Sprint)
+@receiver(post_save, sender=ProjectMessage)
+@receiver(post_delete, sender=ProjectMessage)
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def bump_project_version(sender, instance, raw=False, **kwargs):
+    """Rows of the project itself (task writes bump through Task.save/delete)"""
+    if not raw:
+        Project.bump_version([instance.project_id if sender is not Project else instance.pk])
+
+
+@receiver(post_save, sender=Subtask)
+@receiver(post_delete, sender=Subtask)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=TimeEntry)
+@receiver(post_delete, sender=TimeEntry)
+@receiver(post_save, sender=TaskAttachment)
+@receiver(post_delete, sender=TaskAttachment)
+def bump_task_project_version(sender, instance, raw=False, **kwargs):
+    """Task children shown in task lists (counts, subtask progress, proof flag)"""
+    if not raw:
+        Project.bump_version(Task.objects.filter(pk=instance.task_id).values('project_id'))
+
+
+# Keep team dashboard snapshots in step (see projects/team_dashboard.py)
+@receiver(post_save, sender=Task)
+def refresh_task_dashboards(sender, instance, created, raw=False, **kwargs):
+    """Assignees (old and new) see the task; members see the project's task count and progress"""
+    if raw:
+        return
+    previous = {} if created else {
+        'assigned_to': instance.tracker.previous('assigned_to'),
+        'project': instance.tracker.previous('project'),
+    }
+    forget_sections({instance.assigned_to_id, previous.get('assigned_to')}, [ASSIGNED_TASKS, STATS])
+    if created or any(instance.tracker.has_changed(field) for field in ('status', 'impact', 'project')):
+        forget_project_sections({instance.project_id, previous.get('project')}, [PROJECTS])
+
+
+@receiver(post_delete, sender=Task)
+def refresh_deleted_task_dashboards(sender, instance, **kwargs):
+    forget_sections([instance.assigned_to_id], [ASSIGNED_TASKS, STATS])
+    forget_project_sections([instance.project_id], [PROJECTS])
+
+
+@receiver(post_save, sender=Subtask)
+@receiver(post_delete, sender=Subtask)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=TimeEntry)
+@receiver(post_delete, sender=TimeEntry)
+@receiver(post_save, sender=TaskAttachment)
+@receiver(post_delete, sender=TaskAttachment)
+def refresh_task_child_dashboards(sender, instance, raw=False, **kwargs):
+    """Counts, subtask progress and the proof flag of the assignee's task"""
+    if not raw:
+        forget_sections(
+            Task.objects.filter(pk=instance.task_id).values_list('assigned_to_id', flat=True), [ASSIGNED_TASKS]
+        )
+
+
+@receiver(post_save, sender=ProjectMessage)
+@receiver(post_delete, sender=ProjectMessage)
+def refresh_message_dashboards(sender, instance, raw=False, **kwargs):
+    if not raw:
+        forget_project_sections([instance.project_id], [RECENT_MESSAGES])
+
+
+@receiver(post_save, sender=Project)
+def refresh_project_dashboards(sender, instance, created, raw=False, **kwargs):
+    """Project fields, and the project name on the assigned tasks (new projects arrive via membership)"""
+    if not raw and not created:
+        forget_project_sections([instance.pk], [PROJECTS, ASSIGNED_TASKS])
+
+
+# Keep the members' unread message counters in step (see projects/read_cursors.py)
+@receiver(post_save, sender=ProjectMessage)
+def count_unread_message(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        message_created(instance)
+
+
+@receiver(post_delete, sender=ProjectMessage)
+def uncount_unread_message(sender, instance, **kwargs):
+    message_deleted(instance)
+
+
+# Drop compiled project templates when their rows change
+@receiver(post_save, sender=TaskTemplate)
+@receiver(post_delete, sender=TaskTemplate)
+@receiver(post_save, sender=MilestoneTemplate)
+@receiver(post_delete, sender=MilestoneTemplate)
+def invalidate_template_rows(sender, instance, **kwargs):
+    """Task/milestone template edits (including template deletion cascades)"""
+    invalidate_compiled_template([instance.project_template_id])
+
+
+# Keep a deleted user's logged time in the daily rollups
+@receiver(pre_delete, sender=User)
+def release_deleted_user_time(sender, instance, **kwargs):
+    """Their time entries are kept without a user, so their rollup rows are too"""
+    release_user_time(instance.pk)
@@ -0,0 +1,119 @@
+"""
+Sprint metrics and daily burndown snapshots.
+
+Sprint metrics (story points and task counts, total and done) come from one
+grouped aggregate: ``metric_aggregates()`` annotates a Sprint queryset so a
+list of sprints costs a single query (see SprintSerializer.optimize_queryset).
+
+``SprintSnapshot`` keeps one row per sprint per day holding those metrics as
+they stood at the end of that day. The row for today is rewritten whenever a
+sprint task is added, removed, re-estimated or changes status (see Task.save,
+Task.delete, TaskViewSet.bulk_update and SprintViewSet.complete_sprint), and
+the daily ``snapshot_active_sprints`` job writes a row for every active
+sprint so quiet days are present too. Burndown charts read these rows
+instead of replaying task history.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+METRIC_FIELDS = ('total_points', 'completed_points', 'task_count', 'completed_task_count')
+
+
+def metric_aggregates(prefix='tasks__'):
+    """Aggregate expressions for every sprint metric (``prefix`` is the path to the tasks)"""
+    done = Q(**{f'{prefix}status': 'done'})
+    return {
+        'total_points': Coalesce(Sum(f'{prefix}story_points'), 0),
+        'completed_points': Coalesce(Sum(f'{prefix}story_points', filter=done), 0),
+        'task_count': Count(f'{prefix}id'),
+        'completed_task_count': Count(f'{prefix}id', filter=done),
+    }
+
+
+def completion_percentage(total_points, completed_points):
+    if not total_points:
+        return 0
+    return round((completed_points / total_points) * 100, 1)
+
+
+def record_sprint_snapshots(sprint_ids, day=None):
+    """Write today's (or ``day``'s) snapshot for the given sprints; one query plus one upsert"""
+    from .models import Sprint, SprintSnapshot
+
+    sprint_ids = {sprint_id for sprint_id in sprint_ids if sprint_id}
+    if not sprint_ids:
+        return 0
+
+    day = day or timezone.localdate()
+    rows = Sprint.objects.filter(id__in=sprint_ids).order_by().annotate(
+        **metric_aggregates()
+    ).values('id', *METRIC_FIELDS)
+    snapshots = [
+        SprintSnapshot(sprint_id=row['id'], date=day, **{name: row[name] for name in METRIC_FIELDS})
+        for row in rows
+    ]
+    SprintSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['sprint', 'date'],
+        update_fields=[*METRIC_FIELDS, 'recorded_at'],
+    )
+    return len(snapshots)
+
+
+def snapshot_active_sprints(day=None):
+    """Snapshot every active sprint (so days without task changes still have a point)"""
+    from .models import Sprint
+
+    sprint_ids = list(Sprint.objects.filter(status='active').values_list('id', flat=True))
+    return record_sprint_snapshots(sprint_ids, day=day)
+
+
+def burndown(sprint):
+    """
+    Daily series from the sprint's start to its end (or today): actual
+    remaining points carried forward from the latest snapshot on or before
+    each day, and the ideal straight line from the starting scope to zero.
+    """
+    today = timezone.localdate()
+    snapshots = list(sprint.snapshots.order_by('date'))
+    if not snapshots and not sprint.start_date:
+        return []
+
+    first_day = sprint.start_date or snapshots[0].date
+    last_day = sprint.end_date or max(today, snapshots[-1].date if snapshots else first_day)
+    if last_day < first_day:
+        last_day = first_day
+
+    points = []
+    current = None
+    position = 0
+    for offset in range((last_day - first_day).days + 1):
+        day = first_day + timedelta(days=offset)
+        while position < len(snapshots) and snapshots[position].date <= day:
+            current = snapshots[position]
+            position += 1
+        recorded = current is not None and day <= max(today, current.date)
+        points.append({
+            'date': day,
+            'total_points': current.total_points if recorded else None,
+            'completed_points': current.completed_points if recorded else None,
+            'remaining_points': current.total_points - current.completed_points if recorded else None,
+            'task_count': current.task_count if recorded else None,
+            'completed_task_count': current.completed_task_count if recorded else None,
+        })
+
+    # Ideal line starts from the first recorded scope
+    scope = next((point['total_points'] for point in points if point['total_points'] is not None), 0)
+    steps = max(len(points) - 1, 1)
+    previous_completed = 0
+    for index, point in enumerate(points):
+        point['ideal_remaining'] = round(scope * (1 - index / steps), 1)
+        completed = point['completed_points']
+        point['points_completed'] = None if completed is None else completed - previous_completed
+        if completed is not None:
+            previous_completed = completed
+    return points
@@ -0,0 +1,102 @@
+"""
+Celery tasks for project background jobs
+"""
+from celery import shared_task
+from django.utils import timezone
+
+
+@shared_task(name='projects.tasks.import_tasks')
+def import_tasks(job_id):
+    """
+    Run a TaskImportJob: stream the uploaded file into tasks
+    Progress is saved on the job after every chunk
+    """
+    from .importer import TaskImporter
+    from .models import TaskImportJob
+    
+    try:
+        job = TaskImportJob.objects.select_related('project', 'created_by').get(id=job_id)
+    except TaskImportJob.DoesNotExist:
+        return f"Import job {job_id} not found"
+    
+    if job.status != 'pending':
+        return f"Import job {job_id} already {job.status}"
+    
+    try:
+        TaskImporter(job).run()
+    except Exception as e:
+        # Chunks already committed stay imported; the job records where it stopped
+        job.status = 'failed'
+        job.finished_at = timezone.now()
+        job.errors = job.errors + [{'row': None, 'errors': {'job': str(e)}}]
+        job.save(update_fields=['status', 'finished_at', 'errors', 'created_count',
+                                'error_count', 'processed_rows'])
+        
+        from projects.models import Project
+        from projects.rollups import rebuild_rollups
+        Project.rebuild_aggregates(project_ids=[job.project_id])
+        Project.bump_version([job.project_id])
+        rebuild_rollups([job.project_id])
+        return f"Import job {job_id} failed: {str(e)}"
+    
+    return f"Imported {job.created_count} tasks for job {job_id}"
+
+
+@shared_task(name='projects.tasks.reconcile_daily_rollups')
+def reconcile_daily_rollups():
+    """
+    Nightly rebuild of daily time/throughput rollups from the source rows
+    Settles drift from writes that bypassed the incremental updates
+    """
+    from .rollups import rebuild_rollups
+    
+    count = rebuild_rollups()
+    return f"Reconciled daily rollups for {count} projects"
+
+
+@shared_task(name='projects.tasks.snapshot_active_sprints')
+def snapshot_active_sprints():
+    """
+    Daily burndown point for every active sprint
+    Task changes rewrite the current day's snapshot; this fills in quiet days
+    """
+    from .sprints import snapshot_active_sprints as snapshot
+    
+    count = snapshot()
+    return f"Snapshotted {count} active sprints"
+
+
+@shared_task(name='projects.tasks.mark_missed_milestones')
+def mark_missed_milestones():
+    """
+    Flip overdue, unfinished milestones to 'missed'
+    One set-based UPDATE; task changes keep status current in between
+    """
+    from .models import Milestone
+    
+    count = Milestone.mark_missed()
+    return f"Marked {count} milestones as missed"
+
+
+@shared_task(name='projects.tasks.materialize_recurring_tasks')
+def materialize_recurring_tasks():
+    """
+    Create task instances for every due recurring task
+    Rows are claimed with SKIP LOCKED, so overlapping workers split the work
+    """
+    from .recurring import materialize_due_tasks
+    
+    count = materialize_due_tasks()
+    return f"Created {count} recurring task instances"
+
+
+@shared_task(name='projects.tasks.flush_project_activity')
+def flush_project_activity():
+    """
+    Write queued project activity events
+    Drains the shared Redis queue when PROJECT_ACTIVITY_LOG uses 'redis' mode
+    """
+    from .activity import flush_activity
+    
+    count = flush_activity()
+    return f"Flushed {count} activity events"
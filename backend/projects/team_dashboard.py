@@ -0,0 +1,163 @@
+"""
+Per-user snapshot of the team member dashboard (GET /api/team-dashboard/me/).
+
+The dashboard document is kept in the cache as one entry per section:
+
+    team-dashboard:<user id>:projects          the user's projects
+    team-dashboard:<user id>:assigned_tasks    the 10 latest tasks assigned to them
+    team-dashboard:<user id>:recent_messages   the 20 latest messages in their projects
+    team-dashboard:<user id>:stats             project and assigned task counts
+
+``dashboard(request)`` reads every section, plus the user's unread message
+counter (notifications/unread.py), with one ``get_many``. Sections that are
+missing are rebuilt from the database, each in a fixed number of queries
+whatever the number of projects, tasks or messages (see the builders
+below), and written back.
+
+Sections are maintained incrementally: the receivers in projects/signals.py
+and the read cursor and access helpers drop exactly the sections a write
+changes, for exactly the users who see it (``forget_sections``). A task
+status change drops the assignee's task and stats sections and, as it moves
+the project's progress, the projects section of each member. A new message
+drops the members' recent messages, and so on. Nothing else is rebuilt.
+Sections also expire after SNAPSHOT_TIMEOUT, which bounds how long rarer
+indirect changes (a renamed user, a dependency's status) can show.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+PROJECTS = 'projects'
+ASSIGNED_TASKS = 'assigned_tasks'
+RECENT_MESSAGES = 'recent_messages'
+STATS = 'stats'
+SECTIONS = (PROJECTS, ASSIGNED_TASKS, RECENT_MESSAGES, STATS)
+
+ASSIGNED_TASK_LIMIT = 10
+RECENT_MESSAGE_LIMIT = 20
+SNAPSHOT_TIMEOUT = 60 * 15
+
+
+def _section_key(user_id, section):
+    return f'team-dashboard:{user_id}:{section}'
+
+
+def forget_sections(user_ids, sections=SECTIONS):
+    """Drop sections of the given users' snapshots, now and after commit"""
+    keys = [_section_key(user_id, section) for user_id in set(user_ids) if user_id for section in sections]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    # A concurrent rebuild may cache pre-commit rows; drop them again once the write is visible
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def project_member_ids(project_ids):
+    """Users who can see any of ``project_ids`` (one query)"""
+    from .models import ProjectMembership
+
+    return set(ProjectMembership.objects.filter(
+        project_id__in=[project_id for project_id in project_ids if project_id]
+    ).values_list('user_id', flat=True))
+
+
+def forget_project_sections(project_ids, sections):
+    """Drop sections for every member of ``project_ids``"""
+    forget_sections(project_member_ids(project_ids), sections)
+
+
+def forget_task_sections(tasks):
+    """Bulk task writes that skip Task.save: their assignees' and project members' sections"""
+    assignee_ids = set()
+    for task in tasks:
+        assignee_ids.update((task.assigned_to_id, task.tracker.previous('assigned_to')))
+    forget_sections(assignee_ids, [ASSIGNED_TASKS, STATS])
+    forget_project_sections({task.project_id for task in tasks}, [PROJECTS])
+
+
+def _build_projects(request):
+    """3 queries: projects, owners, team members"""
+    from .access import accessible_projects
+    from .serializers import ProjectSerializer
+
+    projects = accessible_projects(request.user).select_related('owner').prefetch_related('team_members')
+    return ProjectSerializer(projects, many=True, context={'request': request}).data
+
+
+def _build_assigned_tasks(request):
+    """Fixed queries: the tasks and one per prefetched relation (see TaskListSerializer)"""
+    from .models import Task
+    from .serializers import TaskListSerializer
+
+    tasks = TaskListSerializer.optimize_queryset(
+        Task.objects.filter(assigned_to=request.user).order_by('-created_at')
+    )[:ASSIGNED_TASK_LIMIT]
+    return TaskListSerializer(tasks, many=True, context={'request': request}).data
+
+
+def _build_recent_messages(request):
+    """4 queries: messages with senders and reply counts, mentions, read cursors"""
+    from .access import accessible_project_ids
+    from .models import ProjectMessage
+    from .serializers import ProjectMessageSerializer
+
+    messages = ProjectMessageSerializer.optimize_queryset(
+        ProjectMessage.objects.filter(project_id__in=accessible_project_ids(request.user))
+    ).order_by('-created_at')[:RECENT_MESSAGE_LIMIT]
+    return ProjectMessageSerializer(messages, many=True, context={'request': request}).data
+
+
+def _build_stats(request):
+    """1 query (the access set is cached)"""
+    from .access import accessible_project_ids
+    from .models import Task
+
+    totals = Task.objects.filter(assigned_to=request.user).aggregate(
+        total=Count('id'), completed=Count('id', filter=Q(status='done'))
+    )
+    return {
+        'total_projects': len(accessible_project_ids(request.user)),
+        'total_tasks': totals['total'],
+        'completed_tasks': totals['completed'],
+        'pending_tasks': totals['total'] - totals['completed'],
+        'completion_rate': (
+            round((totals['completed'] / totals['total'] * 100), 1) if totals['total'] > 0 else 0
+        ),
+    }
+
+
+BUILDERS = {
+    PROJECTS: _build_projects,
+    ASSIGNED_TASKS: _build_assigned_tasks,
+    RECENT_MESSAGES: _build_recent_messages,
+    STATS: _build_stats,
+}
+
+
+def dashboard(request):
+    """The dashboard document for the requesting user: one cache read when the snapshot is warm"""
+    from notifications.unread import MESSAGES, counter_key
+    from .read_cursors import unread_message_count
+
+    user = request.user
+    keys = {section: _section_key(user.pk, section) for section in SECTIONS}
+    unread_key = counter_key(MESSAGES, user.pk)
+    cached = cache.get_many([*keys.values(), unread_key])
+
+    document = {}
+    rebuilt = {}
+    for section, key in keys.items():
+        if key in cached:
+            document[section] = cached[key]
+        else:
+            document[section] = rebuilt[key] = BUILDERS[section](request)
+    if rebuilt:
+        cache.set_many(rebuilt, SNAPSHOT_TIMEOUT)
+
+    unread = cached.get(unread_key)
+    document[STATS] = dict(
+        document[STATS],
+        unread_messages=max(unread, 0) if unread is not None else unread_message_count(user)
+    )
+    return document
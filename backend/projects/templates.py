@@ -0,0 +1,159 @@
+"""
+Project template instantiation.
+
+A template is first compiled into plain tuples (its task and milestone rows),
+which are cached so that repeated instantiations do not re-read the template
+tables. Instantiation then issues a fixed number of bulk inserts however many
+tasks the template has: tasks, dependency edges, milestones and milestone
+tasks. Project aggregates are computed once at the end.
+
+Compiled templates are dropped by ``invalidate_compiled_template`` whenever a
+template or one of its rows changes (see projects/signals.py).
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from search.indexing import index_tasks
+
+from .rollups import rebuild_rollups
+
+COMPILED_TEMPLATE_TIMEOUT = 60 * 60 * 24
+
+TemplateTask = namedtuple('TemplateTask', [
+    'order', 'title', 'description', 'priority', 'estimated_hours', 'impact',
+    'start_offset_days', 'duration_days', 'depends_on_order',
+])
+TemplateMilestone = namedtuple('TemplateMilestone', [
+    'name', 'description', 'due_offset_days', 'task_orders',
+])
+CompiledTemplate = namedtuple('CompiledTemplate', ['tasks', 'milestones'])
+
+
+def _cache_key(template_id):
+    return f'project-template:{template_id}'
+
+
+def compile_template(template, use_cache=True):
+    """Task and milestone rows of a template, read with two queries on a cache miss"""
+    key = _cache_key(template.pk)
+    if use_cache:
+        compiled = cache.get(key)
+        if compiled is not None:
+            return compiled
+
+    compiled = CompiledTemplate(
+        tasks=tuple(
+            TemplateTask(*row) for row in template.task_templates.order_by('order', 'id').values_list(
+                *TemplateTask._fields
+            )
+        ),
+        milestones=tuple(
+            TemplateMilestone(*row) for row in template.milestone_templates.order_by('order', 'id').values_list(
+                *TemplateMilestone._fields
+            )
+        ),
+    )
+    if use_cache:
+        cache.set(key, compiled, COMPILED_TEMPLATE_TIMEOUT)
+    return compiled
+
+
+def invalidate_compiled_template(template_ids):
+    """Drop compiled forms of the given templates, now and after commit"""
+    keys = [_cache_key(template_id) for template_id in set(template_ids) if template_id]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+@transaction.atomic
+def instantiate_template(template, owner, name, description='', start_date=None, use_cache=True):
+    """Create a project with the template's tasks, dependencies and milestones"""
+    from .models import Milestone, Project, Task
+
+    compiled = compile_template(template, use_cache=use_cache)
+    start_date = start_date or timezone.now().date()
+
+    end_date = None
+    if template.estimated_duration_days:
+        end_date = start_date + timedelta(days=template.estimated_duration_days)
+
+    project = Project.objects.create(
+        name=name,
+        description=description or template.description,
+        owner=owner,
+        status='planning',
+        priority=template.default_priority,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+    tasks = []
+    for row in compiled.tasks:
+        due_date = None
+        if row.duration_days:
+            due_date = start_date + timedelta(days=row.start_offset_days + row.duration_days)
+        tasks.append(Task(
+            project=project,
+            title=row.title,
+            description=row.description,
+            priority=row.priority,
+            estimated_hours=row.estimated_hours,
+            impact=row.impact,
+            due_date=due_date,
+            status='todo'
+        ))
+    Task.objects.bulk_create(tasks)
+    index_tasks(tasks)
+
+    # Template rows reference each other by order; a later duplicate order wins
+    task_ids = {row.order: task.id for row, task in zip(compiled.tasks, tasks)}
+
+    Edge = Task.depends_on.through
+    edges = {
+        (task_ids[row.order], task_ids[dep_order])
+        for row in compiled.tasks
+        for dep_order in row.depends_on_order or ()
+        if dep_order in task_ids
+    }
+    Edge.objects.bulk_create(
+        [Edge(from_task_id=source, to_task_id=target) for source, target in edges]
+    )
+
+    # New tasks are all 'todo', so milestones with tasks start at 0% and
+    # are 'missed' if already past due (as Milestone.derived_values would set)
+    today = timezone.now().date()
+    milestones = []
+    milestone_task_ids = []
+    for row in compiled.milestones:
+        due_date = start_date + timedelta(days=row.due_offset_days)
+        member_ids = {task_ids[order] for order in row.task_orders or () if order in task_ids}
+        milestones.append(Milestone(
+            project=project,
+            name=row.name,
+            description=row.description,
+            due_date=due_date,
+            status='missed' if member_ids and due_date < today else 'pending',
+            task_count=len(member_ids)
+        ))
+        milestone_task_ids.append(member_ids)
+    Milestone.objects.bulk_create(milestones)
+
+    MilestoneTask = Milestone.tasks.through
+    MilestoneTask.objects.bulk_create([
+        MilestoneTask(milestone_id=milestone.id, task_id=task_id)
+        for milestone, member_ids in zip(milestones, milestone_task_ids)
+        for task_id in member_ids
+    ])
+
+    # bulk_create skipped Task.save, so aggregates and rollups are computed once here
+    Project.rebuild_aggregates(project_ids=[project.id])
+    rebuild_rollups([project.id])
+    project.refresh_from_db()
+    return project
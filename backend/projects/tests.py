@@ -0,0 +1,1907 @@
+import json
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .access import accessible_project_ids
+from .activity import REDIS_QUEUE_KEY, record_activities, record_activity, recorder
+from .dependencies import DependencyGraph
+from .importer import TaskImporter
+from .models import (
+    Comment, DailyTaskRollup, DailyTimeRollup, MessageReadCursor, Milestone, MilestoneTemplate, Project,
+    ProjectActivity, ProjectMessage, ProjectTemplate, RecurringTask, Sprint, SprintSnapshot, Subtask, Task,
+    TaskAttachment, TaskImportJob, TaskTemplate, TimeEntry
+)
+from .read_cursors import mark_read, message_counts, read_positions
+from .recurring import MAX_CATCH_UP_RUNS, last_occurrence_index, materialize_due_tasks, occurrence
+from .response_cache import response_cache_stats, response_key
+from .rollups import rebuild_rollups
+from .serializers import TaskSerializer
+from .tasks import (
+    flush_project_activity, mark_missed_milestones, reconcile_daily_rollups, snapshot_active_sprints
+)
+from .team_dashboard import ASSIGNED_TASKS, PROJECTS, RECENT_MESSAGES, SECTIONS, STATS, _section_key
+from .templates import compile_template, instantiate_template
+
+
+class ProjectTestCase(TestCase):
+    """A project with an owner; caches are cleared as row ids are reused between tests"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', password='pass')
+        self.project = Project.objects.create(name='Apollo', owner=self.owner)
+
+
+class FieldTrackerTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.task = Task.objects.get(pk=Task.objects.create(project=self.project, title='Launch').pk)
+
+    def test_changes_are_reported_until_saved(self):
+        self.task.status = 'in_progress'
+        self.task.title = 'Liftoff'
+
+        self.assertEqual(self.task.tracker.changed_fields(), ['title', 'status'])
+        self.assertEqual(self.task.tracker.previous('status'), 'todo')
+
+        self.task.save()
+
+        self.assertEqual(self.task.tracker.changed_fields(), [])
+        self.assertEqual(self.task.tracker.previous('status'), 'in_progress')
+        self.assertEqual(self.task.tracker.previous('title'), 'Liftoff')
+
+    def test_save_with_update_fields_snapshots_only_written_fields(self):
+        self.task.status = 'review'
+        self.task.title = 'Unsaved'
+        self.task.save(update_fields=['status'])
+
+        self.assertEqual(self.task.tracker.previous('status'), 'review')
+        self.assertEqual(self.task.tracker.changed_fields(), ['title'])
+        self.assertEqual(self.task.tracker.previous('title'), 'Launch')
+
+    def test_fields_added_by_save_override_are_snapshotted(self):
+        self.task.status = 'done'
+        self.task.save(update_fields=['status'])
+        self.assertIsNotNone(self.task.tracker.previous('completed_at'))
+
+        # Task.save adds completed_at to update_fields when the status leaves done
+        self.task.status = 'todo'
+        self.task.save(update_fields=['status'])
+
+        self.assertIsNone(Task.objects.get(pk=self.task.pk).completed_at)
+        self.assertIsNone(self.task.tracker.previous('completed_at'))
+        self.assertEqual(self.task.tracker.changed_fields(), [])
+
+    def test_refresh_from_db_resets_snapshot(self):
+        Task.objects.filter(pk=self.task.pk).update(status='review', title='Renamed')
+        self.task.title = 'Local'
+
+        self.task.refresh_from_db(fields=['status'])
+        self.assertEqual(self.task.tracker.previous('status'), 'review')
+        self.assertEqual(self.task.tracker.changed_fields(), ['title'])
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.tracker.previous('title'), 'Renamed')
+        self.assertEqual(self.task.tracker.changed_fields(), [])
+
+    def test_unsaved_instances_report_every_field(self):
+        task = Task(project=self.project, title='Draft')
+
+        self.assertIsNone(task.tracker.previous('status'))
+        self.assertEqual(task.tracker.changed_fields(), list(Task.tracker.fields))
+
+
+class ProjectVersionTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = Project.objects.create(name='Gemini', owner=self.owner)
+        self.task = Task.objects.create(project=self.project, title='Launch')
+        Task.objects.create(project=self.project, title='Same project').depends_on.add(self.task)
+        Task.objects.create(project=self.other, title='Other project').depends_on.add(self.task)
+        self.task = Task.objects.get(pk=self.task.pk)
+
+    def versions(self):
+        return dict(Project.objects.values_list('id', 'version'))
+
+    def assertBumpedOnce(self, before):
+        after = self.versions()
+        self.assertEqual(after[self.project.pk], before[self.project.pk] + 1)
+        self.assertEqual(after[self.other.pk], before[self.other.pk] + 1)
+
+    def test_status_change_bumps_each_project_once(self):
+        before = self.versions()
+        self.task.status = 'done'
+        self.task.save()
+
+        self.assertBumpedOnce(before)
+        self.assertEqual(Project.rebuild_aggregates(), 0)
+
+    def test_title_change_bumps_dependent_projects_once(self):
+        before = self.versions()
+        self.task.title = 'Liftoff'
+        self.task.save()
+
+        self.assertBumpedOnce(before)
+
+
+class ConditionalGetTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.task = Task.objects.create(project=self.project, title='Launch')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def get(self, url, etag=None, **params):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, params, **headers)
+
+    def assertRevalidates(self, url, change, **params):
+        """304 for the current ETag until ``change()`` runs, then a 200 with a new ETag"""
+        first = self.get(url, **params)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'private, no-cache')
+        self.assertEqual(self.get(url, first['ETag'], **params).status_code, 304)
+
+        change()
+        second = self.get(url, first['ETag'], **params)
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_unchanged_lists_answer_304_without_reading_rows(self):
+        url = reverse('task-list')
+        etag = self.get(url)['ETag']
+        accessible_project_ids(self.owner)
+
+        # The version query only
+        with self.assertNumQueries(1):
+            response = self.get(url, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.get(url, '"other", ' + etag.removeprefix('W/')).status_code, 304)
+
+    def test_task_writes_change_the_etag(self):
+        url = reverse('task-list')
+
+        def complete():
+            self.task.status = 'done'
+            self.task.save()
+
+        self.assertRevalidates(url, complete)
+        self.assertRevalidates(url, lambda: Comment.objects.create(task=self.task, user=self.owner, content='Go'))
+        self.assertRevalidates(url, lambda: Task.objects.create(project=self.project, title='Orbit'))
+        self.assertRevalidates(url, lambda: Task.objects.get(pk=self.task.pk).delete())
+
+    def test_project_rows_change_the_etag(self):
+        self.assertRevalidates(
+            reverse('milestone-list'),
+            lambda: Milestone.objects.create(project=self.project, name='Orbit', due_date=date(2099, 1, 1)),
+        )
+        self.assertRevalidates(
+            reverse('sprint-list'),
+            lambda: Sprint.objects.create(
+                project=self.project, name='Sprint 1', start_date=date(2099, 1, 1), end_date=date(2099, 1, 14)
+            ),
+        )
+
+        def rename():
+            self.project.name = 'Artemis'
+            self.project.save()
+
+        self.assertRevalidates(reverse('project-detail', args=[self.project.pk]), rename)
+
+    def test_etag_is_scoped_to_project_and_user(self):
+        other = Project.objects.create(name='Gemini', owner=self.owner)
+        member = User.objects.create_user(username='member')
+        self.project.team_members.add(member)
+        url = reverse('task-list')
+        etag = self.get(url, project=self.project.pk)['ETag']
+
+        # Writes to another project leave a filtered list current
+        Task.objects.create(project=other, title='Docking')
+        self.assertEqual(self.get(url, etag, project=self.project.pk).status_code, 304)
+        self.assertNotEqual(self.get(url)['ETag'], etag)
+
+        # Bodies are per user
+        self.client.force_authenticate(member)
+        self.assertEqual(self.get(url, etag, project=self.project.pk).status_code, 200)
+
+    def test_inaccessible_projects_are_answered_normally(self):
+        stranger = User.objects.create_user(username='stranger')
+        self.client.force_authenticate(stranger)
+
+        response = self.get(reverse('project-detail', args=[self.project.pk]), '*')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+        response = self.get(reverse('task-list'), '*', project=self.project.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class AggregateDriftTests(ProjectTestCase):
+    """Incremental counters must always equal what a rebuild computes from the task table"""
+
+    def setUp(self):
+        super().setUp()
+        self.other = Project.objects.create(name='Gemini', owner=self.owner)
+        self.milestone = Milestone.objects.create(project=self.project, name='Orbit', due_date=date(2099, 1, 1))
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def stored(self):
+        return {
+            'projects': list(Project.objects.order_by('id').values(
+                'id', 'task_count', 'done_task_count', 'total_impact', 'done_impact', 'progress'
+            )),
+            'milestones': list(Milestone.objects.order_by('id').values(
+                'id', 'task_count', 'done_task_count', 'progress', 'status'
+            )),
+            # Incremental updates may leave rows at zero that a rebuild does not create
+            'task_rollups': sorted(
+                DailyTaskRollup.objects.exclude(created_count=0, completed_count=0).values_list(
+                    'project_id', 'date', 'created_count', 'completed_count'
+                )
+            ),
+            'time_rollups': sorted(
+                DailyTimeRollup.objects.exclude(entry_count=0).values_list(
+                    'project_id', 'user_id', 'date', 'minutes', 'entry_count'
+                )
+            ),
+        }
+
+    def assertNoDrift(self):
+        incremental = self.stored()
+        Project.rebuild_aggregates()
+        Milestone.rebuild_counters()
+        rebuild_rollups()
+        self.assertEqual(incremental, self.stored())
+
+    def create_task(self, project=None, **fields):
+        task = Task.objects.create(project=project or self.project, title='Task', **fields)
+        return Task.objects.get(pk=task.pk)
+
+    def test_create(self):
+        self.create_task(impact=Decimal('3'))
+        self.create_task(status='done')
+        self.assertNoDrift()
+
+    def test_status_flips(self):
+        task = self.create_task(impact=Decimal('2'))
+        self.milestone.tasks.add(task)
+        self.create_task(impact=Decimal('6'))
+
+        task.status = 'done'
+        task.save()
+        self.assertNoDrift()
+
+        task.status = 'review'
+        task.save(update_fields=['status'])
+        self.assertNoDrift()
+
+        task.status = 'done'
+        task.save(update_fields=['status'])
+        task.impact = Decimal('5')
+        task.save()
+        self.assertNoDrift()
+
+    def test_move_between_projects(self):
+        task = self.create_task(status='done', impact=Decimal('4'))
+        TimeEntry.objects.create(task=task, user=self.owner, date=date(2026, 1, 5), duration_minutes=90)
+        self.assertNoDrift()
+
+        task.project = self.other
+        task.save()
+        self.assertNoDrift()
+
+    def test_delete(self):
+        task = self.create_task(status='done', impact=Decimal('4'))
+        self.milestone.tasks.add(task)
+        TimeEntry.objects.create(task=task, user=self.owner, date=date(2026, 1, 5), duration_minutes=30)
+        self.create_task()
+
+        task.delete()
+        self.assertNoDrift()
+
+    def test_milestone_links(self):
+        done = self.create_task(status='done')
+        pending = self.create_task()
+        self.milestone.tasks.add(done, pending)
+        self.assertNoDrift()
+
+        self.milestone.tasks.remove(pending)
+        self.assertNoDrift()
+
+        done.milestones.clear()
+        self.assertNoDrift()
+
+    def test_bulk_update(self):
+        tasks = [self.create_task(impact=Decimal(impact)) for impact in ('1', '2', '0')]
+        tasks.append(self.create_task(project=self.other, status='done'))
+        self.milestone.tasks.add(tasks[0], tasks[1])
+        url = reverse('task-bulk-update')
+
+        for update in ({'status': 'done'}, {'status': 'in_progress'}, {'priority': 'high'}):
+            response = self.client.post(
+                url, {'task_ids': [task.pk for task in tasks], 'updates': update}, format='json'
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertNoDrift()
+
+    def test_progress_is_read_only(self):
+        self.create_task(status='done')
+        self.create_task()
+
+        response = self.client.patch(
+            reverse('project-detail', args=[self.project.pk]), {'progress': 90, 'task_count': 7}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['progress'], response.data['task_count']), (50, 2))
+        self.assertNoDrift()
+
+    def test_migration_backfills_progress(self):
+        backfill = import_module('projects.migrations.0010_project_progress_aggregates').backfill_progress_aggregates
+        self.create_task(status='done', impact=Decimal('3'))
+        self.create_task(impact=Decimal('1'))
+        self.create_task(project=self.other, status='done')
+        self.create_task(project=self.other)
+        empty = Project.objects.create(name='Vostok', owner=self.owner)
+        expected = self.stored()
+        # Rows as they were before the aggregates existed: hand-set progress, no counts
+        Project.objects.update(task_count=0, done_task_count=0, total_impact=0, done_impact=0, progress=33)
+
+        backfill(apps, None)
+
+        self.assertEqual(self.stored(), expected)
+        self.assertEqual(Project.objects.get(pk=empty.pk).progress, 0)
+
+
+class KeysetPaginationTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = reverse('task-list')
+
+    def create_tasks(self, count):
+        Task.objects.bulk_create(
+            Task(project=self.project, title=f'Task {number}') for number in range(count)
+        )
+        return list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [task['id'] for task in response.json()['results']]
+
+    def test_lists_are_unpaginated_unless_requested(self):
+        expected = self.create_tasks(60)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(task['id'] for task in response.json()), sorted(expected))
+
+    def test_cursor_round_trip_across_tied_timestamps(self):
+        self.create_tasks(7)
+        Task.objects.update(created_at=timezone.now())
+        expected = list(Task.objects.order_by('-id').values_list('id', flat=True))
+
+        pages = []
+        response = self.client.get(self.url, {'page_size': 3})
+        pages.append(self.ids(response))
+        self.assertIsNone(response.json()['previous'])
+        while response.json()['next']:
+            response = self.client.get(response.json()['next'])
+            pages.append(self.ids(response))
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([task_id for page in pages for task_id in page], expected)
+
+        # And back again from the last page
+        backwards = [pages[-1]]
+        while response.json()['previous']:
+            response = self.client.get(response.json()['previous'])
+            backwards.append(self.ids(response))
+        self.assertEqual(backwards[::-1], pages)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskListQueryTests(ProjectTestCase):
+    """The task list costs the same number of queries however many tasks it shows"""
+
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user(username='member', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create_project(self, name, task_count):
+        project = Project.objects.create(name=name, owner=self.owner)
+        previous = None
+        for number in range(task_count):
+            task = Task.objects.create(
+                project=project, title=f'Task {number}', assigned_to=self.member,
+                status='done' if number % 3 == 0 else 'todo'
+            )
+            task.assigned_to_multiple.add(self.owner, self.member)
+            if previous is not None:
+                task.depends_on.add(previous)
+            Subtask.objects.create(task=task, title='Check', is_completed=True, completed_by=self.owner)
+            Subtask.objects.create(task=task, title='Ship', assigned_to=self.member)
+            Comment.objects.create(task=task, user=self.owner, content='Looks good')
+            TimeEntry.objects.create(task=task, user=self.member, date=date(2026, 1, 5), duration_minutes=45)
+            TaskAttachment.objects.create(
+                task=task, user=self.member, file='task_attachments/proof.png', file_name='proof.png',
+                file_size=1024, is_proof_of_completion=True
+            )
+            previous = task
+        return project
+
+    def list_tasks(self, project):
+        return self.client.get(reverse('task-list'), {'project': project.pk})
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        small = self.create_project('Small', 5)
+        large = self.create_project('Large', 100)
+        # Prime the cached access set so both requests start from the same state
+        accessible_project_ids(self.owner)
+
+        for project, task_count in ((small, 5), (large, 100)):
+            with self.subTest(tasks=task_count), self.assertNumQueries(7):
+                response = self.list_tasks(project)
+            self.assertEqual(len(response.json()), task_count)
+
+    def test_list_matches_task_serializer(self):
+        project = self.create_project('Small', 5)
+
+        listed = {task['id']: task for task in self.list_tasks(project).json()}
+
+        for task in Task.objects.filter(project=project):
+            expected = json.loads(JSONRenderer().render(TaskSerializer(task).data))
+            self.assertEqual(listed[task.pk], expected)
+
+
+class BulkUpdateTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user(username='member', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create_tasks(self, count, project=None, **fields):
+        return [
+            Task.objects.create(project=project or self.project, title=f'Task {number}', **fields)
+            for number in range(count)
+        ]
+
+    def bulk_update(self, tasks, updates):
+        return self.client.post(
+            reverse('task-bulk-update'), {'task_ids': [task.pk for task in tasks], 'updates': updates}, format='json'
+        )
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        small = self.create_tasks(3)
+        large = self.create_tasks(40)
+        accessible_project_ids(self.owner)
+
+        counts = []
+        for tasks in (small, large):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.bulk_update(tasks, {'status': 'done', 'priority': 'high'})
+            self.assertEqual(response.json()['updated_count'], len(tasks))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_completed_at_follows_status(self):
+        finished = timezone.now() - timezone.timedelta(days=3)
+        done = self.create_tasks(1, status='done', completed_at=finished)
+        todo = self.create_tasks(2)
+
+        self.bulk_update(done + todo, {'status': 'done'})
+        completed = dict(Task.objects.values_list('id', 'completed_at'))
+        self.assertEqual(completed[done[0].pk], finished)
+        self.assertTrue(all(completed[task.pk] > finished for task in todo))
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.done_task_count, self.project.progress), (3, 100))
+
+        self.bulk_update(done + todo, {'status': 'todo'})
+        self.assertFalse(Task.objects.filter(completed_at__isnull=False).exists())
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.done_task_count, self.project.progress), (0, 0))
+
+    def test_only_accessible_tasks_are_updated(self):
+        hidden = self.create_tasks(1, project=Project.objects.create(name='Hidden', owner=self.member))
+        mine = self.create_tasks(2)
+
+        response = self.bulk_update(mine + hidden, {'priority': 'urgent'})
+
+        self.assertEqual(response.json()['updated_count'], 2)
+        self.assertEqual(Task.objects.get(pk=hidden[0].pk).priority, 'medium')
+
+    def test_members_may_only_change_status(self):
+        self.project.team_members.add(self.member)
+        tasks = self.create_tasks(2)
+        self.client.force_authenticate(self.member)
+
+        self.assertEqual(self.bulk_update(tasks, {'priority': 'high'}).status_code, 403)
+        self.assertEqual(self.bulk_update(tasks, {'status': 'review'}).status_code, 200)
+        self.assertEqual(set(Task.objects.values_list('status', 'priority')), {('review', 'medium')})
+
+    def test_invalid_values_are_rejected(self):
+        tasks = self.create_tasks(1)
+
+        for updates in ({'status': 'finished'}, {'due_date': 'soon'}, {'title': 'Renamed'}):
+            with self.subTest(**updates):
+                self.assertEqual(self.bulk_update(tasks, updates).status_code, 400)
+        self.assertEqual(self.bulk_update(tasks, {'assigned_to_id': 9999}).status_code, 404)
+
+
+class TaskImportTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        media_settings = self.settings(MEDIA_ROOT=media)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def upload(self, name, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('project-import-tasks', args=[self.project.pk]),
+                {'file': SimpleUploadedFile(name, content.encode())},
+                format='multipart'
+            )
+        self.assertEqual(response.status_code, 202)
+        return TaskImportJob.objects.get(pk=response.json()['id'])
+
+    def test_csv_import(self):
+        job = self.upload('tasks.csv', (
+            'external_id,title,status,impact,assigned_to,assignees,depends_on\n'
+            'a,Design,done,30,member,,\n'
+            'b,Build,todo,70,member@example.com,owner;member,a;c\n'
+            'c,Spec,,,,,\n'
+        ))
+
+        self.assertEqual((job.status, job.progress, job.created_count, job.error_count), ('completed', 100, 3, 0))
+        tasks = {task.title: task for task in Task.objects.filter(project=self.project)}
+        self.assertEqual(tasks['Build'].assigned_to, self.member)
+        self.assertEqual(set(tasks['Build'].assigned_to_multiple.all()), {self.owner, self.member})
+        self.assertEqual(set(tasks['Build'].depends_on.all()), {tasks['Design'], tasks['Spec']})
+        self.assertIsNotNone(tasks['Design'].completed_at)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.task_count, self.project.done_task_count, self.project.progress), (3, 1, 30))
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        job = self.upload('tasks.ndjson', '\n'.join([
+            json.dumps({'title': 'Good', 'due_date': '2026-02-01'}),
+            json.dumps({'title': '', 'status': 'finished'}),
+            json.dumps({'title': 'Stranger', 'assigned_to': 'nobody'}),
+            json.dumps({'title': 'Dangling', 'depends_on': ['missing']}),
+        ]))
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.created_count, 2)
+        self.assertEqual([error['row'] for error in job.errors], [2, 3, None])
+        self.assertEqual(set(job.errors[0]['errors']), {'title', 'status'})
+        self.assertEqual(set(job.errors[1]['errors']), {'assignees'})
+        self.assertEqual(set(Task.objects.values_list('title', flat=True)), {'Good', 'Dangling'})
+
+    def test_chunks_and_cycles(self):
+        existing = Task.objects.create(project=self.project, title='Existing')
+        rows = [{'external_id': f't{number}', 'title': f'Task {number}', 'depends_on': [f't{number + 1}']}
+                for number in range(5)]
+        rows[-1]['depends_on'] = ['t0']
+        rows.append({'title': 'After existing', 'depends_on': [str(existing.pk)]})
+        job = TaskImportJob.objects.create(
+            project=self.project, created_by=self.owner, file_format='ndjson',
+            file=SimpleUploadedFile('tasks.ndjson', '\n'.join(json.dumps(row) for row in rows).encode())
+        )
+
+        TaskImporter(job, chunk_size=2).run()
+
+        self.assertEqual((job.created_count, job.dependency_count), (6, 1))
+        self.assertIn('cycle', job.errors[0]['errors']['depends_on'][0])
+        self.assertEqual(list(Task.objects.get(title='After existing').depends_on.all()), [existing])
+        self.assertEqual(DependencyGraph.for_project(self.project.pk).cycles(), [])
+
+    def test_progress_is_visible_to_the_importer(self):
+        job = self.upload('tasks.csv', 'title\nOnly\n')
+
+        response = self.client.get(reverse('task-import-detail', args=[job.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['status'], response.json()['created_count']), ('completed', 1))
+
+
+class ProjectTemplateTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.template = self.create_template('Launch plan', 3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create_template(self, name, task_count):
+        template = ProjectTemplate.objects.create(
+            name=name, created_by=self.owner, default_priority='high', estimated_duration_days=30
+        )
+        TaskTemplate.objects.bulk_create(
+            TaskTemplate(
+                project_template=template, title=f'Step {order}', order=order, impact=Decimal('10'),
+                start_offset_days=order, duration_days=2, depends_on_order=[order - 1] if order else []
+            )
+            for order in range(task_count)
+        )
+        MilestoneTemplate.objects.create(
+            project_template=template, name='Halfway', due_offset_days=10, task_orders=[0, 1]
+        )
+        return template
+
+    def instantiate(self, template, name='Project'):
+        response = self.client.post(
+            reverse('project-template-create-project', args=[template.pk]),
+            {'name': name, 'start_date': '2099-01-01'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        return Project.objects.get(pk=response.json()['id'])
+
+    def test_instantiation(self):
+        project = self.instantiate(self.template)
+
+        self.assertEqual((project.owner, project.priority, project.end_date), (self.owner, 'high', date(2099, 1, 31)))
+        tasks = {task.title: task for task in project.tasks.all()}
+        self.assertEqual(tasks['Step 2'].due_date, date(2099, 1, 5))
+        self.assertEqual(list(tasks['Step 2'].depends_on.all()), [tasks['Step 1']])
+        milestone = project.milestones.get()
+        self.assertEqual(
+            (milestone.due_date, milestone.task_count, milestone.status), (date(2099, 1, 11), 2, 'pending')
+        )
+        self.assertEqual(set(milestone.tasks.all()), {tasks['Step 0'], tasks['Step 1']})
+        self.assertEqual((project.task_count, project.total_impact, project.progress), (3, 30, 0))
+        self.assertIn(project.pk, accessible_project_ids(self.owner))
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        large = self.create_template('Big plan', 40)
+        counts = []
+        for template in (self.template, large):
+            compile_template(template)
+            with CaptureQueriesContext(connection) as queries:
+                instantiate_template(template, self.owner, 'Project')
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_template_edits_reach_later_projects(self):
+        self.instantiate(self.template)
+
+        TaskTemplate.objects.create(project_template=self.template, title='Retro', order=9)
+        milestone = self.template.milestone_templates.get()
+        milestone.task_orders = [0]
+        milestone.save()
+
+        project = self.instantiate(self.template, name='Second')
+        self.assertIn('Retro', project.tasks.values_list('title', flat=True))
+        self.assertEqual(project.milestones.get().task_count, 1)
+
+
+class MessageListQueryTests(ProjectTestCase):
+    """Message lists cost the same number of queries however many messages they show"""
+
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user(username='member', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create_project(self, name, thread_count):
+        project = Project.objects.create(name=name, owner=self.owner)
+        threads = ProjectMessage.objects.bulk_create(
+            ProjectMessage(project=project, sender=self.member, message=f'Thread {number}')
+            for number in range(thread_count)
+        )
+        ProjectMessage.objects.bulk_create(
+            ProjectMessage(project=project, sender=self.owner, message='Reply', parent=thread)
+            for thread in threads for _ in range(2)
+        )
+        for message in ProjectMessage.objects.filter(project=project):
+            message.mentions.add(self.owner, self.member)
+        return project
+
+    def test_query_count_does_not_grow_with_messages(self):
+        small = self.create_project('Small', 3)
+        large = self.create_project('Large', 60)
+        accessible_project_ids(self.owner)
+
+        for project, thread_count in ((small, 3), (large, 60)):
+            with self.subTest(threads=thread_count), self.assertNumQueries(4):
+                response = self.client.get(reverse('message-by-project'), {'project_id': project.pk})
+            self.assertEqual(len(response.json()), thread_count)
+            self.assertEqual({message['replies_count'] for message in response.json()}, {2})
+            self.assertEqual({len(message['mentions']) for message in response.json()}, {2})
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('message-list'))
+        self.assertEqual(len(response.json()), 189)
+
+
+class MessageReadCursorTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user(username='member')
+        self.project.team_members.add(self.member)
+        self.messages = [
+            ProjectMessage.objects.create(project=self.project, sender=self.owner, message=f'Update {number}')
+            for number in range(3)
+        ]
+        self.own = ProjectMessage.objects.create(project=self.project, sender=self.member, message='Thanks')
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def unread_count(self):
+        return self.client.get(reverse('message-unread-count')).json()['count']
+
+    def read_flags(self):
+        messages = self.client.get(reverse('message-list')).json()
+        return {message['id']: message['is_read'] for message in messages}
+
+    def test_unread_until_marked(self):
+        self.assertEqual(self.unread_count(), 3)
+        self.assertEqual(self.read_flags(), {
+            self.messages[0].pk: False, self.messages[1].pk: False, self.messages[2].pk: False, self.own.pk: True
+        })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('message-mark-read', args=[self.messages[1].pk]))
+
+        self.assertEqual(self.unread_count(), 1)
+        self.assertEqual(
+            [message['id'] for message in self.client.get(reverse('message-unread')).json()], [self.messages[2].pk]
+        )
+        self.assertFalse(self.read_flags()[self.messages[2].pk])
+
+    def test_cursors_only_move_forward(self):
+        self.unread_count()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mark_read(self.member, self.project.pk, self.messages[2].pk), 3)
+            self.assertEqual(mark_read(self.member, self.project.pk, self.messages[0].pk), 0)
+
+        self.assertEqual(read_positions(self.member), {self.project.pk: self.messages[2].pk})
+        self.assertEqual(MessageReadCursor.objects.count(), 1)
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_mark_project_read(self):
+        self.unread_count()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('message-mark-project-read'), {'project_id': self.project.pk})
+
+        self.assertEqual(response.json()['last_read_message_id'], self.own.pk)
+        self.assertEqual(self.unread_count(), 0)
+        stranger = Project.objects.create(name='Hidden', owner=User.objects.create_user('stranger'))
+        response = self.client.post(reverse('message-mark-project-read'), {'project_id': stranger.pk})
+        self.assertEqual(response.status_code, 404)
+
+    def test_counter_follows_new_and_deleted_messages(self):
+        self.assertEqual(self.unread_count(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectMessage.objects.create(project=self.project, sender=self.owner, message='One more')
+        self.assertEqual(self.unread_count(), 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_read(self.member, self.project.pk, self.messages[0].pk)
+            # Already read, then unread
+            self.messages[0].delete()
+            self.messages[2].delete()
+        self.assertEqual(self.unread_count(), 2)
+        self.assertEqual(message_counts([self.member.pk]), {self.member.pk: 2})
+
+
+class ReadCursorMigrationTests(TransactionTestCase):
+    """0021 collapses the read_by rows into one cursor per user and project, and back"""
+
+    before = [('projects', '0020_recurringtask_next_run_at')]
+    after = [('projects', '0021_message_read_cursors')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def test_read_by_becomes_cursors_and_back(self):
+        old_apps = self.migrate(self.before)
+        HistoricalUser = old_apps.get_model('auth', 'User')
+        HistoricalProject = old_apps.get_model('projects', 'Project')
+        HistoricalMessage = old_apps.get_model('projects', 'ProjectMessage')
+        owner = HistoricalUser.objects.create(username='owner')
+        reader = HistoricalUser.objects.create(username='reader')
+        apollo = HistoricalProject.objects.create(name='Apollo', owner=owner)
+        gemini = HistoricalProject.objects.create(name='Gemini', owner=owner)
+        apollo_messages = [
+            HistoricalMessage.objects.create(project=apollo, sender=owner, message=str(number)) for number in range(3)
+        ]
+        gemini_message = HistoricalMessage.objects.create(project=gemini, sender=owner, message='Hi')
+        apollo_messages[0].read_by.add(reader)
+        apollo_messages[1].read_by.add(reader, owner)
+        gemini_message.read_by.add(owner)
+
+        new_apps = self.migrate(self.after)
+        cursors = new_apps.get_model('projects', 'MessageReadCursor').objects.values_list(
+            'user_id', 'project_id', 'last_read_message_id'
+        )
+        self.assertEqual(set(cursors), {
+            (reader.pk, apollo.pk, apollo_messages[1].pk),
+            (owner.pk, apollo.pk, apollo_messages[1].pk),
+            (owner.pk, gemini.pk, gemini_message.pk),
+        })
+
+        old_apps = self.migrate(self.before)
+        read_by = old_apps.get_model('projects', 'ProjectMessage').read_by.through.objects.values_list(
+            'projectmessage_id', 'user_id'
+        )
+        self.assertEqual(set(read_by), {
+            (apollo_messages[0].pk, reader.pk), (apollo_messages[1].pk, reader.pk),
+            (apollo_messages[0].pk, owner.pk), (apollo_messages[1].pk, owner.pk),
+            (gemini_message.pk, owner.pk),
+        })
+
+
+class DependencyCycleTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.a, self.b, self.c = (
+            Task.objects.create(project=self.project, title=title) for title in ('A', 'B', 'C')
+        )
+        # A -> B -> C (each depends on the next)
+        self.a.depends_on.add(self.b)
+        self.b.depends_on.add(self.c)
+
+    def set_dependencies(self, task, dependencies):
+        return self.client.patch(
+            reverse('task-detail', args=[task.pk]),
+            {'depends_on': [dependency.pk for dependency in dependencies]},
+            format='json'
+        )
+
+    def test_cycle_with_reports_multi_hop_cycles(self):
+        graph = DependencyGraph.for_project(self.project.pk)
+
+        self.assertEqual(graph.cycle_with(self.c.pk, [self.a.pk]), [self.c.pk, self.a.pk, self.b.pk, self.c.pk])
+        self.assertEqual(graph.cycle_with(self.a.pk, [self.a.pk]), [self.a.pk, self.a.pk])
+        self.assertIsNone(graph.cycle_with(self.a.pk, [self.c.pk]))
+        self.assertEqual(graph.cycles(), [])
+
+    def test_cycles_finds_existing_loops(self):
+        graph = DependencyGraph([(1, 2), (2, 3), (3, 1), (4, 4), (5, 1)])
+
+        self.assertEqual(sorted(sorted(cycle) for cycle in graph.cycles()), [[1, 2, 3], [4]])
+
+    def test_multi_hop_cycle_is_rejected(self):
+        response = self.set_dependencies(self.c, [self.a])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Circular dependency detected: C -> A -> B -> C', str(response.json()))
+        self.assertFalse(self.c.depends_on.exists())
+
+    def test_self_dependency_is_rejected(self):
+        response = self.set_dependencies(self.a, [self.a])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Task cannot depend on itself', str(response.json()))
+
+    def test_replacing_dependencies_is_allowed(self):
+        response = self.set_dependencies(self.a, [self.c])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(self.a.depends_on.all()), [self.c])
+
+    def test_cross_project_cycles_are_rejected(self):
+        other = Project.objects.create(name='Gemini', owner=self.owner)
+        x = Task.objects.create(project=other, title='X')
+        y = Task.objects.create(project=other, title='Y')
+
+        # Direct: C -> X, then X -> C
+        self.c.depends_on.add(x)
+        response = self.set_dependencies(x, [self.c])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Circular dependency detected: X -> C -> X', str(response.json()))
+
+        # Through both projects: A -> B -> C -> X -> Y, then Y -> A
+        x.depends_on.add(y)
+        response = self.set_dependencies(y, [self.a])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Y -> A -> B -> C -> X -> Y', str(response.json()))
+        self.assertFalse(y.depends_on.exists())
+
+    def test_rejected_dependencies_save_nothing(self):
+        response = self.client.patch(
+            reverse('task-detail', args=[self.c.pk]),
+            {'title': 'Renamed', 'depends_on': [self.a.pk]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.c.refresh_from_db()
+        self.assertEqual(self.c.title, 'C')
+
+    def test_edge_changes_invalidate_cached_graph(self):
+        d = Task.objects.create(project=self.project, title='D')
+        self.assertIsNone(DependencyGraph.for_project(self.project.pk).cycle_with(d.pk, [self.a.pk]))
+
+        # C -> D through the reverse accessor; D -> A would now close a loop
+        d.blocking_tasks.add(self.c)
+        self.assertEqual(self.set_dependencies(d, [self.a]).status_code, 400)
+
+        self.c.depends_on.clear()
+        self.assertEqual(self.set_dependencies(d, [self.a]).status_code, 200)
+        self.assertIn((d.pk, self.a.pk), DependencyGraph.for_project(self.project.pk).edges())
+
+        self.b.depends_on.remove(self.c)
+        self.assertNotIn(self.b.pk, DependencyGraph.for_project(self.project.pk).depends_on)
+
+
+class ScheduleTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.project.start_date = date(2026, 1, 5)
+        self.project.save()
+        # design -> (build, docs) -> launch
+        self.design = self.create_task('Design', 4)
+        self.build = self.create_task('Build', 8, self.design)
+        self.docs = self.create_task('Docs', 2, self.design)
+        self.launch = self.create_task('Launch', 4, self.build, self.docs, due_date=date(2026, 1, 5))
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create_task(self, title, hours, *depends_on, **fields):
+        task = Task.objects.create(project=self.project, title=title, estimated_hours=hours, **fields)
+        task.depends_on.add(*depends_on)
+        return task
+
+    def schedule(self):
+        response = self.client.get(reverse('project-schedule', args=[self.project.pk]))
+        return response.status_code, response.json()
+
+    def test_critical_path_and_slack(self):
+        status_code, schedule = self.schedule()
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(schedule['duration_hours'], 16)
+        self.assertEqual(schedule['critical_path'], [self.design.pk, self.build.pk, self.launch.pk])
+        tasks = {task['id']: task for task in schedule['tasks']}
+        self.assertEqual(
+            (tasks[self.docs.pk]['earliest_start'], tasks[self.docs.pk]['latest_start'], tasks[self.docs.pk]['slack']),
+            (4, 10, 6)
+        )
+        self.assertFalse(tasks[self.docs.pk]['critical'])
+        self.assertEqual(tasks[self.launch.pk]['earliest_start'], 12)
+
+    def test_projected_dates(self):
+        schedule = self.schedule()[1]
+
+        self.assertEqual(schedule['finish_date'], '2026-01-06')
+        tasks = {task['id']: task for task in schedule['tasks']}
+        self.assertEqual(tasks[self.design.pk]['projected_finish'], '2026-01-05')
+        self.assertFalse(tasks[self.design.pk]['late'])
+        self.assertTrue(tasks[self.launch.pk]['late'])
+
+    def test_task_changes_refresh_the_cached_schedule(self):
+        self.schedule()
+
+        self.docs.estimated_hours = 20
+        self.docs.save()
+
+        schedule = self.schedule()[1]
+        self.assertEqual(schedule['duration_hours'], 28)
+        self.assertEqual(schedule['critical_path'], [self.design.pk, self.docs.pk, self.launch.pk])
+
+    def test_cycles_are_reported(self):
+        # Written around validation, as an import or older data could have left it
+        Task.depends_on.through.objects.create(from_task=self.design, to_task=self.launch)
+
+        status_code, body = self.schedule()
+
+        self.assertEqual(status_code, 400)
+        self.assertEqual(body['cycles'], [sorted([self.design.pk, self.build.pk, self.docs.pk, self.launch.pk])])
+
+
+class SprintTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.sprint = self.create_sprint('Sprint 1', [(3, 'done'), (5, 'todo'), (2, 'in_progress')])
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create_sprint(self, name, tasks, **fields):
+        sprint = Sprint.objects.create(project=self.project, name=name, **fields)
+        for points, task_status in tasks:
+            Task.objects.create(
+                project=self.project, sprint=sprint, title='Story', story_points=points, status=task_status
+            )
+        return sprint
+
+    def snapshot(self, sprint=None):
+        return SprintSnapshot.objects.filter(sprint=sprint or self.sprint, date=self.today).values_list(
+            'total_points', 'completed_points', 'task_count', 'completed_task_count'
+        ).get()
+
+    def test_list_query_count_does_not_grow_with_sprints(self):
+        accessible_project_ids(self.owner)
+        counts = []
+        for extra in (0, 10):
+            for number in range(extra):
+                self.create_sprint(f'Extra {number}', [(1, 'done'), (2, 'todo')])
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('sprint-list'))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+        sprint = next(row for row in response.json() if row['id'] == self.sprint.pk)
+        self.assertEqual(
+            (sprint['total_points'], sprint['completed_points'], sprint['completion_percentage'],
+             sprint['task_count'], sprint['completed_task_count']),
+            (10, 3, 30.0, 3, 1)
+        )
+
+    def test_task_changes_rewrite_todays_snapshot(self):
+        self.assertEqual(self.snapshot(), (10, 3, 3, 1))
+
+        task = self.sprint.tasks.get(story_points=5)
+        task.status = 'done'
+        task.save()
+        self.assertEqual(self.snapshot(), (10, 8, 3, 2))
+
+        task.sprint = None
+        task.save()
+        self.assertEqual(self.snapshot(), (5, 3, 2, 1))
+        self.assertEqual(SprintSnapshot.objects.count(), 1)
+
+    def test_completion_keeps_committed_scope(self):
+        response = self.client.post(reverse('sprint-complete-sprint', args=[self.sprint.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.sprint.tasks.count(), 1)
+        self.assertEqual(self.snapshot(), (10, 3, 3, 1))
+        velocity = self.client.get(reverse('sprint-velocity'), {'project': self.project.pk}).json()
+        self.assertEqual(velocity['sprints'][0]['committed_points'], 10)
+        self.assertEqual(velocity['average_velocity'], 3)
+
+    def test_burndown_carries_snapshots_forward(self):
+        start = self.today - timezone.timedelta(days=3)
+        self.sprint.start_date = start
+        self.sprint.end_date = self.today + timezone.timedelta(days=1)
+        self.sprint.save()
+        SprintSnapshot.objects.create(sprint=self.sprint, date=start, total_points=10, completed_points=0)
+        SprintSnapshot.objects.create(
+            sprint=self.sprint, date=start + timezone.timedelta(days=1), total_points=10, completed_points=2
+        )
+
+        points = self.client.get(reverse('sprint-burndown', args=[self.sprint.pk])).json()['points']
+
+        self.assertEqual([point['remaining_points'] for point in points], [10, 8, 8, 7, None])
+        self.assertEqual([point['points_completed'] for point in points], [0, 2, 0, 1, None])
+        self.assertEqual([point['ideal_remaining'] for point in points], [10, 7.5, 5, 2.5, 0])
+
+    def test_daily_job_snapshots_active_sprints(self):
+        self.sprint.status = 'active'
+        self.sprint.save()
+        planned = self.create_sprint('Sprint 2', [(1, 'todo')])
+        SprintSnapshot.objects.all().delete()
+
+        self.assertEqual(snapshot_active_sprints(), 'Snapshotted 1 active sprints')
+
+        self.assertEqual(self.snapshot(), (10, 3, 3, 1))
+        self.assertFalse(planned.snapshots.exists())
+
+
+class MilestoneTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.milestone = Milestone.objects.create(project=self.project, name='Beta', due_date=date(2099, 1, 1))
+        self.tasks = [Task.objects.create(project=self.project, title=f'Task {number}') for number in range(4)]
+        self.milestone.tasks.add(*self.tasks)
+
+    def state(self, milestone=None):
+        milestone = Milestone.objects.get(pk=(milestone or self.milestone).pk)
+        return milestone.task_count, milestone.done_task_count, milestone.progress, milestone.status
+
+    def set_status(self, task, task_status):
+        task.status = task_status
+        task.save()
+
+    def test_progress_and_status_follow_tasks(self):
+        self.assertEqual(self.state(), (4, 0, 0, 'pending'))
+
+        self.set_status(self.tasks[0], 'done')
+        self.assertEqual(self.state(), (4, 1, 25, 'in_progress'))
+
+        for task in self.tasks[1:]:
+            self.set_status(task, 'done')
+        self.assertEqual(self.state(), (4, 4, 100, 'completed'))
+        self.assertIsNotNone(Milestone.objects.get(pk=self.milestone.pk).completed_at)
+
+        self.set_status(self.tasks[0], 'review')
+        self.assertEqual(self.state(), (4, 3, 75, 'in_progress'))
+        self.assertIsNone(Milestone.objects.get(pk=self.milestone.pk).completed_at)
+
+    def test_links_and_deletes(self):
+        self.set_status(self.tasks[0], 'done')
+
+        self.milestone.tasks.remove(self.tasks[1])
+        self.assertEqual(self.state(), (3, 1, 33, 'in_progress'))
+
+        self.tasks[0].delete()
+        self.assertEqual(self.state(), (2, 0, 0, 'pending'))
+
+        self.milestone.tasks.clear()
+        self.assertEqual(self.state(), (0, 0, 0, 'pending'))
+
+    def test_overdue_milestones_are_missed(self):
+        overdue = Milestone.objects.create(project=self.project, name='Alpha', due_date=date(2020, 1, 1))
+        empty = Milestone.objects.create(project=self.project, name='Empty', due_date=date(2020, 1, 1))
+        overdue.tasks.add(self.tasks[0])
+        # Linking re-derives status from the due date straight away
+        self.assertEqual(self.state(overdue)[3], 'missed')
+        Milestone.objects.filter(pk=overdue.pk).update(status='pending')
+        version = Project.objects.get(pk=self.project.pk).version
+
+        self.assertEqual(mark_missed_milestones(), 'Marked 1 milestones as missed')
+
+        self.assertEqual(
+            (self.state(overdue)[3], self.state(empty)[3], self.state()[3]), ('missed', 'pending', 'pending')
+        )
+        self.assertGreater(Project.objects.get(pk=self.project.pk).version, version)
+
+    def test_refresh_progress_repairs_drift(self):
+        Task.objects.filter(pk=self.tasks[0].pk).update(status='done')
+        Milestone.objects.filter(pk=self.milestone.pk).update(task_count=9, done_task_count=9)
+        client = APIClient()
+        client.force_authenticate(self.owner)
+
+        response = client.post(reverse('milestone-refresh-progress', args=[self.milestone.pk]))
+
+        self.assertEqual((response.json()['progress'], response.json()['status']), (25, 'in_progress'))
+        self.assertEqual(self.state(), (4, 1, 25, 'in_progress'))
+
+    def test_stale_instances_do_not_overwrite_counters(self):
+        stale = Milestone.objects.get(pk=self.milestone.pk)
+        self.set_status(self.tasks[0], 'done')
+
+        stale.name = 'Beta 2'
+        stale.save()
+
+        self.assertEqual(self.state(), (4, 1, 25, 'in_progress'))
+
+
+class RecurringTaskTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.make_aware(timezone.datetime(2026, 3, 10, 9, 0))
+
+    def create_recurring(self, frequency='daily', start_date=date(2026, 3, 10), **fields):
+        return RecurringTask.objects.create(
+            project=self.project, title='Standup', frequency=frequency, start_date=start_date,
+            created_by=self.owner, **fields
+        )
+
+    def due_dates(self):
+        return sorted(Task.objects.values_list('due_date', flat=True))
+
+    def test_occurrences(self):
+        self.assertEqual(occurrence(date(2026, 1, 31), 'monthly', 1), date(2026, 2, 28))
+        self.assertEqual(occurrence(date(2026, 1, 31), 'monthly', 2), date(2026, 3, 31))
+        self.assertEqual(occurrence(date(2026, 1, 31), 'quarterly', 1), date(2026, 4, 30))
+        self.assertEqual(occurrence(date(2026, 1, 5), 'biweekly', 2), date(2026, 2, 2))
+        self.assertEqual(last_occurrence_index(date(2026, 1, 31), 'monthly', date(2026, 3, 30)), 1)
+        self.assertEqual(last_occurrence_index(date(2026, 1, 31), 'monthly', date(2026, 1, 30)), -1)
+
+    def test_saving_schedules_the_first_run(self):
+        recurring = self.create_recurring('weekly', start_date=date(2026, 3, 12))
+
+        self.assertEqual(timezone.localdate(recurring.next_run_at), date(2026, 3, 12))
+
+    def test_materialization_advances_the_schedule(self):
+        recurring = self.create_recurring()
+
+        self.assertEqual(materialize_due_tasks(now=self.now), 1)
+        self.assertEqual(materialize_due_tasks(now=self.now), 0)
+
+        recurring.refresh_from_db()
+        self.assertEqual(timezone.localdate(recurring.next_run_at), date(2026, 3, 11))
+        self.assertEqual(self.due_dates(), [date(2026, 3, 17)])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.task_count, 1)
+
+    def test_catch_up_is_bounded(self):
+        self.create_recurring(start_date=date(2026, 3, 1))
+
+        self.assertEqual(materialize_due_tasks(now=self.now), MAX_CATCH_UP_RUNS)
+
+        self.assertEqual(self.due_dates(), [date(2026, 3, 15), date(2026, 3, 16), date(2026, 3, 17)])
+
+    def test_end_date_and_inactive_rows(self):
+        ended = self.create_recurring(start_date=date(2026, 3, 8), end_date=date(2026, 3, 9))
+        self.create_recurring(is_active=False)
+
+        self.assertEqual(materialize_due_tasks(now=self.now), 2)
+
+        ended.refresh_from_db()
+        self.assertIsNone(ended.next_run_at)
+        self.assertEqual(self.due_dates(), [date(2026, 3, 15), date(2026, 3, 16)])
+
+    def test_batches_cover_every_due_row(self):
+        for _ in range(5):
+            self.create_recurring()
+
+        self.assertEqual(materialize_due_tasks(now=self.now, batch_size=2), 5)
+        self.assertFalse(RecurringTask.objects.filter(next_run_at__lte=self.now).exists())
+
+    @skipUnlessDBFeature('has_select_for_update_skip_locked')
+    def test_due_rows_are_claimed_with_skip_locked(self):
+        self.create_recurring()
+
+        with CaptureQueriesContext(connection) as queries:
+            materialize_due_tasks(now=self.now)
+
+        self.assertTrue(any('SKIP LOCKED' in query['sql'] for query in queries))
+
+
+class ProjectAccessTests(ProjectTestCase):
+    """Membership changes must reach the cached access sets at once"""
+
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user(username='member', password='pass')
+        self.task = Task.objects.create(project=self.project, title='Launch')
+        self.owner_client = APIClient()
+        self.owner_client.force_authenticate(self.owner)
+        self.member_client = APIClient()
+        self.member_client.force_authenticate(self.member)
+
+    def assertAccess(self, client, allowed):
+        project_ids = [project['id'] for project in client.get(reverse('project-list')).json()]
+        task_ids = [task['id'] for task in client.get(reverse('task-list')).json()]
+        detail = client.get(reverse('project-detail', args=[self.project.pk]))
+        task_detail = client.get(reverse('task-detail', args=[self.task.pk]))
+
+        self.assertEqual(self.project.pk in project_ids, allowed)
+        self.assertEqual(self.task.pk in task_ids, allowed)
+        self.assertEqual(detail.status_code, 200 if allowed else 404)
+        self.assertEqual(task_detail.status_code, 200 if allowed else 404)
+
+    def change_member(self, action):
+        response = self.owner_client.post(
+            reverse(f'project-{action}-member', args=[self.project.pk]), {'user_id': self.member.pk}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_adding_and_removing_members(self):
+        # Cache the member's (empty) access set first
+        self.assertAccess(self.member_client, False)
+
+        self.change_member('add')
+        self.assertAccess(self.member_client, True)
+
+        self.change_member('remove')
+        self.assertAccess(self.member_client, False)
+
+    def test_clearing_the_team(self):
+        self.project.team_members.add(self.member)
+        self.assertAccess(self.member_client, True)
+
+        self.project.team_members.clear()
+        self.assertAccess(self.member_client, False)
+        self.assertAccess(self.owner_client, True)
+
+    def test_revoked_member_gets_no_304(self):
+        self.project.team_members.add(self.member)
+        url = reverse('project-detail', args=[self.project.pk])
+        etag = self.member_client.get(url)['ETag']
+        self.assertEqual(self.member_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.project.team_members.remove(self.member)
+
+        self.assertEqual(self.member_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+    def test_transferring_ownership(self):
+        self.assertAccess(self.owner_client, True)
+        self.assertAccess(self.member_client, False)
+
+        self.project.owner = self.member
+        self.project.save()
+
+        self.assertAccess(self.member_client, True)
+        self.assertAccess(self.owner_client, False)
+
+    def test_previous_owner_on_the_team_keeps_access(self):
+        self.project.team_members.add(self.owner)
+        self.assertAccess(self.owner_client, True)
+
+        self.project.owner = self.member
+        self.project.save()
+
+        self.assertAccess(self.owner_client, True)
+        self.project.team_members.remove(self.owner)
+        self.assertAccess(self.owner_client, False)
+
+
+class ProjectStatsTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.gemini = Project.objects.create(name='Gemini', owner=self.owner)
+        self.vostok = Project.objects.create(name='Vostok', owner=self.owner)
+        self.hidden = Project.objects.create(name='Hidden', owner=User.objects.create_user('stranger'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def batch_stats(self, **params):
+        return self.client.get(reverse('project-stats-batch'), params)
+
+    def test_batch_matches_single_project_stats(self):
+        Task.objects.create(project=self.project, title='Done', status='done')
+        Task.objects.create(project=self.project, title='Late', due_date=date(2020, 1, 1))
+        Task.objects.create(project=self.gemini, title='Open')
+
+        accessible_project_ids(self.owner)
+        # The response cache's version lookup, then every figure in one query
+        with self.assertNumQueries(2):
+            response = self.batch_stats(ids=f'{self.project.pk},{self.gemini.pk}')
+
+        stats = response.json()['projects']
+        self.assertEqual(set(stats), {str(self.project.pk), str(self.gemini.pk)})
+        self.assertEqual(
+            (stats[str(self.project.pk)]['total_tasks'], stats[str(self.project.pk)]['completed_tasks'],
+             stats[str(self.project.pk)]['overdue_tasks']),
+            (2, 1, 1)
+        )
+        single = self.client.get(reverse('project-stats', args=[self.project.pk])).json()
+        self.assertEqual(single['total_tasks'], 2)
+
+    def test_inaccessible_projects_are_left_out(self):
+        response = self.batch_stats(ids=f'{self.project.pk},{self.hidden.pk}')
+
+        self.assertEqual(list(response.json()['projects']), [str(self.project.pk)])
+
+    def test_malformed_or_too_many_ids_are_rejected(self):
+        self.assertEqual(self.batch_stats(ids='1,abc').status_code, 400)
+        with mock.patch('projects.views.MAX_STATS_PROJECTS', 2):
+            self.assertEqual(self.batch_stats(ids='1,2,3').status_code, 400)
+
+    def test_default_is_capped(self):
+        with mock.patch('projects.views.MAX_STATS_PROJECTS', 2):
+            capped = self.batch_stats().json()
+            everything = self.batch_stats(ids=f'{self.project.pk},{self.vostok.pk}').json()
+
+        self.assertEqual(list(capped['projects']), [str(self.project.pk), str(self.gemini.pk)])
+        self.assertTrue(capped['truncated'])
+        self.assertEqual(len(everything['projects']), 2)
+        self.assertFalse(everything['truncated'])
+        self.assertFalse(self.batch_stats().json()['truncated'])
+
+
+class ResponseCacheTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.task = Task.objects.create(project=self.project, title='Launch')
+        self.url = reverse('project-stats', args=[self.project.pk])
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def stats(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response['X-Cache'], response.json()
+
+    def key(self):
+        request = Request(APIRequestFactory().get(self.url))
+        request.user = self.owner
+        return response_key('ProjectViewSet.stats', request, [self.project.pk], {'pk': str(self.project.pk)}, ())
+
+    def test_hits_until_a_write_bumps_the_version(self):
+        outcome, computed = self.stats()
+        self.assertEqual((outcome, computed['total_tasks']), ('MISS', 1))
+
+        # The version lookup only
+        with self.assertNumQueries(1):
+            outcome, cached = self.stats()
+        self.assertEqual((outcome, cached), ('HIT', computed))
+
+        self.task.status = 'done'
+        self.task.save()
+        outcome, recomputed = self.stats()
+        self.assertEqual((outcome, recomputed['completed_tasks']), ('MISS', 1))
+        self.assertEqual(self.stats()[0], 'HIT')
+
+    def test_entries_are_per_user(self):
+        self.stats()
+        member = User.objects.create_user(username='member')
+        self.project.team_members.add(member)
+        self.stats()
+
+        self.client.force_authenticate(member)
+        self.assertEqual(self.stats()[0], 'MISS')
+
+    def test_inaccessible_projects_are_not_cached(self):
+        self.client.force_authenticate(User.objects.create_user(username='stranger'))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('X-Cache'))
+
+    def test_concurrent_misses_wait_for_the_first(self):
+        key = self.key()
+        cache.add(f'{key}:lock', 1)
+
+        with mock.patch('projects.response_cache.time.sleep', lambda seconds: cache.set(key, {'total_tasks': 7})):
+            self.assertEqual(self.stats(), ('HIT', {'total_tasks': 7}))
+        self.assertEqual(response_cache_stats(['ProjectViewSet.stats'])['ProjectViewSet.stats']['coalesced'], 1)
+
+    def test_gives_up_waiting_after_lock_wait(self):
+        key = self.key()
+        cache.add(f'{key}:lock', 1)
+
+        with mock.patch('projects.response_cache.LOCK_WAIT', 0):
+            self.assertEqual(self.stats()[0], 'MISS')
+        # The lock belongs to the other request
+        self.assertEqual(cache.get(f'{key}:lock'), 1)
+
+    def test_outcomes_are_counted(self):
+        self.stats()
+        self.stats()
+        self.stats()
+
+        counts = response_cache_stats(['ProjectViewSet.stats'])['ProjectViewSet.stats']
+        self.assertEqual(counts, {'hit': 2, 'miss': 1, 'coalesced': 0, 'hit_rate': 0.667})
+        out = StringIO()
+        call_command('response_cache_stats', stdout=out)
+        self.assertIn('ProjectViewSet.stats: 2 hits, 1 misses, 0 coalesced (66.7% served from cache)', out.getvalue())
+
+
+class TimeTrackingTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = Project.objects.create(name='Gemini', owner=self.owner)
+        self.task = Task.objects.create(project=self.project, title='Launch')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def log_time(self, hours, day):
+        response = self.client.post(
+            reverse('time-tracking-log-time'),
+            {'task_id': self.task.pk, 'hours': hours, 'date': day.isoformat()},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def get_logs(self, **params):
+        return self.client.get(reverse('time-tracking-get-logs'), params)
+
+    def total_hours(self):
+        response = self.client.get(
+            reverse('report-summary'), {'date_from': '2026-01-01', 'date_to': '2026-01-31'}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['time']['total_hours']
+
+    def test_log_time_stores_an_entry(self):
+        self.log_time(1.5, date(2026, 1, 5))
+
+        entry = TimeEntry.objects.get()
+        self.assertEqual((entry.task_id, entry.user_id, entry.date), (self.task.pk, self.owner.pk, date(2026, 1, 5)))
+        self.assertEqual(entry.duration_minutes, 90)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.actual_hours, Decimal('1.50'))
+        self.assertEqual(self.total_hours(), 1.5)
+
+    def test_get_logs_by_task_project_and_user(self):
+        self.log_time(1, date(2026, 1, 5))
+        self.log_time(2, date(2026, 1, 9))
+
+        by_task = self.get_logs(task_id=self.task.pk).json()
+        self.assertEqual(by_task['total_time_logged'], 3)
+        self.assertEqual(len(by_task['time_logs']), 2)
+
+        by_project = self.get_logs(project_id=self.project.pk, user_id=self.owner.pk, end_date='2026-01-06').json()
+        self.assertEqual(by_project['total_time_minutes'], 60)
+
+        by_user = self.get_logs(user_id=self.owner.pk, start_date='2026-01-06').json()
+        self.assertEqual((by_user['user_id'], by_user['total_time_minutes']), (self.owner.pk, 120))
+
+    def test_malformed_ids_are_rejected(self):
+        for params in (
+            {'user_id': 'abc'}, {'project_id': self.project.pk, 'user_id': 'abc'},
+            {'task_id': 'abc'}, {'project_id': '1.5'},
+        ):
+            with self.subTest(**params):
+                self.assertEqual(self.get_logs(**params).status_code, 400)
+
+    def test_moving_a_task_moves_its_time(self):
+        self.log_time(1.5, date(2026, 1, 5))
+
+        self.task.project = self.other
+        self.task.save()
+
+        self.assertEqual(self.get_logs(project_id=self.project.pk).json()['total_time_minutes'], 0)
+        self.assertEqual(self.get_logs(project_id=self.other.pk).json()['total_time_minutes'], 90)
+        self.assertEqual(
+            list(DailyTimeRollup.objects.exclude(entry_count=0).values_list('project_id', 'minutes')),
+            [(self.other.pk, 90)]
+        )
+        self.assertEqual(self.total_hours(), 1.5)
+
+    def test_deleting_a_task_removes_its_time(self):
+        self.log_time(2, date(2026, 1, 5))
+
+        self.task.delete()
+
+        self.assertEqual(self.total_hours(), 0)
+        self.assertEqual(self.get_logs(user_id=self.owner.pk).json()['total_time_minutes'], 0)
+
+    def test_deleting_users_keeps_their_time(self):
+        for username, minutes in (('ann', 30), ('bob', 45)):
+            user = User.objects.create_user(username)
+            TimeEntry.objects.create(
+                task=self.task, user=user, username=username, date=date(2026, 1, 5), duration_minutes=minutes
+            )
+        self.log_time(1, date(2026, 1, 5))
+
+        User.objects.filter(username__in=['ann', 'bob']).delete()
+
+        expected = {(None, 75, 2), (self.owner.pk, 60, 1)}
+        self.assertEqual(set(DailyTimeRollup.objects.values_list('user_id', 'minutes', 'entry_count')), expected)
+        self.assertEqual(self.total_hours(), 2.25)
+        # The nightly rebuild agrees
+        rebuild_rollups([self.project.pk])
+        self.assertEqual(set(DailyTimeRollup.objects.values_list('user_id', 'minutes', 'entry_count')), expected)
+
+    def test_rows_without_user_are_unique(self):
+        DailyTimeRollup.objects.create(project=self.project, user=None, date=date(2026, 1, 5), minutes=10)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailyTimeRollup.objects.create(project=self.project, user=None, date=date(2026, 1, 5), minutes=10)
+
+
+class RollupReportTests(ProjectTestCase):
+    """The report summary reads time and throughput from the daily rollups"""
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def summary(self, date_from=None, date_to=None):
+        date_from = date_from or self.today
+        response = self.client.get(reverse('report-summary'), {
+            'date_from': date_from.isoformat(), 'date_to': (date_to or date_from).isoformat()
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_throughput_follows_task_changes(self):
+        task = Task.objects.create(project=self.project, title='Ship')
+        Task.objects.create(project=self.project, title='Test')
+        self.assertEqual(self.summary()['throughput'], {'created': 2, 'completed': 0, 'average_completed_per_day': 0})
+
+        task.status = 'done'
+        task.save()
+        self.assertEqual(self.summary()['throughput']['completed'], 1)
+
+        task.status = 'todo'
+        task.save()
+        self.assertEqual(self.summary()['throughput']['completed'], 0)
+
+    def test_ranges_and_access(self):
+        task = Task.objects.create(project=self.project, title='Ship')
+        TimeEntry.objects.create(task=task, user=self.owner, date=date(2026, 1, 5), duration_minutes=90)
+        TimeEntry.objects.create(task=task, user=self.owner, date=date(2026, 1, 20), duration_minutes=30)
+        hidden = Project.objects.create(name='Hidden', owner=User.objects.create_user('stranger'))
+        TimeEntry.objects.create(
+            task=Task.objects.create(project=hidden, title='Secret'), date=date(2026, 1, 5), duration_minutes=600
+        )
+
+        self.assertEqual(self.summary(date(2026, 1, 5))['time']['total_hours'], 1.5)
+        self.assertEqual(self.summary(date(2026, 1, 1), date(2026, 1, 31))['time']['total_hours'], 2)
+        self.assertEqual(self.summary(date(2026, 1, 1))['throughput']['created'], 0)
+
+    def test_reconciliation_repairs_drift(self):
+        task = Task.objects.create(project=self.project, title='Ship', status='done', completed_at=timezone.now())
+        TimeEntry.objects.create(task=task, user=self.owner, date=date(2026, 1, 5), duration_minutes=90)
+        DailyTimeRollup.objects.update(minutes=5)
+        DailyTaskRollup.objects.all().delete()
+
+        self.assertEqual(reconcile_daily_rollups(), 'Reconciled daily rollups for 1 projects')
+
+        self.assertEqual(list(DailyTimeRollup.objects.values_list('minutes', 'entry_count')), [(90, 1)])
+        self.assertEqual(
+            list(DailyTaskRollup.objects.values_list('date', 'created_count', 'completed_count')),
+            [(self.today, 1, 1)]
+        )
+
+
+class FakeRedis:
+    """The list commands the activity queue uses"""
+
+    def __init__(self):
+        self.lists = {}
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def lrange(self, key, start, end):
+        self.commands.append(lambda: list(self.redis.lists.get(key, [])))
+
+    def delete(self, key):
+        self.commands.append(lambda: int(self.redis.lists.pop(key, None) is not None))
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+class ActivityRecorderTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(recorder.flush, shared=False)
+
+    def record(self, count=1):
+        record_activities(
+            ProjectActivity(project=self.project, user=self.owner, action='task_created', description=f'Event {number}')
+            for number in range(count)
+        )
+
+    def stored(self):
+        return ProjectActivity.objects.filter(project=self.project).count()
+
+    @override_settings(PROJECT_ACTIVITY_LOG={})
+    def test_sync_is_the_default(self):
+        with transaction.atomic():
+            record_activity(project=self.project, user=self.owner, action='task_created', description='Now')
+            self.assertEqual(self.stored(), 1)
+
+    def test_sync_events_roll_back_with_their_write(self):
+        try:
+            with transaction.atomic():
+                self.record()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertEqual(self.stored(), 0)
+
+    @override_settings(PROJECT_ACTIVITY_LOG={'MODE': 'buffer', 'BATCH_SIZE': 3, 'FLUSH_INTERVAL': 60})
+    def test_buffer_writes_after_commit_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record(2)
+            self.assertEqual(self.stored(), 0)
+        # Queued after commit, waiting for the timer
+        self.assertEqual(self.stored(), 0)
+        self.assertIsNotNone(recorder._timer)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record()
+        # The third event fills the batch
+        self.assertEqual(self.stored(), 3)
+        self.assertIsNone(recorder._timer)
+
+    @override_settings(PROJECT_ACTIVITY_LOG={'MODE': 'buffer', 'BATCH_SIZE': 100, 'FLUSH_INTERVAL': 60})
+    def test_buffer_flush_writes_pending_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record(2)
+
+        self.assertEqual(recorder.flush(), 2)
+        self.assertEqual(self.stored(), 2)
+        self.assertEqual(recorder.flush(), 0)
+
+    @override_settings(PROJECT_ACTIVITY_LOG={'MODE': 'buffer', 'BATCH_SIZE': 100, 'FLUSH_INTERVAL': 60})
+    def test_buffer_drops_events_of_rolled_back_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.record(2)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual(recorder.flush(), 0)
+        self.assertEqual(self.stored(), 0)
+
+    @override_settings(PROJECT_ACTIVITY_LOG={'MODE': 'redis', 'BATCH_SIZE': 3, 'FLUSH_INTERVAL': 60})
+    def test_redis_queue_is_shared_and_drained_in_batches(self):
+        redis = FakeRedis()
+        with mock.patch('django_redis.get_redis_connection', return_value=redis):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.record(2)
+            self.assertEqual(len(redis.lists[REDIS_QUEUE_KEY]), 2)
+            self.assertEqual(self.stored(), 0)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.record()
+            self.assertEqual(self.stored(), 3)
+            self.assertNotIn(REDIS_QUEUE_KEY, redis.lists)
+
+            # Another process's events are written by the periodic task
+            with self.captureOnCommitCallbacks(execute=True):
+                self.record()
+            recorder._pending.clear()
+            self.assertEqual(flush_project_activity(), 'Flushed 1 activity events')
+            self.assertEqual(self.stored(), 4)
+
+
+
+class TeamDashboardTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user(username='member')
+        self.project.team_members.add(self.member)
+        self.task = Task.objects.create(project=self.project, title='Launch', assigned_to=self.member)
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def dashboard(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse('team-dashboard-me'))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def cached_sections(self, user):
+        keys = {section: _section_key(user.pk, section) for section in SECTIONS}
+        cached = cache.get_many(keys.values())
+        return {section for section, key in keys.items() if key in cached}
+
+    def build_queries(self):
+        cache.clear()
+        accessible_project_ids(self.member)
+        with CaptureQueriesContext(connection) as queries:
+            self.dashboard()
+        return len(queries)
+
+    def test_warm_snapshot_is_served_from_the_cache(self):
+        document = self.dashboard()
+        self.assertEqual(document['stats']['total_tasks'], 1)
+        self.assertEqual([task['id'] for task in document['assigned_tasks']], [self.task.pk])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.dashboard(), document)
+
+    def test_build_query_count_does_not_grow(self):
+        ProjectMessage.objects.create(project=self.project, sender=self.owner, message='Hello')
+        few = self.build_queries()
+
+        other = Project.objects.create(name='Gemini', owner=self.owner)
+        other.team_members.add(self.member)
+        for project in (self.project, other):
+            for number in range(5):
+                Task.objects.create(project=project, title=f'Task {number}', assigned_to=self.member)
+                ProjectMessage.objects.create(project=project, sender=self.owner, message=f'Message {number}')
+
+        self.assertEqual(self.build_queries(), few)
+
+    def test_task_writes_drop_only_affected_sections(self):
+        self.dashboard()
+        self.client.force_authenticate(self.owner)
+        self.dashboard()
+
+        self.task.status = 'done'
+        self.task.save()
+
+        self.assertEqual(self.cached_sections(self.member), {RECENT_MESSAGES})
+        self.assertEqual(self.cached_sections(self.owner), {ASSIGNED_TASKS, RECENT_MESSAGES, STATS})
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.dashboard()['stats']['completed_tasks'], 1)
+
+    def test_reassignment_refreshes_both_assignees(self):
+        self.dashboard()
+        self.client.force_authenticate(self.owner)
+        self.dashboard()
+
+        self.task.assigned_to = self.owner
+        self.task.save()
+
+        self.assertEqual(self.cached_sections(self.member), {PROJECTS, RECENT_MESSAGES})
+        self.assertEqual(self.cached_sections(self.owner), {PROJECTS, RECENT_MESSAGES})
+        self.assertEqual([task['id'] for task in self.dashboard()['assigned_tasks']], [self.task.pk])
+
+    def test_bulk_updates_refresh_assignees(self):
+        self.dashboard()
+
+        self.client.force_authenticate(self.owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('task-bulk-update'), {'task_ids': [self.task.pk], 'updates': {'status': 'done'}}, format='json'
+            )
+
+        self.assertEqual(self.cached_sections(self.member), {RECENT_MESSAGES})
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.dashboard()['stats']['completed_tasks'], 1)
+
+    def test_messages_refresh_recent_messages_and_unread_count(self):
+        self.assertEqual(self.dashboard()['stats']['unread_messages'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            message = ProjectMessage.objects.create(project=self.project, sender=self.owner, message='Go for launch')
+
+        self.assertEqual(self.cached_sections(self.member), {PROJECTS, ASSIGNED_TASKS, STATS})
+        document = self.dashboard()
+        self.assertEqual([entry['id'] for entry in document['recent_messages']], [message.pk])
+        self.assertEqual(document['stats']['unread_messages'], 1)
+
+    def test_access_changes_rebuild_the_snapshot(self):
+        self.dashboard()
+        other = Project.objects.create(name='Gemini', owner=self.owner)
+
+        other.team_members.add(self.member)
+
+        self.assertEqual(self.cached_sections(self.member), set())
+        document = self.dashboard()
+        self.assertEqual({project['id'] for project in document['projects']}, {self.project.pk, other.pk})
+        self.assertEqual(document['stats']['total_projects'], 2)
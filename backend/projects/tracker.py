@@ -0,0 +1,172 @@
+"""
+Lightweight field change tracking for models.
+
+Declaring ``tracker = FieldTracker(['status', ...])`` on a model snapshots the
+tracked fields when an instance is loaded from the database and again after
+every save (the fields the save actually wrote, including any a ``save()``
+override added to ``update_fields``). ``save()`` overrides and post_save
+receivers can then ask what changed without re-fetching the row:
+
+    instance.tracker.has_changed('status')
+    instance.tracker.previous('status')
+    instance.tracker.changed_fields()
+
+The snapshot is a plain tuple stored on the instance, aligned with the
+tracked fields, so the per-instance overhead is one small tuple.
+"""
+from functools import wraps
+
+from django.db.models import DEFERRED
+from django.db.models.signals import class_prepared, post_init, post_save
+
+_Deferred = type(DEFERRED)
+
+
+class FieldTracker:
+    """Model attribute that tracks changes to a fixed set of fields"""
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+
+    def contribute_to_class(self, cls, name):
+        self.name = name
+        self.snapshot_attname = f'_{name}_snapshot'
+        self.saved_fields_attname = f'_{name}_saved_fields'
+        class_prepared.connect(self.finalize_class, sender=cls, weak=False)
+        setattr(cls, name, self)
+
+    def finalize_class(self, sender, **kwargs):
+        """Resolve field metadata and hook save/refresh once the model is ready"""
+        opts = sender._meta
+        self.model = sender
+        self.attnames = tuple(opts.get_field(name).attname for name in self.fields)
+        self.index = {}
+        for position, (name, attname) in enumerate(zip(self.fields, self.attnames)):
+            self.index[name] = position
+            self.index[attname] = position
+
+        # Concrete fields we cannot diff are always written by update_fields()
+        self.untracked_fields = tuple(
+            field.name for field in opts.concrete_fields
+            if not field.primary_key and field.name not in self.fields
+        )
+
+        post_init.connect(self._on_init, sender=sender, weak=False)
+        post_save.connect(self._on_save, sender=sender, weak=False)
+        self._patch_save(sender)
+        self._patch_refresh_from_db(sender)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return BoundFieldTracker(self, instance)
+
+    def _on_init(self, sender, instance, **kwargs):
+        self.store(instance)
+
+    def _on_save(self, sender, instance, update_fields=None, **kwargs):
+        # Note the fields actually written, which save() overrides may have widened;
+        # the snapshot itself is only taken once save() returns
+        instance.__dict__[self.saved_fields_attname] = update_fields
+
+    def store(self, instance, fields=None):
+        """Snapshot current values (all tracked fields, or only ``fields``)"""
+        values = instance.__dict__
+        if fields is None:
+            snapshot = tuple(values.get(attname, DEFERRED) for attname in self.attnames)
+        else:
+            refreshed = {self.index[field] for field in fields if field in self.index}
+            if not refreshed:
+                return
+            current = values.get(self.snapshot_attname) or (DEFERRED,) * len(self.attnames)
+            snapshot = tuple(
+                values.get(attname, DEFERRED) if position in refreshed else current[position]
+                for position, attname in enumerate(self.attnames)
+            )
+        values[self.snapshot_attname] = snapshot
+
+    def _patch_save(self, model):
+        original_save = model.save
+        tracker = self
+
+        @wraps(original_save)
+        def save(instance, *args, **kwargs):
+            result = original_save(instance, *args, **kwargs)
+            tracker.store(
+                instance, instance.__dict__.pop(tracker.saved_fields_attname, kwargs.get('update_fields'))
+            )
+            return result
+
+        model.save = save
+
+    def _patch_refresh_from_db(self, model):
+        original_refresh = model.refresh_from_db
+        tracker = self
+
+        @wraps(original_refresh)
+        def refresh_from_db(instance, *args, **kwargs):
+            result = original_refresh(instance, *args, **kwargs)
+            tracker.store(instance, kwargs.get('fields'))
+            return result
+
+        model.refresh_from_db = refresh_from_db
+
+
+class BoundFieldTracker:
+    """Per-instance view over a FieldTracker snapshot"""
+
+    __slots__ = ('tracker', 'instance')
+
+    def __init__(self, tracker, instance):
+        self.tracker = tracker
+        self.instance = instance
+
+    def _position(self, field):
+        try:
+            return self.tracker.index[field]
+        except KeyError:
+            raise ValueError(f'{field!r} is not tracked on {self.tracker.model.__name__}') from None
+
+    def _saved_value(self, position):
+        """Stored value for a tracked field, loading it if it was deferred"""
+        instance = self.instance
+        value = instance.__dict__[self.tracker.snapshot_attname][position]
+        if not isinstance(value, _Deferred):
+            return value
+
+        attname = self.tracker.attnames[position]
+        if attname not in instance.__dict__:
+            # Never loaded or assigned: the current value is the stored one
+            getattr(instance, attname)
+            return instance.__dict__[attname]
+
+        # Assigned without being loaded first: ask the database
+        return type(instance)._base_manager.filter(pk=instance.pk).values_list(
+            attname, flat=True
+        ).first()
+
+    def previous(self, field):
+        """Value of ``field`` when the instance was loaded or last saved (None if unsaved)"""
+        if self.instance._state.adding:
+            return None
+        return self._saved_value(self._position(field))
+
+    def has_changed(self, field):
+        """Whether ``field`` differs from its stored value (always True if unsaved)"""
+        if self.instance._state.adding:
+            return True
+        position = self._position(field)
+        current = getattr(self.instance, self.tracker.attnames[position])
+        return current != self._saved_value(position)
+
+    def changed_fields(self):
+        """Names of tracked fields whose value changed since load/last save"""
+        return [field for field in self.tracker.fields if self.has_changed(field)]
+
+    def changed(self):
+        """Mapping of changed field names to their previous values"""
+        return {field: self.previous(field) for field in self.changed_fields()}
+
+    def update_fields(self):
+        """``update_fields`` for save(): changed tracked fields plus untracked ones"""
+        return self.changed_fields() + list(self.tracker.untracked_fields)
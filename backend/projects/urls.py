@@ -8,6 +8,7 @@ router.register(r'tasks', views.TaskViewSet, basename='task')
 router.register(r'subtasks', views.SubtaskViewSet, basename='subtask')
 router.register(r'sprints', views.SprintViewSet, basename='sprint')
 router.register(r'activities', views.ProjectActivityViewSet, basename='activity')
+router.register(r'task-imports', views.TaskImportJobViewSet, basename='task-import')
 router.register(r'attachments', views.TaskAttachmentViewSet, basename='attachment')
 router.register(r'messages', views.ProjectMessageViewSet, basename='message')
 router.register(r'team-dashboard', views.TeamMemberDashboardView, basename='team-dashboard')
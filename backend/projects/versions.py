@@ -0,0 +1,116 @@
+"""
+Conditional GET for project read endpoints, keyed by Project.version.
+
+Every write that changes what the project detail, task, milestone or
+sprint endpoints return bumps the version of the affected projects
+(Project.bump_version / apply_task_delta, see the receivers in
+projects/signals.py), in the same transaction as the write or right
+after it. A response's ETag is derived from the versions of the projects
+it covers, read before the response body, plus the requesting user,
+the full request path and the day (is_overdue flips at midnight).
+
+So a client that sends the ETag back in ``If-None-Match`` gets an empty
+304 after one indexed query, without its rows being read or serialized.
+A version can never be newer than the rows it is served with; the worst
+case of a racing write is an extra 200.
+"""
+import hashlib
+import json
+
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .access import accessible_project_ids
+
+
+def project_versions(project_ids):
+    """Sorted (id, version) pairs of the existing projects among ``project_ids``"""
+    from .models import Project
+
+    return sorted(Project.objects.filter(pk__in=project_ids).values_list('id', 'version'))
+
+
+def project_etag(request, project_ids):
+    """Weak ETag over the versions of ``project_ids`` as seen by the requesting user"""
+    versions = project_versions(project_ids)
+    key = json.dumps([request.user.pk, request.get_full_path(), str(timezone.localdate()), versions])
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+
+def etag_matches(request, etag):
+    """Weak comparison of ``etag`` with the request's If-None-Match"""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    return '*' in candidates or etag.removeprefix('W/') in {
+        candidate.removeprefix('W/') for candidate in candidates
+    }
+
+
+def bump_dependent_projects(task_ids, bumped=()):
+    """
+    Bump the projects whose tasks depend on ``task_ids`` (they list them in
+    blocked_by), except the ``bumped`` ones the caller has already bumped.
+    """
+    from .models import Project, Task
+
+    return Project.bump_version(
+        Task.objects.filter(depends_on__in=list(task_ids)).exclude(
+            project_id__in=list(bumped)
+        ).values('project_id')
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Answer list requests (and retrieve, where get_etag_project_ids allows
+    it) with an ETag, or a 304 when the client's copy is current.
+
+    The check runs after authentication and before get_queryset(), so a
+    304 costs the access lookup and the version query only.
+    """
+    etag_project_param = 'project'
+
+    def get_etag_project_ids(self):
+        """
+        Projects the response is built from, or None to skip conditional
+        handling (the regular path then answers, e.g. with a 404).
+        """
+        if self.action != 'list':
+            return None
+        project_ids = accessible_project_ids(self.request.user)
+        requested = self.request.query_params.get(self.etag_project_param)
+        if requested is None:
+            return project_ids
+        if requested.isdigit() and int(requested) in project_ids:
+            return [int(requested)]
+        return None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, respond, request, *args, **kwargs):
+        project_ids = self.get_etag_project_ids()
+        if project_ids is None:
+            return respond(request, *args, **kwargs)
+
+        etag = project_etag(request, project_ids)
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = respond(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response['ETag'] = etag
+        # Revalidate on every use; the body is per user
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -5,15 +5,39 @@ from rest_framework.permissions import IsAuthenticated, BasePermission
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models, transaction
+from django.db.models import Case, F, Prefetch, Sum, Value, When
+from django.utils import timezone
 
-from .models import Project, Task, Comment, ProjectActivity, TaskAttachment, ProjectMessage, Subtask, Sprint
+from notifications.utils import create_notifications, task_update_notifications
+from realtime.events import publish_tasks
+from SynergyOS.pagination import KeysetPagination
+from webhooks.utils import trigger_task_webhooks
+
+from .access import accessible_project_ids, accessible_projects, has_project_access
+from .activity import record_activities, record_activity
+from .dependencies import DependencyGraph
+from .read_cursors import mark_project_read, mark_read, unread_filter, unread_message_count
+from .response_cache import cache_response, url_project
+from .rollups import apply_task_changes, task_key
+from .schedule import DependencyCycleError, get_schedule
+from .sprints import burndown, completion_percentage, record_sprint_snapshots
+from .stats import MAX_STATS_PROJECTS, project_stats
+from .team_dashboard import dashboard, forget_task_sections
+from .templates import instantiate_template
+from .versions import ConditionalGetMixin, bump_dependent_projects
+from .models import (
+    Project, Task, Comment, ProjectActivity, TaskAttachment, ProjectMessage, Subtask, Sprint,
+    SprintSnapshot, TaskImportJob, TimeEntry, Milestone
+)
 from .serializers import (
-    ProjectSerializer, TaskSerializer, CommentSerializer,
+    ProjectSerializer, TaskSerializer, TaskListSerializer, CommentSerializer,
     ProjectActivitySerializer, TaskAttachmentSerializer,
-    ProjectMessageSerializer, TeamMemberDashboardSerializer,
+    ProjectMessageSerializer,
     MilestoneSerializer, ProjectTemplateSerializer, TaskTemplateSerializer,
-    MilestoneTemplateSerializer, SubtaskSerializer, SprintSerializer
+    MilestoneTemplateSerializer, SubtaskSerializer, SprintSerializer,
+    TaskImportJobSerializer, TimeEntrySerializer
 )
 
 
@@ -34,7 +58,7 @@ class IsProjectOwner(BasePermission):
         return False
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Project CRUD operations
     """
@@ -44,16 +68,23 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Only return projects where user is owner or team member"""
         user = self.request.user
-        return Project.objects.filter(
-            models.Q(owner=user) | models.Q(team_members=user)
-        ).distinct()
+        return accessible_projects(user)
+    
+    def get_etag_project_ids(self):
+        """The project itself for retrieve, every accessible project for list"""
+        if self.action == 'retrieve':
+            pk = self.kwargs.get('pk', '')
+            if pk.isdigit() and has_project_access(self.request.user, int(pk)):
+                return [int(pk)]
+            return None
+        return super().get_etag_project_ids()
     
     def perform_create(self, serializer):
         """Set the owner to the current user"""
         project = serializer.save(owner=self.request.user)
         
         # Log activity
-        ProjectActivity.objects.create(
+        record_activity(
             project=project,
             user=self.request.user,
             action='created',
@@ -64,7 +95,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         """Log project updates"""
         project = serializer.save()
         
-        ProjectActivity.objects.create(
+        record_activity(
             project=project,
             user=self.request.user,
             action='updated',
@@ -87,9 +118,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
         
         try:
             user = User.objects.get(id=user_id)
-            project.team_members.add(user)
+            project.add_member(user)
             
-            ProjectActivity.objects.create(
+            record_activity(
                 project=project,
                 user=request.user,
                 action='member_added',
@@ -119,9 +150,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
         
         try:
             user = User.objects.get(id=user_id)
-            project.team_members.remove(user)
+            project.remove_member(user)
             
-            ProjectActivity.objects.create(
+            record_activity(
                 project=project,
                 user=request.user,
                 action='member_removed',
@@ -136,43 +167,140 @@ class ProjectViewSet(viewsets.ModelViewSet):
             )
     
     @action(detail=True, methods=['get'])
+    @cache_response(projects=url_project)
     def stats(self, request, pk=None):
         """Get project statistics"""
         project = self.get_object()
-        tasks = project.tasks.all()
-        
-        stats = {
-            'total_tasks': tasks.count(),
-            'completed_tasks': tasks.filter(status='done').count(),
-            'in_progress_tasks': tasks.filter(status='in_progress').count(),
-            'todo_tasks': tasks.filter(status='todo').count(),
-            'team_size': project.team_members.count() + 1,  # +1 for owner
-        }
+        return Response(project_stats([project.id])[project.id])
+    
+    def get_stats_project_ids(self):
+        """
+        Accessible projects among ?ids= (without it, the first MAX_STATS_PROJECTS
+        accessible ones by id); None when malformed
+        """
+        project_ids = accessible_project_ids(self.request.user)
+        ids = self.request.query_params.get('ids')
+        if not ids:
+            return set(sorted(project_ids)[:MAX_STATS_PROJECTS])
+        try:
+            requested = {int(project_id) for project_id in ids.split(',') if project_id.strip()}
+        except ValueError:
+            return None
+        if len(requested) > MAX_STATS_PROJECTS:
+            return None
+        return requested & project_ids
+    
+    @action(detail=False, methods=['get'], url_path='stats', url_name='stats-batch')
+    @cache_response(projects=lambda view, request, *args, **kwargs: view.get_stats_project_ids())
+    def batch_stats(self, request):
+        """
+        Statistics for many projects in one query: ?ids=1,2,3 (default: the first
+        MAX_STATS_PROJECTS accessible projects by id; truncated says more exist)
+        Projects the user cannot access are left out
+        """
+        project_ids = self.get_stats_project_ids()
+        if project_ids is None:
+            return Response(
+                {'error': f'ids must be a comma-separated list of at most {MAX_STATS_PROJECTS} project ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        truncated = not request.query_params.get('ids') and (
+            len(accessible_project_ids(request.user)) > MAX_STATS_PROJECTS
+        )
+        return Response({'projects': project_stats(project_ids), 'truncated': truncated})
+    
+    @action(detail=True, methods=['get'])
+    def dependency_cycles(self, request, pk=None):
+        """List groups of tasks whose dependencies form a loop"""
+        project = self.get_object()
+        cycles = DependencyGraph.for_project(project.id).cycles()
+        return Response({'cycles': [sorted(component) for component in cycles]})
+    
+    @action(detail=True, methods=['get'])
+    def schedule(self, request, pk=None):
+        """Critical path schedule: earliest/latest start, slack and the critical chain"""
+        project = self.get_object()
+        
+        try:
+            schedule = get_schedule(project)
+        except DependencyCycleError as exc:
+            return Response(
+                {'error': str(exc), 'cycles': [sorted(component) for component in exc.cycles]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return Response(stats)
+        return Response(schedule)
+    
+    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    def import_tasks(self, request, pk=None):
+        """
+        Bulk import tasks from a CSV or NDJSON upload (field name: file)
+        The file is processed in the background; poll /task-imports/<id>/ for progress
+        """
+        # Any team member may create tasks, so skip the owner-only write check
+        project = get_object_or_404(self.get_queryset(), pk=pk)
+        
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response(
+                {'error': 'file is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        file_format = request.data.get('format')
+        if not file_format:
+            file_format = 'ndjson' if upload.name.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+        if file_format not in dict(TaskImportJob.FORMAT_CHOICES):
+            return Response(
+                {'error': 'format must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        job = TaskImportJob.objects.create(
+            project=project,
+            created_by=request.user,
+            file=upload,
+            file_format=file_format
+        )
+        
+        from .tasks import import_tasks
+        transaction.on_commit(lambda: import_tasks.delay(job.id))
+        
+        return Response(TaskImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Task CRUD operations
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsProjectOwner]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Only return tasks from projects user has access to"""
         user = self.request.user
         queryset = Task.objects.filter(
-            models.Q(project__owner=user) | models.Q(project__team_members=user)
-        ).distinct()
+            project_id__in=accessible_project_ids(user)
+        )
         
         # Filter by project if provided
         project_id = self.request.query_params.get('project', None)
         if project_id is not None:
             queryset = queryset.filter(project_id=project_id)
         
+        if self.action == 'list':
+            queryset = TaskListSerializer.optimize_queryset(queryset)
+        
         return queryset
     
+    def get_serializer_class(self):
+        """Use the constant-query serializer for list pages"""
+        if self.action == 'list':
+            return TaskListSerializer
+        return TaskSerializer
+    
     def perform_create(self, serializer):
         """Log task creation (owner only)"""
         task = serializer.save()
@@ -184,7 +312,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        ProjectActivity.objects.create(
+        record_activity(
             project=task.project,
             user=self.request.user,
             action='task_created',
@@ -206,7 +334,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
         
-        ProjectActivity.objects.create(
+        record_activity(
             project=task.project,
             user=self.request.user,
             action='task_updated',
@@ -242,6 +370,18 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = CommentSerializer(comment)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
+    @action(detail=True, methods=['get'])
+    def dependency_chain(self, request, pk=None):
+        """Get every task this task transitively depends on and every task it blocks"""
+        task = self.get_object()
+        # Blockers may sit in other projects
+        graph = DependencyGraph.spanning(task.project_id, [task.id])
+        return Response({
+            'task_id': task.id,
+            'blockers': sorted(graph.blockers(task.id)),
+            'dependents': sorted(graph.dependents_of(task.id)),
+        })
+    
     @action(detail=False, methods=['post'])
     def bulk_update(self, request):
         """Bulk update multiple tasks at once"""
@@ -260,20 +400,6 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get tasks user has access to
-        user = request.user
-        tasks = Task.objects.filter(
-            id__in=task_ids
-        ).filter(
-            models.Q(project__owner=user) | models.Q(project__team_members=user)
-        ).distinct()
-        
-        if not tasks.exists():
-            return Response(
-                {'error': 'No accessible tasks found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
         # Validate permissions
         allowed_fields = {'status', 'priority', 'assigned_to_id', 'due_date'}
         update_fields = set(updates.keys())
@@ -284,33 +410,134 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Coerce and validate the new values once for the whole batch
+        values = {}
+        try:
+            for field_name, value in updates.items():
+                field = Task._meta.get_field(field_name.removesuffix('_id'))
+                if field.is_relation:
+                    values[field.attname] = None if value in (None, '') else int(value)
+                else:
+                    value = field.to_python(value)
+                    field.validate(value, None)
+                    values[field.attname] = value
+        except (TypeError, ValueError, DjangoValidationError) as exc:
+            return Response(
+                {'error': f'Invalid value for {field_name}: {exc}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        assignee = None
+        if values.get('assigned_to_id') is not None:
+            assignee = User.objects.filter(id=values['assigned_to_id']).first()
+            if assignee is None:
+                return Response(
+                    {'error': 'User not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        
+        # Get tasks user has access to
+        user = request.user
+        tasks = list(
+            Task.objects.filter(
+                id__in=task_ids,
+                project_id__in=accessible_project_ids(user)
+            ).select_related('project__owner', 'assigned_to')
+        )
+        
+        if not tasks:
+            return Response(
+                {'error': 'No accessible tasks found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
         # Check ownership for non-status fields
-        if update_fields - {'status'} and not all(task.project.owner == user for task in tasks):
+        if update_fields - {'status'} and not all(task.project.owner_id == user.id for task in tasks):
             return Response(
                 {'error': 'Only project owner can update fields other than status'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Perform bulk update
-        updated_count = 0
+        now = timezone.now()
+        project_deltas = {}
+        changes = []
+        throughput = []
+        became_done, became_undone = [], []
         for task in tasks:
-            for field, value in updates.items():
-                setattr(task, field, value)
-            task.save()
-            updated_count += 1
+            before = Task._progress_contribution(task.status, task.impact)
+            counted_before = task_key(task.project_id, task.status, task.created_at, task.completed_at)
+            was_done = task.status == 'done'
+            for attname, value in values.items():
+                setattr(task, attname, value)
+            if 'assigned_to_id' in values:
+                task.assigned_to = assignee
+            task.updated_at = now
+            changes.append((task, task.tracker.changed_fields()))
+            
+            # Mirrors the completed_at CASE in the UPDATE below
+            if 'status' in values:
+                completed_at = task.completed_at if was_done else now
+                throughput.append(
+                    (counted_before, task_key(task.project_id, task.status, task.created_at, completed_at))
+                )
+                if was_done != (task.status == 'done'):
+                    (became_undone if was_done else became_done).append(task.id)
+            
+            after = Task._progress_contribution(task.status, task.impact)
+            delta = project_deltas.setdefault(task.project_id, [0, 0, 0, 0])
+            for position, (new, prev) in enumerate(zip(after, before)):
+                delta[position] += new - prev
+        
+        with transaction.atomic():
+            # One UPDATE for the whole batch
+            columns = dict(values, updated_at=now)
+            if 'status' in values:
+                if values['status'] == 'done':
+                    columns['completed_at'] = Case(
+                        When(status='done', then=F('completed_at')), default=Value(now)
+                    )
+                else:
+                    columns['completed_at'] = None
+            Task.objects.filter(id__in=[task.id for task in tasks]).update(**columns)
+            
+            # One aggregate/version UPDATE per affected project
+            for project_id, delta in project_deltas.items():
+                if any(delta):
+                    Project.apply_task_delta(project_id, *delta)
+                else:
+                    Project.bump_version([project_id])
+            apply_task_changes(throughput)
+            if 'status' in values:
+                record_sprint_snapshots(task.sprint_id for task in tasks)
+                Milestone.apply_task_status_changes(became_done, became_undone)
+                bump_dependent_projects((task.id for task in tasks), bumped=project_deltas)
+            
+            record_activities([
+                ProjectActivity(
+                    project_id=task.project_id,
+                    user=user,
+                    action='task_updated',
+                    description=f'Bulk updated task: {task.title}'
+                )
+                for task in tasks
+            ])
             
-            # Log activity
-            ProjectActivity.objects.create(
-                project=task.project,
-                user=user,
-                action='task_updated',
-                description=f'Bulk updated task: {task.title}'
-            )
+            # Fan out notifications and webhooks once the batch is committed
+            notifications = [
+                entry for task, changed in changes
+                for entry in task_update_notifications(task, changed)
+            ]
+            completed = [task for task, changed in changes if 'status' in changed and task.status == 'done']
+            transaction.on_commit(lambda: create_notifications(notifications))
+            transaction.on_commit(lambda: trigger_task_webhooks('task.updated', tasks))
+            transaction.on_commit(lambda: trigger_task_webhooks('task.completed', completed))
+            publish_tasks('tasks.updated', tasks)
+            forget_task_sections(tasks)
         
         return Response({
             'success': True,
-            'updated_count': updated_count,
-            'message': f'Successfully updated {updated_count} task(s)'
+            'updated_count': len(tasks),
+            'message': f'Successfully updated {len(tasks)} task(s)'
         })
     
     @action(detail=False, methods=['post'])
@@ -330,7 +557,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             task = get_object_or_404(Task, id=task_id)
             
             # Check access
-            if not (task.project.owner == request.user or request.user in task.project.team_members.all()):
+            if not has_project_access(request.user, task.project_id):
                 return Response(
                     {'error': 'You do not have access to this task'},
                     status=status.HTTP_403_FORBIDDEN
@@ -387,9 +614,9 @@ class TaskViewSet(viewsets.ModelViewSet):
             # Calculate user's current workload
             user = request.user
             user_tasks = Task.objects.filter(
-                models.Q(project__owner=user) | models.Q(project__team_members=user),
+                project_id__in=accessible_project_ids(user),
                 status__in=['todo', 'in_progress']
-            ).distinct()
+            )
             
             # Calculate committed hours in next 7 days
             from datetime import datetime, timedelta
@@ -445,7 +672,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             if project_id:
                 project = get_object_or_404(Project, id=project_id)
                 
-                if not (project.owner == request.user or request.user in project.team_members.all()):
+                if not has_project_access(request.user, project):
                     return Response(
                         {'error': 'You do not have access to this project'},
                         status=status.HTTP_403_FORBIDDEN
@@ -481,8 +708,8 @@ class SubtaskViewSet(viewsets.ModelViewSet):
         """Only return subtasks from tasks user has access to"""
         user = self.request.user
         queryset = Subtask.objects.filter(
-            models.Q(task__project__owner=user) | models.Q(task__project__team_members=user)
-        ).distinct().select_related('task', 'assigned_to', 'completed_by')
+            task__project_id__in=accessible_project_ids(user)
+        ).select_related('task', 'assigned_to', 'completed_by')
         
         # Filter by task if provided
         task_id = self.request.query_params.get('task', None)
@@ -528,9 +755,7 @@ class SubtaskViewSet(viewsets.ModelViewSet):
         try:
             task = Task.objects.get(
                 id=task_id,
-                project__in=Project.objects.filter(
-                    models.Q(owner=request.user) | models.Q(team_members=request.user)
-                )
+                project_id__in=accessible_project_ids(request.user)
             )
         except Task.DoesNotExist:
             return Response(
@@ -568,8 +793,7 @@ class SubtaskViewSet(viewsets.ModelViewSet):
             try:
                 subtask = Subtask.objects.get(id=item['id'])
                 # Verify access
-                if not (subtask.task.project.owner == request.user or 
-                        request.user in subtask.task.project.team_members.all()):
+                if not has_project_access(request.user, subtask.task.project_id):
                     continue
                 subtask.order = item['order']
                 subtask.save(update_fields=['order'])
@@ -587,13 +811,28 @@ class ProjectActivityViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = ProjectActivitySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Only return activities from projects user has access to"""
         user = self.request.user
         return ProjectActivity.objects.filter(
-            models.Q(project__owner=user) | models.Q(project__team_members=user)
-        ).distinct()
+            project_id__in=accessible_project_ids(user)
+        )
+
+
+class TaskImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for polling bulk task import jobs started by the current user
+    """
+    serializer_class = TaskImportJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """Only return the user's own imports"""
+        return TaskImportJob.objects.filter(
+            created_by=self.request.user
+        ).select_related('created_by')
 
 
 class TaskAttachmentViewSet(viewsets.ModelViewSet):
@@ -609,15 +848,15 @@ class TaskAttachmentViewSet(viewsets.ModelViewSet):
         """Only return attachments from tasks user has access to"""
         user = self.request.user
         return TaskAttachment.objects.filter(
-            models.Q(task__project__owner=user) | models.Q(task__project__team_members=user)
-        ).distinct()
+            task__project_id__in=accessible_project_ids(user)
+        )
     
     def perform_create(self, serializer):
         """Save attachment with current user"""
         attachment = serializer.save(user=self.request.user)
         
         # Log activity
-        ProjectActivity.objects.create(
+        record_activity(
             project=attachment.task.project,
             user=self.request.user,
             action='file_uploaded',
@@ -667,23 +906,21 @@ class ProjectMessageViewSet(viewsets.ModelViewSet):
     """
     serializer_class = ProjectMessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Only return messages from projects user is part of"""
         user = self.request.user
-        return ProjectMessage.objects.filter(
-            models.Q(project__owner=user) | models.Q(project__team_members=user)
-        ).distinct().select_related('sender', 'project').prefetch_related('mentions', 'read_by')
+        return ProjectMessageSerializer.optimize_queryset(ProjectMessage.objects.filter(
+            project_id__in=accessible_project_ids(user)
+        ).select_related('project'))
     
     def perform_create(self, serializer):
-        """Save message with current user as sender"""
+        """Save message with current user as sender (own messages always count as read)"""
         message = serializer.save(sender=self.request.user)
         
-        # Mark as read by sender
-        message.read_by.add(self.request.user)
-        
         # Log activity
-        ProjectActivity.objects.create(
+        record_activity(
             project=message.project,
             user=self.request.user,
             action='message_sent',
@@ -704,10 +941,7 @@ class ProjectMessageViewSet(viewsets.ModelViewSet):
         # Verify user has access to this project
         user = request.user
         try:
-            project = Project.objects.get(
-                id=project_id,
-                **{f'{"owner" if Project.objects.filter(id=project_id, owner=user).exists() else "team_members"}': user}
-            )
+            project = accessible_projects(user).get(id=project_id)
         except Project.DoesNotExist:
             return Response(
                 {'error': 'Project not found or access denied'},
@@ -720,11 +954,31 @@ class ProjectMessageViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
-        """Mark a message as read by current user"""
+        """Mark a message (and every earlier one in its project) as read by current user"""
         message = self.get_object()
-        message.read_by.add(request.user)
+        mark_read(request.user, message.project_id, message.id)
         return Response({'status': 'marked as read'})
     
+    @action(detail=False, methods=['post'])
+    def mark_project_read(self, request):
+        """Mark every message in a project as read by current user"""
+        project_id = str(request.data.get('project_id', ''))
+        if not project_id.isdigit():
+            return Response(
+                {'error': 'project_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        project_id = int(project_id)
+        
+        if not has_project_access(request.user, project_id):
+            return Response(
+                {'error': 'Project not found or access denied'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        last_read = mark_project_read(request.user, project_id)
+        return Response({'status': 'marked as read', 'last_read_message_id': last_read})
+    
     @action(detail=True, methods=['get'])
     def replies(self, request, pk=None):
         """Get all replies to a message"""
@@ -733,11 +987,21 @@ class ProjectMessageViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(replies, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """Get count of unread messages (from the Redis counter, see notifications/unread.py)"""
+        return Response({'count': unread_message_count(request.user)})
+    
     @action(detail=False, methods=['get'])
     def unread(self, request):
-        """Get unread messages for current user"""
+        """Get unread messages for current user (no query when the unread counter is zero)"""
         user = request.user
-        messages = self.get_queryset().exclude(read_by=user)
+        if not unread_message_count(user):
+            return Response([])
+        condition = unread_filter(user, accessible_project_ids(user))
+        if condition is None:
+            return Response([])
+        messages = self.get_queryset().filter(condition)
         serializer = self.get_serializer(messages, many=True)
         return Response(serializer.data)
 
@@ -750,12 +1014,8 @@ class TeamMemberDashboardView(viewsets.ViewSet):
     
     @action(detail=False, methods=['get'])
     def me(self, request):
-        """Get dashboard data for current user"""
-        serializer = TeamMemberDashboardSerializer(
-            request.user,
-            context={'request': request}
-        )
-        return Response(serializer.data)
+        """Get dashboard data for current user (served from their snapshot, see projects/team_dashboard.py)"""
+        return Response(dashboard(request))
     
     @action(detail=False, methods=['get'])
     def my_tasks(self, request):
@@ -771,17 +1031,14 @@ class TeamMemberDashboardView(viewsets.ViewSet):
         if project_id:
             tasks = tasks.filter(project_id=project_id)
         
-        tasks = tasks.select_related('project', 'assigned_to').order_by('-created_at')
-        serializer = TaskSerializer(tasks, many=True, context={'request': request})
+        tasks = TaskListSerializer.optimize_queryset(tasks.order_by('-created_at'))
+        serializer = TaskListSerializer(tasks, many=True, context={'request': request})
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def my_projects(self, request):
         """Get all projects where user is owner or team member"""
-        from django.db.models import Q
-        projects = Project.objects.filter(
-            Q(owner=request.user) | Q(team_members=request.user)
-        ).distinct()
+        projects = accessible_projects(request.user)
         serializer = ProjectSerializer(projects, many=True, context={'request': request})
         return Response(serializer.data)
     
@@ -833,7 +1090,7 @@ class TeamMemberDashboardView(viewsets.ViewSet):
             task.save()
         
         # Log activity
-        ProjectActivity.objects.create(
+        record_activity(
             project=task.project,
             user=request.user,
             action='proof_uploaded',
@@ -866,7 +1123,7 @@ class AIViewSet(viewsets.ViewSet):
             project = get_object_or_404(Project, id=project_id)
             
             # Check if user has access to this project
-            if not (project.owner == request.user or request.user in project.team_members.all()):
+            if not has_project_access(request.user, project):
                 return Response(
                     {'error': 'You do not have access to this project'},
                     status=status.HTTP_403_FORBIDDEN
@@ -921,7 +1178,7 @@ class AIViewSet(viewsets.ViewSet):
             project = get_object_or_404(Project, id=project_id)
             
             # Check access
-            if not (project.owner == request.user or request.user in project.team_members.all()):
+            if not has_project_access(request.user, project):
                 return Response(
                     {'error': 'You do not have access to this project'},
                     status=status.HTTP_403_FORBIDDEN
@@ -988,7 +1245,7 @@ class AIViewSet(viewsets.ViewSet):
         if project_id:
             try:
                 project = get_object_or_404(Project, id=project_id)
-                if project.owner == request.user or request.user in project.team_members.all():
+                if has_project_access(request.user, project):
                     project_context = {
                         'name': project.name,
                         'description': project.description
@@ -1030,7 +1287,7 @@ class AIViewSet(viewsets.ViewSet):
             project = get_object_or_404(Project, id=project_id)
             
             # Check access
-            if not (project.owner == request.user or request.user in project.team_members.all()):
+            if not has_project_access(request.user, project):
                 return Response(
                     {'error': 'You do not have access to this project'},
                     status=status.HTTP_403_FORBIDDEN
@@ -1085,9 +1342,7 @@ class AIViewSet(viewsets.ViewSet):
             user = request.user
             
             # Gather user statistics
-            projects = Project.objects.filter(
-                models.Q(owner=user) | models.Q(team_members=user)
-            ).distinct()
+            projects = accessible_projects(user)
             
             active_projects = projects.filter(status='active').count()
             
@@ -1151,7 +1406,7 @@ class AIViewSet(viewsets.ViewSet):
             project = get_object_or_404(Project, id=project_id)
             
             # Check access
-            if not (project.owner == request.user or request.user in project.team_members.all()):
+            if not has_project_access(request.user, project):
                 return Response(
                     {'error': 'You do not have access to this project'},
                     status=status.HTTP_403_FORBIDDEN
@@ -1255,7 +1510,7 @@ class AIViewSet(viewsets.ViewSet):
                     )
                     
                     # Log activity
-                    ProjectActivity.objects.create(
+                    record_activity(
                         project=project,
                         user=request.user,
                         action='ai_task_created',
@@ -1291,7 +1546,7 @@ class AIViewSet(viewsets.ViewSet):
             )
 
 
-class MilestoneViewSet(viewsets.ModelViewSet):
+class MilestoneViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing project milestones
     """
@@ -1303,8 +1558,10 @@ class MilestoneViewSet(viewsets.ModelViewSet):
         user = self.request.user
         from .models import Milestone
         queryset = Milestone.objects.filter(
-            models.Q(project__owner=user) | models.Q(project__team_members=user)
-        ).distinct().select_related('project').prefetch_related('tasks')
+            project_id__in=accessible_project_ids(user)
+        ).select_related('project').prefetch_related(
+            Prefetch('tasks', queryset=TaskListSerializer.optimize_queryset(Task.objects.all()))
+        )
         
         # Filter by project if provided
         project_id = self.request.query_params.get('project', None)
@@ -1317,7 +1574,7 @@ class MilestoneViewSet(viewsets.ModelViewSet):
         """Create milestone and log activity"""
         milestone = serializer.save()
         
-        ProjectActivity.objects.create(
+        record_activity(
             project=milestone.project,
             user=self.request.user,
             action='milestone_created',
@@ -1325,11 +1582,10 @@ class MilestoneViewSet(viewsets.ModelViewSet):
         )
     
     def perform_update(self, serializer):
-        """Update milestone and log activity"""
+        """Update milestone and log activity (saving re-derives its status)"""
         milestone = serializer.save()
-        milestone.update_progress()
         
-        ProjectActivity.objects.create(
+        record_activity(
             project=milestone.project,
             user=self.request.user,
             action='milestone_updated',
@@ -1338,9 +1594,10 @@ class MilestoneViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def refresh_progress(self, request, pk=None):
-        """Manually refresh milestone progress"""
+        """Recount milestone tasks from their links and refresh progress"""
         milestone = self.get_object()
-        milestone.update_progress()
+        Milestone.rebuild_counters([milestone.id])
+        milestone.refresh_from_db(fields=['progress', 'task_count', 'done_task_count', 'status', 'completed_at'])
         
         serializer = self.get_serializer(milestone)
         return Response(serializer.data)
@@ -1352,6 +1609,16 @@ class TimeTrackingViewSet(viewsets.ViewSet):
     """
     permission_classes = [IsAuthenticated]
     
+    def _record_time(self, task, user, update_fields=(), **entry):
+        """Store a TimeEntry and refresh task.actual_hours from the entry total"""
+        TimeEntry.objects.create(task=task, user=user, username=user.username, **entry)
+        
+        total_minutes = task.time_entries.aggregate(total=Sum('duration_minutes'))['total'] or 0
+        total_hours = round(total_minutes / 60, 2)
+        task.actual_hours = total_hours
+        task.save(update_fields=['actual_hours', *update_fields])
+        return total_hours
+    
     @action(detail=False, methods=['post'])
     def start_timer(self, request):
         """Start timer for a task"""
@@ -1368,7 +1635,7 @@ class TimeTrackingViewSet(viewsets.ViewSet):
             
             # Check if user has access to this task
             user = request.user
-            if not (task.project.owner == user or user in task.project.team_members.all()):
+            if not has_project_access(user, task.project_id):
                 return Response(
                     {'error': 'You do not have access to this task'},
                     status=status.HTTP_403_FORBIDDEN
@@ -1417,7 +1684,7 @@ class TimeTrackingViewSet(viewsets.ViewSet):
             user = request.user
             
             # Check access
-            if not (task.project.owner == user or user in task.project.team_members.all()):
+            if not has_project_access(user, task.project_id):
                 return Response(
                     {'error': 'You do not have access to this task'},
                     status=status.HTTP_403_FORBIDDEN
@@ -1435,33 +1702,20 @@ class TimeTrackingViewSet(viewsets.ViewSet):
             end_time = timezone.now()
             duration_minutes = int((end_time - start_time).total_seconds() / 60)
             
-            # Create time log entry
-            time_entry = {
-                'user_id': user.id,
-                'username': user.username,
-                'start_time': task.active_timer['start_time'],
-                'end_time': end_time.isoformat(),
-                'duration_minutes': duration_minutes,
-                'note': note,
-                'logged_at': timezone.now().isoformat()
-            }
-            
-            # Add to time logs
-            if not task.time_logs:
-                task.time_logs = []
-            task.time_logs.append(time_entry)
-            
-            # Clear active timer
+            # Clear active timer and record the entry
             task.active_timer = None
-            
-            # Update actual hours
-            total_hours = task.get_total_time_logged()
-            task.actual_hours = total_hours
-            
-            task.save(update_fields=['time_logs', 'active_timer', 'actual_hours'])
+            total_hours = self._record_time(
+                task, user,
+                date=timezone.localdate(start_time),
+                start_time=start_time,
+                end_time=end_time,
+                duration_minutes=duration_minutes,
+                note=note,
+                update_fields=['active_timer']
+            )
             
             # Log activity
-            ProjectActivity.objects.create(
+            record_activity(
                 project=task.project,
                 user=user,
                 action='time_logged',
@@ -1473,7 +1727,8 @@ class TimeTrackingViewSet(viewsets.ViewSet):
                 'status': 'timer_stopped',
                 'task_id': task.id,
                 'duration_minutes': duration_minutes,
-                'total_time_logged': total_hours
+                'total_time_logged': total_hours,
+                'time_logs': TimeEntrySerializer(task.time_entries.all(), many=True).data
             })
             
         except Task.DoesNotExist:
@@ -1511,7 +1766,7 @@ class TimeTrackingViewSet(viewsets.ViewSet):
             user = request.user
             
             # Check access
-            if not (task.project.owner == user or user in task.project.team_members.all()):
+            if not has_project_access(user, task.project_id):
                 return Response(
                     {'error': 'You do not have access to this task'},
                     status=status.HTTP_403_FORBIDDEN
@@ -1519,32 +1774,30 @@ class TimeTrackingViewSet(viewsets.ViewSet):
             
             # Create time log entry
             duration_minutes = int(hours * 60)
-            log_time = timezone.now() if not date else timezone.datetime.fromisoformat(date)
-            
-            time_entry = {
-                'user_id': user.id,
-                'username': user.username,
-                'start_time': None,
-                'end_time': None,
-                'duration_minutes': duration_minutes,
-                'note': note,
-                'logged_at': log_time.isoformat(),
-                'manual_entry': True
-            }
-            
-            # Add to time logs
-            if not task.time_logs:
-                task.time_logs = []
-            task.time_logs.append(time_entry)
-            
-            # Update actual hours
-            total_hours = task.get_total_time_logged()
-            task.actual_hours = total_hours
+            if date:
+                try:
+                    log_time = timezone.datetime.fromisoformat(date)
+                except ValueError:
+                    return Response(
+                        {'error': 'Invalid date format. Use ISO format (YYYY-MM-DD)'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                if timezone.is_naive(log_time):
+                    log_time = timezone.make_aware(log_time)
+            else:
+                log_time = timezone.now()
             
-            task.save(update_fields=['time_logs', 'actual_hours'])
+            total_hours = self._record_time(
+                task, user,
+                date=timezone.localdate(log_time),
+                duration_minutes=duration_minutes,
+                note=note,
+                manual_entry=True,
+                logged_at=log_time
+            )
             
             # Log activity
-            ProjectActivity.objects.create(
+            record_activity(
                 project=task.project,
                 user=user,
                 action='time_logged',
@@ -1556,7 +1809,8 @@ class TimeTrackingViewSet(viewsets.ViewSet):
                 'status': 'time_logged',
                 'task_id': task.id,
                 'duration_minutes': duration_minutes,
-                'total_time_logged': total_hours
+                'total_time_logged': total_hours,
+                'time_logs': TimeEntrySerializer(task.time_entries.all(), many=True).data
             })
             
         except Task.DoesNotExist:
@@ -1567,26 +1821,52 @@ class TimeTrackingViewSet(viewsets.ViewSet):
     
     @action(detail=False, methods=['get'])
     def get_logs(self, request):
-        """Get time logs for a task or project"""
-        task_id = request.query_params.get('task_id')
-        project_id = request.query_params.get('project_id')
+        """
+        Get time logs for a task, a project or a user
+        Optional start_date/end_date (YYYY-MM-DD) limit entries by work date
+        """
+        try:
+            task_id, project_id, user_id = (
+                int(request.query_params[param]) if request.query_params.get(param) else None
+                for param in ('task_id', 'project_id', 'user_id')
+            )
+        except ValueError:
+            return Response(
+                {'error': 'task_id, project_id and user_id must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        user = request.user
+        
+        entries = TimeEntry.objects.all()
+        for param, lookup in (('start_date', 'date__gte'), ('end_date', 'date__lte')):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    entries = entries.filter(**{lookup: timezone.datetime.fromisoformat(value).date()})
+                except ValueError:
+                    return Response(
+                        {'error': f'Invalid {param} format. Use ISO format (YYYY-MM-DD)'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
         
         if task_id:
             try:
                 task = Task.objects.get(id=task_id)
-                user = request.user
                 
                 # Check access
-                if not (task.project.owner == user or user in task.project.team_members.all()):
+                if not has_project_access(user, task.project_id):
                     return Response(
                         {'error': 'You do not have access to this task'},
                         status=status.HTTP_403_FORBIDDEN
                     )
                 
+                entries = entries.filter(task=task)
+                total_minutes = entries.aggregate(total=Sum('duration_minutes'))['total'] or 0
+                
                 return Response({
                     'task_id': task.id,
-                    'time_logs': task.time_logs or [],
-                    'total_time_logged': task.get_total_time_logged(),
+                    'time_logs': TimeEntrySerializer(entries, many=True).data,
+                    'total_time_logged': round(total_minutes / 60, 2),
                     'active_timer': task.active_timer
                 })
                 
@@ -1599,35 +1879,17 @@ class TimeTrackingViewSet(viewsets.ViewSet):
         elif project_id:
             try:
                 project = Project.objects.get(id=project_id)
-                user = request.user
                 
                 # Check access
-                if not (project.owner == user or user in project.team_members.all()):
+                if not has_project_access(user, project):
                     return Response(
                         {'error': 'You do not have access to this project'},
                         status=status.HTTP_403_FORBIDDEN
                     )
                 
-                # Aggregate time logs from all tasks
-                tasks = project.tasks.all()
-                all_logs = []
-                total_time = 0
-                
-                for task in tasks:
-                    if task.time_logs:
-                        for log in task.time_logs:
-                            log_copy = log.copy()
-                            log_copy['task_id'] = task.id
-                            log_copy['task_title'] = task.title
-                            all_logs.append(log_copy)
-                            total_time += log.get('duration_minutes', 0)
-                
-                return Response({
-                    'project_id': project.id,
-                    'time_logs': all_logs,
-                    'total_time_minutes': total_time,
-                    'total_time_hours': round(total_time / 60, 2)
-                })
+                entries = entries.filter(task__project=project)
+                if user_id:
+                    entries = entries.filter(user_id=user_id)
                 
             except Project.DoesNotExist:
                 return Response(
@@ -1635,11 +1897,30 @@ class TimeTrackingViewSet(viewsets.ViewSet):
                     status=status.HTTP_404_NOT_FOUND
                 )
         
+        elif user_id:
+            # A user's time across the projects the requester can see
+            entries = entries.filter(
+                user_id=user_id, task__project_id__in=accessible_project_ids(user)
+            )
+        
         else:
             return Response(
-                {'error': 'Either task_id or project_id is required'},
+                {'error': 'Either task_id, project_id or user_id is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        total_time = entries.aggregate(total=Sum('duration_minutes'))['total'] or 0
+        
+        data = {
+            'time_logs': TimeEntrySerializer(entries.select_related('task'), many=True).data,
+            'total_time_minutes': total_time,
+            'total_time_hours': round(total_time / 60, 2)
+        }
+        if project_id:
+            data = {'project_id': project.id, **data}
+        else:
+            data = {'user_id': user_id, **data}
+        return Response(data)
 
 
 class ProjectTemplateViewSet(viewsets.ModelViewSet):
@@ -1664,7 +1945,6 @@ class ProjectTemplateViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def create_project(self, request, pk=None):
         """Create a new project from this template"""
-        from datetime import timedelta
         template = self.get_object()
         
         # Get project details from request
@@ -1690,84 +1970,16 @@ class ProjectTemplateViewSet(viewsets.ModelViewSet):
         else:
             start_date = timezone.now().date()
         
-        # Calculate end date
-        end_date = None
-        if template.estimated_duration_days:
-            end_date = start_date + timedelta(days=template.estimated_duration_days)
-        
-        # Create project
-        project = Project.objects.create(
-            name=project_name,
-            description=project_description or template.description,
+        project = instantiate_template(
+            template,
             owner=request.user,
-            status='planning',
-            priority=template.default_priority,
-            start_date=start_date,
-            end_date=end_date
+            name=project_name,
+            description=project_description,
+            start_date=start_date
         )
         
-        # Create tasks from template
-        task_templates = template.task_templates.all().order_by('order')
-        task_mapping = {}  # Map template order to actual task
-        
-        for task_template in task_templates:
-            # Calculate due date
-            due_date = None
-            if task_template.duration_days:
-                task_start = start_date + timedelta(days=task_template.start_offset_days)
-                due_date = task_start + timedelta(days=task_template.duration_days)
-            
-            task = Task.objects.create(
-                project=project,
-                title=task_template.title,
-                description=task_template.description,
-                priority=task_template.priority,
-                estimated_hours=task_template.estimated_hours,
-                impact=task_template.impact,
-                due_date=due_date,
-                status='todo'
-            )
-            
-            task_mapping[task_template.order] = task
-        
-        # Set up dependencies
-        for task_template in task_templates:
-            if task_template.depends_on_order:
-                task = task_mapping[task_template.order]
-                dependencies = [
-                    task_mapping[dep_order]
-                    for dep_order in task_template.depends_on_order
-                    if dep_order in task_mapping
-                ]
-                task.depends_on.set(dependencies)
-        
-        # Create milestones from template
-        milestone_templates = template.milestone_templates.all().order_by('order')
-        
-        for milestone_template in milestone_templates:
-            due_date = start_date + timedelta(days=milestone_template.due_offset_days)
-            
-            from .models import Milestone
-            milestone = Milestone.objects.create(
-                project=project,
-                name=milestone_template.name,
-                description=milestone_template.description,
-                due_date=due_date,
-                status='pending'
-            )
-            
-            # Associate tasks with milestone
-            if milestone_template.task_orders:
-                milestone_tasks = [
-                    task_mapping[task_order]
-                    for task_order in milestone_template.task_orders
-                    if task_order in task_mapping
-                ]
-                milestone.tasks.set(milestone_tasks)
-                milestone.update_progress()
-        
         # Log activity
-        ProjectActivity.objects.create(
+        record_activity(
             project=project,
             user=request.user,
             action='created_from_template',
@@ -1814,7 +2026,7 @@ class MilestoneTemplateViewSet(viewsets.ModelViewSet):
         ).distinct().select_related('project_template')
 
 
-class SprintViewSet(viewsets.ModelViewSet):
+class SprintViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Sprint CRUD operations and sprint management
     """
@@ -1824,9 +2036,9 @@ class SprintViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Only return sprints from projects user has access to"""
         user = self.request.user
-        queryset = Sprint.objects.filter(
-            models.Q(project__owner=user) | models.Q(project__team_members=user)
-        ).distinct().select_related('project')
+        queryset = SprintSerializer.optimize_queryset(Sprint.objects.filter(
+            project_id__in=accessible_project_ids(user)
+        ).select_related('project'))
         
         # Filter by project if provided
         project_id = self.request.query_params.get('project', None)
@@ -1851,7 +2063,7 @@ class SprintViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        ProjectActivity.objects.create(
+        record_activity(
             project=sprint.project,
             user=self.request.user,
             action='sprint_created',
@@ -1885,7 +2097,7 @@ class SprintViewSet(viewsets.ModelViewSet):
         sprint.status = 'active'
         sprint.save()
         
-        ProjectActivity.objects.create(
+        record_activity(
             project=sprint.project,
             user=request.user,
             action='sprint_started',
@@ -1907,35 +2119,100 @@ class SprintViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        sprint.status = 'completed'
-        sprint.save()
+        # Final burndown point and activity metrics, before unfinished work leaves the sprint
+        metrics = sprint.get_metrics()
+        record_sprint_snapshots([sprint.id])
         
-        # Move incomplete tasks back to backlog (remove sprint assignment)
-        incomplete_tasks = sprint.tasks.exclude(status='done')
-        incomplete_tasks.update(sprint=None)
+        with transaction.atomic():
+            sprint.status = 'completed'
+            sprint.save()
+            
+            # Move incomplete tasks back to backlog (remove sprint assignment)
+            sprint.tasks.exclude(status='done').update(sprint=None)
+            Project.bump_version([sprint.project_id])
         
-        ProjectActivity.objects.create(
+        record_activity(
             project=sprint.project,
             user=request.user,
             action='sprint_completed',
             description=f'Completed sprint: {sprint.name}',
             metadata={
-                'total_points': sprint.get_total_points(),
-                'completed_points': sprint.get_completed_points(),
-                'completion_percentage': sprint.get_completion_percentage(),
-                'incomplete_tasks_count': incomplete_tasks.count()
+                'total_points': metrics['total_points'],
+                'completed_points': metrics['completed_points'],
+                'completion_percentage': completion_percentage(
+                    metrics['total_points'], metrics['completed_points']
+                ),
+                'incomplete_tasks_count': metrics['task_count'] - metrics['completed_task_count']
             }
         )
         
+        sprint.get_metrics(refresh=True)
         serializer = self.get_serializer(sprint)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def burndown(self, request, pk=None):
+        """Daily burndown series (actual and ideal remaining points) from sprint snapshots"""
+        sprint = self.get_object()
+        return Response({
+            'sprint': sprint.id,
+            'start_date': sprint.start_date,
+            'end_date': sprint.end_date,
+            'points': burndown(sprint),
+        })
+    
+    @action(detail=False, methods=['get'])
+    def velocity(self, request):
+        """Completed points of a project's recent completed sprints"""
+        project_id = request.query_params.get('project', '')
+        if not project_id.isdigit():
+            return Response(
+                {'error': 'project parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        project_id = int(project_id)
+        
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+        except ValueError:
+            limit = 10
+        
+        sprints = list(
+            self.get_queryset().filter(project_id=project_id, status='completed')
+            .order_by('-completed_at', '-id')[:limit]
+        )
+        
+        # Committed scope is only known from the last snapshot: completing a
+        # sprint moves its unfinished tasks out
+        final = {}
+        for snapshot in SprintSnapshot.objects.filter(sprint__in=sprints).order_by('sprint', '-date'):
+            final.setdefault(snapshot.sprint_id, snapshot)
+        
+        rows = []
+        for sprint in sprints:
+            snapshot = final.get(sprint.id)
+            rows.append({
+                'id': sprint.id,
+                'name': sprint.name,
+                'completed_at': sprint.completed_at,
+                'committed_points': snapshot.total_points if snapshot else sprint.get_total_points(),
+                'completed_points': snapshot.completed_points if snapshot else sprint.get_completed_points(),
+            })
+        
+        return Response({
+            'project': project_id,
+            'average_velocity': (
+                round(sum(row['completed_points'] for row in rows) / len(rows), 1) if rows else 0
+            ),
+            'sprints': rows,
+        })
+    
     @action(detail=True, methods=['get'])
     def tasks(self, request, pk=None):
         """Get all tasks in this sprint"""
         sprint = self.get_object()
-        tasks = sprint.tasks.all()
-        serializer = TaskSerializer(tasks, many=True)
+        tasks = TaskListSerializer.optimize_queryset(sprint.tasks.all())
+        serializer = TaskListSerializer(tasks, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
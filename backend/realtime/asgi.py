@@ -0,0 +1,236 @@
+"""
+Server-Sent Events stream of real-time updates.
+
+GET /api/events/?token=<access token>[&projects=3,7]
+
+One long-lived response per client. The stream is a plain ASGI
+application mounted in front of Django (see SynergyOS/asgi.py) rather
+than a Django view: Django's ASGI handler keeps a dedicated thread per
+request for its sync middleware, which for thousands of idle connections
+means thousands of idle threads. Here an idle client is a coroutine
+waiting on its queue, and the database is only touched while connecting
+(token user and project access, on the shared thread pool).
+
+The client receives its own events (notifications) and the events of
+every project it can access, or of the ``projects`` it asks for.
+Browsers' EventSource cannot send headers, so the SimpleJWT access token
+may be passed as ``token`` instead of an Authorization header; the stream
+ends when the token expires and the client reconnects with a fresh one.
+The stream is outside Django's middleware, so it answers CORS itself,
+for the same CORS_ALLOWED_ORIGINS as the rest of the API.
+When the user's project access changes the stream re-subscribes and sends
+``access.changed``; clients should load newly visible projects then, as
+events published while the stream was switching over are not replayed.
+
+Each event is sent as ``event: <type>`` / ``data: <json>``. A comment line
+is sent every KEEPALIVE_SECONDS so proxies keep idle connections open.
+"""
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .broker import Subscriber, get_broker
+from .events import project_channel, user_channel
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PATH = '/api/events/'
+
+KEEPALIVE_SECONDS = 25
+RETRY_MILLISECONDS = 5000
+
+
+def _authenticate(header, raw_token):
+    """(user, validated token) for an Authorization header or raw token, or None"""
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+    authentication = JWTAuthentication()
+    if header:
+        raw_token = authentication.get_raw_token(header) or raw_token
+    if not raw_token:
+        return None
+
+    try:
+        token = authentication.get_validated_token(raw_token)
+        user = authentication.get_user(token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    finally:
+        close_old_connections()
+    return user, token
+
+
+def _scope(user, requested):
+    """Project ids the stream follows: the requested ones the user can access, or all of them"""
+    from projects.access import accessible_project_ids
+
+    try:
+        project_ids = accessible_project_ids(user)
+    finally:
+        close_old_connections()
+    if requested is None:
+        return set(project_ids)
+    return {project_id for project_id in requested if project_id in project_ids}
+
+
+def _channels(user, project_ids):
+    return {user_channel(user.pk)} | {project_channel(project_id) for project_id in project_ids}
+
+
+def _cors_headers(scope):
+    """CORS response headers when the request's Origin is allowed, else none"""
+    origin = dict(scope['headers']).get(b'origin')
+    if not origin:
+        return []
+    allowed = getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False) or (
+        origin.decode('latin-1') in getattr(settings, 'CORS_ALLOWED_ORIGINS', ())
+    )
+    if not allowed:
+        return [(b'vary', b'Origin')]
+
+    headers = [(b'access-control-allow-origin', origin), (b'vary', b'Origin')]
+    if getattr(settings, 'CORS_ALLOW_CREDENTIALS', False):
+        headers.append((b'access-control-allow-credentials', b'true'))
+    return headers
+
+
+def _format(event_type, data):
+    return f'event: {event_type}\ndata: {data}\n\n'.encode()
+
+
+async def _respond(send, status, body, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *headers],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps(body).encode()})
+
+
+async def _stream(send, user, requested, expires_at, headers):
+    broker = get_broker()
+    subscriber = Subscriber()
+    project_ids = await sync_to_async(_scope, thread_sensitive=False)(user, requested)
+    channels = _channels(user, project_ids)
+    await broker.subscribe(channels, subscriber)
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                # Stop nginx from buffering the stream
+                (b'x-accel-buffering', b'no'),
+                *headers,
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': f'retry: {RETRY_MILLISECONDS}\n\n'.encode()
+            + _format('ready', json.dumps({'user': user.pk, 'projects': sorted(project_ids)})),
+            'more_body': True,
+        })
+
+        while True:
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                await send({'type': 'http.response.body', 'body': _format('token_expired', '{}')})
+                return
+
+            try:
+                message = await asyncio.wait_for(
+                    subscriber.queue.get(), min(KEEPALIVE_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+                continue
+
+            body = b''
+            if subscriber.overflowed:
+                # Events were dropped: the client should refetch what it shows
+                subscriber.overflowed = False
+                body += _format('resync', '{}')
+
+            event = json.loads(message)
+            if event['type'] == 'access.changed':
+                # Follow projects the user joined, drop the ones they left
+                previous = channels
+                project_ids = await sync_to_async(_scope, thread_sensitive=False)(user, requested)
+                channels = _channels(user, project_ids)
+                await broker.subscribe(channels - previous, subscriber)
+                await broker.unsubscribe(previous - channels, subscriber)
+                event['data'] = {'projects': sorted(project_ids)}
+            body += _format(event['type'], json.dumps(event['data']))
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        await broker.unsubscribe(channels, subscriber)
+
+
+async def event_stream(scope, receive, send):
+    """ASGI application serving EVENTS_PATH"""
+    cors = _cors_headers(scope)
+    if scope['method'] == 'OPTIONS':
+        # Preflight for clients that send the token in an Authorization header
+        if any(name == b'access-control-allow-origin' for name, _ in cors):
+            cors += [
+                (b'access-control-allow-methods', b'GET, OPTIONS'),
+                (b'access-control-allow-headers', b'authorization, last-event-id'),
+            ]
+        await send({'type': 'http.response.start', 'status': 204, 'headers': cors})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    if scope['method'] != 'GET':
+        await _respond(send, 405, {'error': 'Method not allowed'}, cors)
+        return
+
+    query = parse_qs(scope['query_string'].decode())
+    header = dict(scope['headers']).get(b'authorization')
+    authenticated = await sync_to_async(_authenticate, thread_sensitive=False)(
+        header, query.get('token', [None])[0]
+    )
+    if authenticated is None:
+        await _respond(send, 401, {'error': 'Authentication credentials were not provided or are invalid'}, cors)
+        return
+    user, token = authenticated
+
+    requested = None
+    if query.get('projects'):
+        try:
+            requested = {int(project_id) for project_id in query['projects'][0].split(',')}
+        except ValueError:
+            await _respond(send, 400, {'error': 'projects must be a comma-separated list of ids'}, cors)
+            return
+
+    # Stream until the client goes away or the token expires
+    streaming = asyncio.ensure_future(_stream(send, user, requested, token['exp'], cors))
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    await asyncio.wait({streaming, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    for task in (streaming, disconnected):
+        task.cancel()
+    result, _ = await asyncio.gather(streaming, disconnected, return_exceptions=True)
+    if isinstance(result, Exception):
+        logger.error('Event stream failed', exc_info=result)
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def route_events(application):
+    """Serve EVENTS_PATH from the event stream and everything else from ``application``"""
+    async def router(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+            await event_stream(scope, receive, send)
+        else:
+            await application(scope, receive, send)
+
+    return router
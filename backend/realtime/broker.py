@@ -0,0 +1,142 @@
+"""
+Fan-out of published events to the streams connected to this process.
+
+Each ASGI worker process holds ONE Redis pub/sub connection, whatever the
+number of clients: a stream registers its channels with the broker, the
+broker subscribes to channels the first time any local stream needs them
+(and unsubscribes when the last one leaves), and a single reader task
+copies every message into the queues of the streams listening on its
+channel. An idle client therefore costs a queue and a few set entries,
+not a Redis connection.
+
+Queues are bounded; a client too slow to drain its queue loses events and
+is told to resync (see realtime/asgi.py).
+"""
+import asyncio
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+RECONNECT_DELAY = 1.0
+
+
+class Subscriber:
+    """One connected stream: its queue and whether it has dropped events"""
+
+    __slots__ = ('queue', 'overflowed')
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broker:
+    """Per-process registry of channel -> local subscribers"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.listeners = defaultdict(set)
+
+    def dispatch(self, channel, message):
+        for subscriber in tuple(self.listeners.get(channel, ())):
+            subscriber.deliver(message)
+
+    async def subscribe(self, channels, subscriber):
+        added = []
+        for channel in channels:
+            if not self.listeners[channel]:
+                added.append(channel)
+            self.listeners[channel].add(subscriber)
+        if added:
+            await self._subscribe(added)
+
+    async def unsubscribe(self, channels, subscriber):
+        removed = []
+        for channel in channels:
+            listeners = self.listeners.get(channel)
+            if listeners is None:
+                continue
+            listeners.discard(subscriber)
+            if not listeners:
+                del self.listeners[channel]
+                removed.append(channel)
+        if removed:
+            await self._unsubscribe(removed)
+
+    async def _subscribe(self, channels):
+        pass
+
+    async def _unsubscribe(self, channels):
+        pass
+
+
+class RedisBroker(Broker):
+    """Broker fed by one Redis pub/sub connection"""
+
+    def __init__(self, loop, url):
+        super().__init__(loop)
+        self.url = url
+        self.pubsub = None
+        self.reader = None
+
+    async def _subscribe(self, channels):
+        if self.pubsub is None:
+            import redis.asyncio
+
+            self.pubsub = redis.asyncio.Redis.from_url(self.url).pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.subscribe(*channels)
+        if self.reader is None:
+            self.reader = self.loop.create_task(self._read())
+
+    async def _unsubscribe(self, channels):
+        await self.pubsub.unsubscribe(*channels)
+
+    async def _read(self):
+        while True:
+            try:
+                message = await self.pubsub.get_message(timeout=None)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # The connection re-subscribes to every channel when it comes back
+                logger.exception('Real-time event reader lost its Redis connection')
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            if message and message['type'] == 'message':
+                self.dispatch(message['channel'].decode(), message['data'].decode())
+
+
+_brokers = {}
+
+
+def get_broker():
+    """Broker of the running event loop (created on first use)"""
+    loop = asyncio.get_running_loop()
+    broker = _brokers.get(loop)
+    if broker is None:
+        cache_config = settings.CACHES['default']
+        if cache_config['BACKEND'].startswith('django_redis.'):
+            broker = RedisBroker(loop, cache_config['LOCATION'])
+        else:
+            broker = Broker(loop)
+        _brokers[loop] = broker
+    return broker
+
+
+def publish_locally(channel, message):
+    """Without Redis: deliver to the streams of this process (safe from any thread)"""
+    for loop, broker in list(_brokers.items()):
+        if loop.is_closed():
+            _brokers.pop(loop, None)
+            continue
+        loop.call_soon_threadsafe(broker.dispatch, channel, message)
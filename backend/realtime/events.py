@@ -0,0 +1,102 @@
+"""
+Publishing real-time events.
+
+Events are small JSON messages ``{"type": ..., "data": ...}`` published on
+one channel per user and one per project:
+
+    publish_to_users(user_ids, 'notification.created', {...})
+    publish_to_projects(project_ids, 'task.updated', {...})
+
+Publishing happens after the current transaction commits, so clients never
+hear about rows they cannot read yet. With the django_redis cache the
+message goes to Redis pub/sub and every ASGI worker subscribed to the
+channel forwards it to its connected clients (see realtime/broker.py).
+Without Redis (local development) events are handed to the streams of
+the current process only.
+"""
+import json
+import logging
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(user_id):
+    return cache.make_key(f'events:user:{user_id}')
+
+
+def project_channel(project_id):
+    return cache.make_key(f'events:project:{project_id}')
+
+
+def _redis():
+    """Raw client behind the default cache, or None when it is not django_redis"""
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        return None
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        return None
+
+
+def _send(channels, message):
+    redis = _redis()
+    if redis is None:
+        from .broker import publish_locally
+
+        for channel in channels:
+            publish_locally(channel, message)
+        return
+
+    try:
+        with redis.pipeline(transaction=False) as pipe:
+            for channel in channels:
+                pipe.publish(channel, message)
+            pipe.execute()
+    except Exception:
+        # Live updates are best effort; the data itself is already committed
+        logger.exception('Failed to publish real-time event')
+
+
+def publish(channels, event_type, data):
+    """Send an event on ``channels`` once the transaction commits"""
+    channels = list(channels)
+    if not channels:
+        return
+    message = json.dumps({'type': event_type, 'data': data}, cls=DjangoJSONEncoder)
+    transaction.on_commit(lambda: _send(channels, message))
+
+
+def publish_to_users(user_ids, event_type, data):
+    publish([user_channel(user_id) for user_id in set(user_ids) if user_id], event_type, data)
+
+
+def publish_to_projects(project_ids, event_type, data):
+    publish([project_channel(project_id) for project_id in set(project_ids) if project_id], event_type, data)
+
+
+def task_payload(task, changed=None):
+    return {
+        'id': task.id,
+        'project_id': task.project_id,
+        'title': task.title,
+        'status': task.status,
+        'priority': task.priority,
+        'assigned_to': task.assigned_to_id,
+        'sprint': task.sprint_id,
+        'changed': changed,
+    }
+
+
+def publish_tasks(event_type, tasks, changed=None):
+    """Bulk task writes (bulk updates, imports, recurring runs): one event per project"""
+    by_project = {}
+    for task in tasks:
+        by_project.setdefault(task.project_id, []).append(task_payload(task, changed))
+    for project_id, payloads in by_project.items():
+        publish_to_projects([project_id], event_type, {'project_id': project_id, 'tasks': payloads})
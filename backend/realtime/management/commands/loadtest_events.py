@@ -0,0 +1,200 @@
+"""
+Load test the real-time event stream with many idle connections.
+
+Opens ``--connections`` streams for one user, keeps them idle, then
+publishes ``--events`` events to that user and measures how long each
+event takes to reach every stream.
+
+By default the ASGI application runs inside this process (no server
+needed; events go through the in-process broker unless the cache is
+django_redis). With ``--url`` the streams are real HTTP connections to a
+running server, e.g. the ``events`` service:
+
+    python manage.py loadtest_events --username alice --connections 5000 \\
+        --url http://localhost:8001/api/events/
+
+Against a server, publishing goes through Redis, so this process must use
+the same REDIS_URL. Raise the open file limit (``ulimit -n``) first.
+"""
+import asyncio
+import json
+import resource
+import time
+from statistics import median
+from urllib.parse import urlencode, urlsplit
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from realtime.events import publish_to_users
+
+
+class Stream:
+    """One client: parses the SSE byte stream and records event arrival times"""
+
+    def __init__(self):
+        self.buffer = b''
+        self.ready = asyncio.Event()
+        self.arrivals = {}
+        self.failed = None
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        while b'\n\n' in self.buffer:
+            block, self.buffer = self.buffer.split(b'\n\n', 1)
+            fields = dict(
+                line.split(': ', 1) for line in block.decode().splitlines() if ': ' in line and not line.startswith(':')
+            )
+            if fields.get('event') == 'ready':
+                self.ready.set()
+            elif fields.get('event') == 'loadtest':
+                self.arrivals[json.loads(fields['data'])['sequence']] = time.perf_counter()
+
+
+async def open_http_stream(url, token, stream, closing):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    path = f"{parts.path}?{urlencode({'token': token})}"
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: text/event-stream\r\n\r\n'.encode()
+    )
+    await writer.drain()
+
+    headers = await reader.readuntil(b'\r\n\r\n')
+    if b' 200 ' not in headers.split(b'\r\n', 1)[0]:
+        stream.failed = headers.split(b'\r\n', 1)[0].decode()
+        stream.ready.set()
+        writer.close()
+        return
+
+    chunked = b'transfer-encoding: chunked' in headers.lower()
+    try:
+        while not closing.is_set():
+            if chunked:
+                size = int((await reader.readline()).strip() or b'0', 16)
+                chunk = await reader.readexactly(size + 2)
+                stream.feed(chunk[:-2])
+            else:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                stream.feed(chunk)
+    finally:
+        writer.close()
+
+
+async def open_asgi_stream(application, token, stream, closing, index):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/api/events/',
+        'raw_path': b'/api/events/',
+        'query_string': urlencode({'token': token}).encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'accept', b'text/event-stream')],
+        'client': ('127.0.0.1', 10000 + index),
+        'server': ('localhost', 80),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await closing.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start' and message['status'] != 200:
+            stream.failed = f"HTTP {message['status']}"
+            stream.ready.set()
+        elif message['type'] == 'http.response.body':
+            stream.feed(message.get('body', b''))
+
+    await application(scope, receive, send)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Open many idle event streams and measure event fan-out latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='User the streams authenticate as')
+        parser.add_argument('--connections', type=int, default=2000, help='Number of idle streams')
+        parser.add_argument('--events', type=int, default=20, help='Number of events to fan out')
+        parser.add_argument('--idle', type=float, default=5.0, help='Seconds to hold the streams idle first')
+        parser.add_argument('--url', help='Stream URL of a running ASGI server (default: in-process)')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']!r} does not exist")
+
+        token = str(AccessToken.for_user(user))
+        asyncio.run(self.run(user, token, options))
+
+    async def run(self, user, token, options):
+        closing = asyncio.Event()
+        streams = [Stream() for _ in range(options['connections'])]
+
+        if options['url']:
+            clients = [open_http_stream(options['url'], token, stream, closing) for stream in streams]
+        else:
+            from SynergyOS.asgi import application
+
+            clients = [
+                open_asgi_stream(application, token, stream, closing, index)
+                for index, stream in enumerate(streams)
+            ]
+
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(client) for client in clients]
+        await asyncio.gather(*(stream.ready.wait() for stream in streams))
+        connected = time.perf_counter() - started
+
+        failed = [stream.failed for stream in streams if stream.failed]
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{len(failed)} streams failed, e.g. {failed[0]}'))
+        live = [stream for stream in streams if not stream.failed]
+        self.stdout.write(f'{len(live)} streams connected in {connected:.2f} s')
+
+        await asyncio.sleep(options['idle'])
+
+        latencies = []
+        missing = 0
+        for sequence in range(options['events']):
+            sent = time.perf_counter()
+            await sync_to_async(publish_to_users)([user.pk], 'loadtest', {'sequence': sequence})
+            deadline = sent + 5
+            while time.perf_counter() < deadline and any(sequence not in stream.arrivals for stream in live):
+                await asyncio.sleep(0.005)
+            arrivals = [stream.arrivals[sequence] - sent for stream in live if sequence in stream.arrivals]
+            missing += len(live) - len(arrivals)
+            if arrivals:
+                latencies.append(max(arrivals))
+
+        closing.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if latencies:
+            self.stdout.write(
+                f'fan-out to all {len(live)} streams: median {median(latencies) * 1000:.1f} ms, '
+                f'p95 {percentile(latencies, 0.95) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms '
+                f'over {len(latencies)} events'
+            )
+        if missing:
+            self.stdout.write(self.style.WARNING(f'{missing} deliveries missed the 5 s deadline'))
+        self.stdout.write(
+            f'peak RSS of this process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB'
+        )
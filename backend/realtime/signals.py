@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from projects.models import Comment, ProjectMessage, Task
+
+from .events import publish_to_projects, task_payload
+
+
+@receiver(post_save, sender=Task)
+def push_task(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        publish_to_projects([instance.project_id], 'task.created', task_payload(instance))
+        return
+
+    changed = instance.tracker.changed_fields()
+    if 'project' in changed:
+        # Moved: gone from the old board, new on the other one
+        previous_project_id = instance.tracker.previous('project')
+        publish_to_projects([previous_project_id], 'task.deleted', {
+            'id': instance.id, 'project_id': previous_project_id,
+        })
+        publish_to_projects([instance.project_id], 'task.created', task_payload(instance))
+        return
+    publish_to_projects([instance.project_id], 'task.updated', task_payload(instance, changed))
+
+
+@receiver(post_delete, sender=Task)
+def push_task_deleted(sender, instance, **kwargs):
+    publish_to_projects([instance.project_id], 'task.deleted', {
+        'id': instance.id, 'project_id': instance.project_id,
+    })
+
+
+@receiver(post_save, sender=ProjectMessage)
+def push_message(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    publish_to_projects([instance.project_id], 'message.created', {
+        'id': instance.id,
+        'project_id': instance.project_id,
+        'sender': instance.sender_id,
+        'parent': instance.parent_id,
+        'preview': instance.message[:100],
+    })
+
+
+@receiver(post_save, sender=Comment)
+def push_comment(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    task = instance.task
+    publish_to_projects([task.project_id], 'comment.created', {
+        'id': instance.id, 'task_id': task.id, 'project_id': task.project_id,
+    })
+
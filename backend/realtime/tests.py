@@ -0,0 +1,130 @@
+import json
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from projects.models import Project
+
+from .asgi import EVENTS_PATH, event_stream
+from .events import publish_to_projects, publish_to_users
+
+ORIGIN = 'https://app.example.com'
+
+# Publishing registers an on_commit callback, which touches the connection
+to_projects = sync_to_async(publish_to_projects)
+to_users = sync_to_async(publish_to_users)
+
+
+@override_settings(CORS_ALLOWED_ORIGINS=[ORIGIN], CORS_ALLOW_ALL_ORIGINS=False, CORS_ALLOW_CREDENTIALS=True)
+class EventStreamTests(TransactionTestCase):
+    # The stream reads the database from worker threads, so rows must be committed
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner')
+        self.project = Project.objects.create(name='Apollo', owner=self.owner)
+        self.other = Project.objects.create(name='Gemini', owner=User.objects.create_user(username='stranger'))
+        self.token = str(AccessToken.for_user(self.owner))
+
+    def connect(self, method='GET', query='', headers=()):
+        return ApplicationCommunicator(event_stream, {
+            'type': 'http',
+            'method': method,
+            'path': EVENTS_PATH,
+            'query_string': query.encode(),
+            'headers': list(headers),
+        })
+
+    async def response(self, communicator):
+        start = await communicator.receive_output(timeout=5)
+        body = await communicator.receive_output(timeout=5)
+        return start['status'], dict(start['headers']), body['body']
+
+    async def next_event(self, communicator):
+        body = (await communicator.receive_output(timeout=5))['body'].decode()
+        event_type, data = [line.split(': ', 1)[1] for line in body.strip().splitlines()[-2:]]
+        return event_type, json.loads(data)
+
+    async def close(self, communicator):
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(timeout=5)
+
+    async def test_preflight_answers_allowed_origins_only(self):
+        status, headers, _ = await self.response(self.connect('OPTIONS', headers=[(b'origin', ORIGIN.encode())]))
+        self.assertEqual(status, 204)
+        self.assertEqual(headers[b'access-control-allow-origin'], ORIGIN.encode())
+        self.assertEqual(headers[b'access-control-allow-credentials'], b'true')
+        self.assertIn(b'authorization', headers[b'access-control-allow-headers'])
+
+        status, headers, _ = await self.response(
+            self.connect('OPTIONS', headers=[(b'origin', b'https://evil.example.com')])
+        )
+        self.assertEqual(status, 204)
+        self.assertNotIn(b'access-control-allow-origin', headers)
+        self.assertNotIn(b'access-control-allow-methods', headers)
+        self.assertEqual(headers[b'vary'], b'Origin')
+
+    async def test_rejects_missing_or_invalid_tokens(self):
+        for query in ('', 'token=not-a-token'):
+            with self.subTest(query=query):
+                status, headers, body = await self.response(
+                    self.connect(query=query, headers=[(b'origin', ORIGIN.encode())])
+                )
+                self.assertEqual(status, 401)
+                # Errors carry CORS headers too, so the browser can read them
+                self.assertEqual(headers[b'access-control-allow-origin'], ORIGIN.encode())
+                self.assertIn('error', json.loads(body))
+
+        status, _, _ = await self.response(self.connect('POST', query=f'token={self.token}'))
+        self.assertEqual(status, 405)
+        status, _, _ = await self.response(self.connect(query=f'token={self.token}&projects=1,two'))
+        self.assertEqual(status, 400)
+
+    async def test_streams_own_and_accessible_project_events(self):
+        communicator = self.connect(
+            headers=[(b'authorization', f'Bearer {self.token}'.encode()), (b'origin', ORIGIN.encode())]
+        )
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(dict(start['headers'])[b'content-type'], b'text/event-stream')
+        self.assertEqual(dict(start['headers'])[b'access-control-allow-origin'], ORIGIN.encode())
+        self.assertEqual(
+            await self.next_event(communicator), ('ready', {'user': self.owner.pk, 'projects': [self.project.pk]})
+        )
+
+        await to_projects([self.other.pk], 'task.created', {'id': 1})
+        await to_projects([self.project.pk], 'task.created', {'id': 2})
+        await to_users([self.owner.pk], 'notification.created', {'id': 3})
+
+        self.assertEqual(await self.next_event(communicator), ('task.created', {'id': 2}))
+        self.assertEqual(await self.next_event(communicator), ('notification.created', {'id': 3}))
+        await self.close(communicator)
+
+    async def test_follows_access_changes(self):
+        communicator = self.connect(query=f'token={self.token}')
+        await communicator.send_input({'type': 'http.request'})
+        await communicator.receive_output(timeout=5)
+        self.assertEqual((await self.next_event(communicator))[1]['projects'], [self.project.pk])
+
+        await sync_to_async(self.other.team_members.add)(self.owner)
+
+        self.assertEqual(
+            await self.next_event(communicator),
+            ('access.changed', {'projects': sorted([self.project.pk, self.other.pk])}),
+        )
+        await to_projects([self.other.pk], 'task.created', {'id': 1})
+        self.assertEqual(await self.next_event(communicator), ('task.created', {'id': 1}))
+        await self.close(communicator)
+
+    async def test_requested_projects_are_limited_to_accessible_ones(self):
+        communicator = self.connect(query=f'token={self.token}&projects={self.project.pk},{self.other.pk}')
+        await communicator.send_input({'type': 'http.request'})
+        await communicator.receive_output(timeout=5)
+
+        self.assertEqual((await self.next_event(communicator))[1]['projects'], [self.project.pk])
+        await self.close(communicator)
@@ -81,16 +81,21 @@ def send_monthly_summary():
             csv_buffer = generator.generate_csv()
             
             # Get summary statistics
-            from projects.models import Task
-            from django.db.models import Q
+            from django.db.models import Sum
+            from projects.access import accessible_project_ids
+            from projects.models import DailyTimeRollup, Task
             
-            user_projects = user.owned_projects.all() | user.project_memberships.all()
+            project_count = len(accessible_project_ids(user))
             tasks = Task.objects.filter(assigned_to=user, created_at__gte=date_from, created_at__lte=date_to)
             completed_tasks = tasks.filter(status='done').count()
             total_tasks = tasks.count()
             
-            # Placeholder for total hours (can be implemented with actual time tracking)
-            total_hours = tasks.count() * 4  # Estimate 4 hours per task
+            total_minutes = DailyTimeRollup.objects.filter(
+                user=user,
+                date__gte=timezone.localdate(date_from),
+                date__lte=timezone.localdate(date_to)
+            ).aggregate(total=Sum('minutes'))['total'] or 0
+            total_hours = total_minutes / 60
             
             # Send email with CSV attachment
             email = EmailMessage(
@@ -105,7 +110,7 @@ def send_monthly_summary():
                 - Completed Tasks: {completed_tasks}
                 - Completion Rate: {(completed_tasks/total_tasks*100):.1f}% if total_tasks > 0 else 0.0%
                 - Total Hours Logged: {total_hours:.2f}
-                - Projects: {user_projects.count()}
+                - Projects: {project_count}
                 
                 Please find your detailed time tracking report attached.
                 
@@ -6,7 +6,6 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.db.models import Q
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -217,17 +216,16 @@ class TeamReportGenerator(ReportGenerator):
         story.append(Spacer(1, 0.3 * inch))
         
         # Get team members
-        from projects.models import Project, Task
+        from projects.access import accessible_project_ids
+        from projects.models import ProjectMembership, Task
         
         if self.user:
             # Filter by user's projects
-            projects = Project.objects.filter(
-                Q(owner=self.user) | Q(team_members=self.user)
-            ).distinct()
             team_members = User.objects.filter(
-                Q(owned_projects__in=projects) | 
-                Q(projects__in=projects)
-            ).distinct()
+                id__in=ProjectMembership.objects.filter(
+                    project_id__in=accessible_project_ids(self.user)
+                ).values('user_id')
+            )
         else:
             team_members = User.objects.all()[:20]  # Limit to 20 users
         
@@ -268,16 +266,15 @@ class TeamReportGenerator(ReportGenerator):
     
     def generate_csv(self):
         """Generate CSV report for team activity"""
-        from projects.models import Project, Task
+        from projects.access import accessible_project_ids
+        from projects.models import ProjectMembership, Task
         
         if self.user:
-            projects = Project.objects.filter(
-                Q(owner=self.user) | Q(team_members=self.user)
-            ).distinct()
             team_members = User.objects.filter(
-                Q(owned_projects__in=projects) | 
-                Q(projects__in=projects)
-            ).distinct()
+                id__in=ProjectMembership.objects.filter(
+                    project_id__in=accessible_project_ids(self.user)
+                ).values('user_id')
+            )
         else:
             team_members = User.objects.all()
         
@@ -311,36 +308,29 @@ class TimeTrackingReportGenerator(ReportGenerator):
     """Generate time tracking reports"""
     
     def generate_csv(self):
-        """Generate CSV report for time tracking"""
-        from projects.models import Task
+        """Generate CSV report of hours logged per day, user and project"""
+        from projects.models import DailyTimeRollup
         
-        # Get tasks with time estimates and completion data
-        tasks = Task.objects.filter(
-            created_at__gte=self.date_from,
-            created_at__lte=self.date_to
-        ).select_related('assigned_to', 'project')
+        # Read the daily rollup: one row per day/user/project, not per entry
+        rollups = DailyTimeRollup.objects.filter(
+            date__gte=timezone.localdate(self.date_from),
+            date__lte=timezone.localdate(self.date_to)
+        ).select_related('user', 'project').order_by('date', 'project__name')
         
         if self.user:
-            tasks = tasks.filter(assigned_to=self.user)
+            rollups = rollups.filter(user=self.user)
         
         data = []
-        for task in tasks:
-            # Calculate estimated hours (placeholder data)
-            estimated_hours = 8 if task.priority == 'high' else 4 if task.priority == 'medium' else 2
-            
+        for rollup in rollups:
             data.append({
-                'Date': task.created_at.strftime('%Y-%m-%d'),
-                'User': task.assigned_to.username if task.assigned_to else 'Unassigned',
-                'Project': task.project.name if task.project else 'N/A',
-                'Task': task.title,
-                'Status': task.status,
-                'Priority': task.priority or 'N/A',
-                'Due Date': task.due_date.strftime('%Y-%m-%d') if task.due_date else 'N/A',
-                'Estimated Hours': estimated_hours,
-                'Description': task.description or '',
+                'Date': rollup.date.strftime('%Y-%m-%d'),
+                'User': rollup.user.username if rollup.user else 'Deleted user',
+                'Project': rollup.project.name,
+                'Hours Logged': round(rollup.minutes / 60, 2),
+                'Entries': rollup.entry_count,
             })
         
-        df = pd.DataFrame(data)
+        df = pd.DataFrame(data, columns=['Date', 'User', 'Project', 'Hours Logged', 'Entries'])
         buffer = io.BytesIO()
         df.to_csv(buffer, index=False)
         buffer.seek(0)
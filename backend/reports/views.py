@@ -13,7 +13,9 @@ from django.views import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from datetime import datetime, timedelta
+from projects.access import accessible_project_ids, has_project_access
 from projects.models import Project
+from projects.response_cache import cache_response, user_projects
 from .utils import ProjectReportGenerator, TeamReportGenerator, TimeTrackingReportGenerator
 
 
@@ -78,7 +80,7 @@ class ReportProjectView(ReportBaseView):
             )
         
         # Check permission
-        if not (project.owner == request.user or request.user in project.team_members.all()):
+        if not has_project_access(request.user, project):
             return Response(
                 {'error': 'You do not have permission to view this project report'},
                 status=status.HTTP_403_FORBIDDEN
@@ -211,6 +213,7 @@ class ReportTimeTrackingView(View):
 class ReportSummaryView(ReportBaseView):
     """Get a summary of report statistics"""
     
+    @cache_response(projects=user_projects)
     def get(self, request):
         """
         GET /api/reports/summary/?date_from=2024-01-01&date_to=2024-12-31
@@ -222,36 +225,47 @@ class ReportSummaryView(ReportBaseView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        from projects.models import Task
-        from django.db.models import Sum, Count, Q
+        from projects.models import DailyTaskRollup, DailyTimeRollup, Task
+        from django.db.models import Sum, Count
         
         # Get user's projects
-        user_projects = Project.objects.filter(
-            Q(owner=request.user) | Q(team_members=request.user)
-        ).distinct()
+        project_ids = accessible_project_ids(request.user)
+        user_projects = Project.objects.filter(pk__in=project_ids)
         
         # Get tasks in date range
         tasks = Task.objects.filter(
-            project__in=user_projects,
+            project_id__in=project_ids,
             created_at__gte=date_from,
             created_at__lte=date_to
         )
         
         # Calculate statistics
-        total_projects = user_projects.count()
+        total_projects = len(project_ids)
         completed_projects = user_projects.filter(status='completed').count()
         
         total_tasks = tasks.count()
         completed_tasks = tasks.filter(status='done').count()
         in_progress_tasks = tasks.filter(status='in_progress').count()
         
-        # For now, set total_hours to 0 (time tracking can be added later)
-        total_hours = 0
+        # Time and throughput come from the daily rollups (one row per project/day)
+        days = {
+            'date__gte': timezone.localdate(date_from),
+            'date__lte': timezone.localdate(date_to),
+        }
+        total_minutes = DailyTimeRollup.objects.filter(
+            project_id__in=project_ids, **days
+        ).aggregate(total=Sum('minutes'))['total'] or 0
+        total_hours = total_minutes / 60
+        
+        throughput = DailyTaskRollup.objects.filter(
+            project_id__in=project_ids, **days
+        ).aggregate(created=Sum('created_count'), completed=Sum('completed_count'))
+        tasks_completed = throughput['completed'] or 0
         
         # Team size
-        team_members = set()
-        for project in user_projects:
-            team_members.update(project.team_members.values_list('id', flat=True))
+        team_size = Project.team_members.through.objects.filter(
+            project_id__in=project_ids
+        ).values('user_id').distinct().count()
         
         return Response({
             'date_range': {
@@ -274,7 +288,12 @@ class ReportSummaryView(ReportBaseView):
                 'total_hours': round(total_hours, 2),
                 'average_per_day': round(total_hours / max((date_to - date_from).days, 1), 2),
             },
+            'throughput': {
+                'created': throughput['created'] or 0,
+                'completed': tasks_completed,
+                'average_completed_per_day': round(tasks_completed / max((date_to - date_from).days, 1), 2),
+            },
             'team': {
-                'size': len(team_members),
+                'size': team_size,
             }
         })
@@ -0,0 +1,150 @@
+"""
+Maintenance of the search index.
+
+Every task, comment, project message and project has one SearchDocument
+row holding the text that is searched (``title`` weighs more than
+``body``) and the project it is filtered by. The database keeps its own
+full-text index over those rows in step (see migrations/0002), so the
+code here only has to upsert and delete documents:
+
+    index_instance(task)        on save (see search/signals.py)
+    remove_instance(task)       on delete
+    index_tasks(tasks)          after bulk inserts (import, templates)
+    rebuild_index(project_ids)  full rebuild (rebuild_search_index command)
+"""
+from django.db import transaction
+
+REBUILD_BATCH_SIZE = 1000
+
+TITLE_LENGTH = 300
+
+
+def _task_document(task):
+    return {
+        'project_id': task.project_id,
+        'task_id': task.id,
+        'title': task.title,
+        'body': task.description,
+    }
+
+
+def _comment_document(comment):
+    return {
+        'project_id': comment.task.project_id,
+        'task_id': comment.task_id,
+        'title': comment.task.title,
+        'body': comment.content,
+    }
+
+
+def _message_document(message):
+    return {
+        'project_id': message.project_id,
+        'task_id': None,
+        'title': '',
+        'body': message.message,
+    }
+
+
+def _project_document(project):
+    return {
+        'project_id': project.id,
+        'task_id': None,
+        'title': project.name,
+        'body': project.description,
+    }
+
+
+def _builders():
+    from projects.models import Comment, Project, ProjectMessage, Task
+
+    return {
+        Task: ('task', _task_document),
+        Comment: ('comment', _comment_document),
+        ProjectMessage: ('message', _message_document),
+        Project: ('project', _project_document),
+    }
+
+
+def _document(kind, object_id, fields):
+    from .models import SearchDocument
+
+    fields = dict(fields, title=(fields['title'] or '')[:TITLE_LENGTH], body=fields['body'] or '')
+    return SearchDocument(kind=kind, object_id=object_id, **fields)
+
+
+def _upsert(documents):
+    from .models import SearchDocument
+
+    SearchDocument.objects.bulk_create(
+        documents,
+        batch_size=REBUILD_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['project', 'task', 'title', 'body', 'updated_at'],
+    )
+
+
+def index_instance(instance):
+    """Create or refresh the document for a task, comment, message or project"""
+    kind, build = _builders()[type(instance)]
+    _upsert([_document(kind, instance.pk, build(instance))])
+
+
+def remove_instance(instance):
+    """Delete the document for a task, comment, message or project"""
+    from .models import SearchDocument
+
+    kind, _ = _builders()[type(instance)]
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def refresh_task_comments(task):
+    """Comment documents carry their task's title and project; update them in place"""
+    from .models import SearchDocument
+
+    SearchDocument.objects.filter(kind='comment', task_id=task.id).update(
+        title=task.title[:TITLE_LENGTH], project_id=task.project_id
+    )
+
+
+def index_tasks(tasks):
+    """Index tasks created with bulk_create (which sends no post_save)"""
+    _upsert([_document('task', task.id, _task_document(task)) for task in tasks])
+
+
+def rebuild_index(project_ids=None):
+    """Re-create the documents of the given projects (all when None); returns the number written"""
+    from projects.models import Comment, Project, ProjectMessage, Task
+
+    from .models import SearchDocument
+
+    sources = [
+        ('project', Project.objects.only('id', 'name', 'description'), 'id', _project_document),
+        ('task', Task.objects.only('id', 'project', 'title', 'description'), 'project_id', _task_document),
+        ('comment', Comment.objects.select_related('task').only(
+            'id', 'content', 'task__id', 'task__project', 'task__title'
+        ), 'task__project_id', _comment_document),
+        ('message', ProjectMessage.objects.only('id', 'project', 'message'), 'project_id', _message_document),
+    ]
+
+    written = 0
+    with transaction.atomic():
+        documents = SearchDocument.objects.all()
+        if project_ids is not None:
+            documents = documents.filter(project_id__in=project_ids)
+        documents.delete()
+
+        for kind, queryset, project_field, build in sources:
+            if project_ids is not None:
+                queryset = queryset.filter(**{f'{project_field}__in': project_ids})
+            batch = []
+            for instance in queryset.order_by('pk').iterator(chunk_size=REBUILD_BATCH_SIZE):
+                batch.append(_document(kind, instance.pk, build(instance)))
+                if len(batch) >= REBUILD_BATCH_SIZE:
+                    _upsert(batch)
+                    written += len(batch)
+                    batch = []
+            _upsert(batch)
+            written += len(batch)
+    return written
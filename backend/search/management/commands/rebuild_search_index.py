@@ -0,0 +1,21 @@
+"""
+Rebuild search documents from tasks, comments, messages and projects
+"""
+from django.core.management.base import BaseCommand
+
+from search.indexing import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Re-create the full-text search documents for projects (drift repair)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'project_ids', nargs='*', type=int,
+            help='Only rebuild these projects (default: all projects)'
+        )
+    
+    def handle(self, *args, **options):
+        project_ids = options['project_ids'] or None
+        count = rebuild_index(project_ids=project_ids)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} search document(s)'))
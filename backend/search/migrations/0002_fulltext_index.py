@@ -0,0 +1,122 @@
+from django.db import migrations
+from django.db.models import CharField, IntegerField, Value
+
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE search_searchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX search_document_vector_gin ON search_searchdocument USING GIN (search_vector)",
+]
+POSTGRESQL_REVERSE = [
+    "DROP INDEX IF EXISTS search_document_vector_gin",
+    "ALTER TABLE search_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+# External-content FTS5 table: the index only, text stays in search_searchdocument.
+# Triggers are dropped if SQLite's schema editor ever remakes the table, so a
+# later migration altering search_searchdocument must recreate them.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_searchdocument_fts USING fts5(
+        title, body, content='search_searchdocument', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_ai AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_ad AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_au AFTER UPDATE OF title, body ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS search_searchdocument_au",
+    "DROP TRIGGER IF EXISTS search_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS search_searchdocument_ai",
+    "DROP TABLE IF EXISTS search_searchdocument_fts",
+]
+
+STATEMENTS = {
+    'postgresql': (POSTGRESQL_FORWARD, POSTGRESQL_REVERSE),
+    'sqlite': (SQLITE_FORWARD, SQLITE_REVERSE),
+}
+
+BATCH_SIZE = 1000
+
+
+def _run(schema_editor, forward):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        # Other databases search with the unindexed fallback (search/query.py)
+        return
+    for sql in statements[0 if forward else 1]:
+        schema_editor.execute(sql)
+
+
+def create_index(apps, schema_editor):
+    _run(schema_editor, forward=True)
+
+    # Index existing rows (the triggers / generated column pick them up)
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    Comment = apps.get_model('projects', 'Comment')
+    ProjectMessage = apps.get_model('projects', 'ProjectMessage')
+
+    # (kind, rows of (object id, project id, task id, title, body))
+    sources = [
+        ('project', Project.objects.annotate(task=Value(None, IntegerField())).values_list(
+            'id', 'id', 'task', 'name', 'description'
+        )),
+        ('task', Task.objects.values_list('id', 'project_id', 'id', 'title', 'description')),
+        ('comment', Comment.objects.values_list('id', 'task__project_id', 'task_id', 'task__title', 'content')),
+        ('message', ProjectMessage.objects.annotate(
+            task=Value(None, IntegerField()), title=Value('', CharField())
+        ).values_list('id', 'project_id', 'task', 'title', 'message')),
+    ]
+    for kind, rows in sources:
+        batch = []
+        for object_id, project_id, task_id, title, body in rows.order_by('pk').iterator(chunk_size=BATCH_SIZE):
+            batch.append(SearchDocument(
+                kind=kind,
+                object_id=object_id,
+                project_id=project_id,
+                task_id=task_id,
+                title=(title or '')[:300],
+                body=body or '',
+            ))
+            if len(batch) >= BATCH_SIZE:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+
+
+def drop_index(apps, schema_editor):
+    _run(schema_editor, forward=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
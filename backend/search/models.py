@@ -0,0 +1,38 @@
+from django.db import models
+
+from projects.models import Project, Task
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable row per task, comment, message or project.
+    
+    The full-text index over ``title`` and ``body`` lives outside the ORM:
+    a generated ``tsvector`` column with a GIN index on PostgreSQL, an FTS5
+    table kept in sync by triggers on SQLite (see migrations/0002).
+    """
+    
+    KIND_CHOICES = [
+        ('task', 'Task'),
+        ('comment', 'Comment'),
+        ('message', 'Message'),
+        ('project', 'Project'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='search_documents')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, null=True, blank=True,
+                             related_name='search_documents',
+                             help_text="Task the document belongs to (tasks and comments)")
+    title = models.CharField(max_length=300, blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
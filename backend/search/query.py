@@ -0,0 +1,163 @@
+"""
+Ranked full-text queries over SearchDocument.
+
+Each backend uses its own inverted index:
+
+    postgresql  ``search_vector`` tsvector column (GIN), matched with
+                ``websearch_to_tsquery``, ranked with ``ts_rank_cd``;
+                ``ts_headline`` runs only on the returned page
+    sqlite      ``search_searchdocument_fts`` FTS5 table, ranked with
+                ``bm25`` (title weighted 10x) and highlighted with
+                ``highlight`` / ``snippet``
+    other       unindexed ``icontains`` fallback, newest first
+
+Results are always limited to the caller's projects and fetched one row past
+the page to tell whether another page follows, so no match count is needed.
+"""
+import html
+import re
+from collections import namedtuple
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+SearchHit = namedtuple('SearchHit', [
+    'id', 'kind', 'object_id', 'project_id', 'task_id', 'title', 'snippet', 'rank', 'updated_at',
+])
+
+SNIPPET_WORDS = 24
+TEXT_CONFIG = 'english'
+
+# Markers placed around matches by the database, replaced by <mark> after escaping
+START, STOP = '\x02', '\x03'
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def _markup(text):
+    """Escape text from the database and turn match markers into <mark> tags"""
+    if not text:
+        return ''
+    return html.escape(text).replace(START, '<mark>').replace(STOP, '</mark>')
+
+
+def _filters(project_ids, kinds, column='d.'):
+    """WHERE fragments and params restricting documents to projects and kinds"""
+    clauses = [f"{column}project_id IN ({', '.join(['%s'] * len(project_ids))})"]
+    params = list(project_ids)
+    if kinds:
+        clauses.append(f"{column}kind IN ({', '.join(['%s'] * len(kinds))})")
+        params.extend(kinds)
+    return clauses, params
+
+
+def fts5_query(text):
+    """
+    FTS5 MATCH expression for free text: every word must appear, the last one
+    as a prefix (search-as-you-type). Words are quoted so that FTS5 syntax in
+    user input is never interpreted.
+    """
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _search_postgresql(text, project_ids, kinds, limit, offset):
+    filters, params = _filters(project_ids, kinds)
+    sql = f"""
+        SELECT page.id, page.kind, page.object_id, page.project_id, page.task_id,
+               ts_headline(%s, page.title, page.query, %s),
+               ts_headline(%s, page.body, page.query, %s),
+               page.rank, page.updated_at
+        FROM (
+            SELECT d.id, d.kind, d.object_id, d.project_id, d.task_id, d.title, d.body,
+                   d.updated_at, query, ts_rank_cd(d.search_vector, query) AS rank
+            FROM search_searchdocument d, websearch_to_tsquery(%s, %s) query
+            WHERE d.search_vector @@ query AND {' AND '.join(filters)}
+            ORDER BY rank DESC, d.id DESC
+            LIMIT %s OFFSET %s
+        ) page
+        ORDER BY page.rank DESC, page.id DESC
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [
+            TEXT_CONFIG, f'HighlightAll=true, StartSel={START}, StopSel={STOP}',
+            TEXT_CONFIG, f'MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}, StartSel={START}, StopSel={STOP}',
+            TEXT_CONFIG, text, *params, limit, offset,
+        ])
+        return cursor.fetchall()
+
+
+def _search_sqlite(text, project_ids, kinds, limit, offset):
+    match = fts5_query(text)
+    if match is None:
+        return []
+    filters, params = _filters(project_ids, kinds)
+    sql = f"""
+        SELECT d.id, d.kind, d.object_id, d.project_id, d.task_id,
+               highlight(search_searchdocument_fts, 0, %s, %s),
+               snippet(search_searchdocument_fts, 1, %s, %s, '…', {SNIPPET_WORDS}),
+               -bm25(search_searchdocument_fts, 10.0, 1.0) AS rank, d.updated_at
+        FROM search_searchdocument_fts
+        JOIN search_searchdocument d ON d.id = search_searchdocument_fts.rowid
+        WHERE search_searchdocument_fts MATCH %s AND {' AND '.join(filters)}
+        ORDER BY rank DESC, d.id DESC
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [START, STOP, START, STOP, match, *params, limit, offset])
+        rows = cursor.fetchall()
+    # Raw SQLite cursors return timestamps as text
+    return [(*row[:8], _sqlite_datetime(row[8])) for row in rows]
+
+
+def _sqlite_datetime(value):
+    value = parse_datetime(value) if isinstance(value, str) else value
+    if value is not None and settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+def _search_fallback(text, project_ids, kinds, limit, offset):
+    from django.db.models import Q
+
+    from .models import SearchDocument
+
+    documents = SearchDocument.objects.filter(project_id__in=project_ids).filter(
+        Q(title__icontains=text) | Q(body__icontains=text)
+    )
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    return [
+        (*row[:5], row[5], row[6][:SNIPPET_WORDS * 8], 0.0, row[7])
+        for row in documents.order_by('-updated_at', '-id').values_list(
+            'id', 'kind', 'object_id', 'project_id', 'task_id', 'title', 'body', 'updated_at'
+        )[offset:offset + limit]
+    ]
+
+
+_BACKENDS = {
+    'postgresql': _search_postgresql,
+    'sqlite': _search_sqlite,
+}
+
+
+def search(text, project_ids, kinds=None, limit=20, offset=0):
+    """Best matches for ``text`` among documents of ``project_ids``, as SearchHit tuples"""
+    text = (text or '').strip()
+    project_ids = sorted(project_ids)
+    if not text or not project_ids:
+        return []
+
+    run = _BACKENDS.get(connection.vendor, _search_fallback)
+    hits = []
+    for row in run(text, project_ids, sorted(kinds or ()), limit, offset):
+        hit = SearchHit(*row)
+        hits.append(hit._replace(title=_markup(hit.title), snippet=_markup(hit.snippet), rank=float(hit.rank or 0)))
+    return hits
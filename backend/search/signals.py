@@ -0,0 +1,47 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from projects.models import Comment, Project, ProjectMessage, Task
+
+from .indexing import index_instance, refresh_task_comments, remove_instance
+
+
+def _saves_any(update_fields, fields):
+    """False when save(update_fields=...) wrote none of the searchable fields"""
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    tracker = instance.tracker
+    if created or any(tracker.has_changed(field) for field in ('project', 'title', 'description')):
+        index_instance(instance)
+    if not created and (tracker.has_changed('project') or tracker.has_changed('title')):
+        refresh_task_comments(instance)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw and _saves_any(update_fields, {'content', 'task'}):
+        index_instance(instance)
+
+
+@receiver(post_save, sender=ProjectMessage)
+def index_message(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw and _saves_any(update_fields, {'message', 'project'}):
+        index_instance(instance)
+
+
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw and _saves_any(update_fields, {'name', 'description'}):
+        index_instance(instance)
+
+
+# Task and project deletes cascade to their documents through the foreign keys
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=ProjectMessage)
+def remove_document(sender, instance, **kwargs):
+    remove_instance(instance)
@@ -0,0 +1,110 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from projects.models import Comment, Project, ProjectMessage, Task
+
+from .indexing import rebuild_index
+from .models import SearchDocument
+from .query import fts5_query
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner')
+        self.project = Project.objects.create(name='Apollo', owner=self.owner, description='Moon landing')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def search(self, q, **params):
+        response = self.client.get(reverse('search'), {'q': q, **params})
+        return response.status_code, response.json()
+
+    def results(self, q, **params):
+        status_code, body = self.search(q, **params)
+        self.assertEqual(status_code, 200)
+        return [(hit['type'], hit['id']) for hit in body['results']]
+
+    def test_title_matches_rank_above_body_matches(self):
+        in_body = Task.objects.create(project=self.project, title='Telemetry', description='Check the thruster valves')
+        in_title = Task.objects.create(project=self.project, title='Thruster repair', description='Urgent')
+
+        self.assertEqual(self.results('thruster'), [('task', in_title.pk), ('task', in_body.pk)])
+
+    def test_highlighting_and_prefix_matching(self):
+        task = Task.objects.create(project=self.project, title='Thruster <b>repair</b>')
+
+        hit = self.search('thrus')[1]['results'][0]
+
+        self.assertEqual(hit['id'], task.pk)
+        self.assertEqual(hit['title'], '<mark>Thruster</mark> &lt;b&gt;repair&lt;/b&gt;')
+
+    def test_only_accessible_projects_are_searched(self):
+        stranger = User.objects.create_user(username='stranger')
+        hidden = Project.objects.create(name='Hidden thruster', owner=stranger)
+        Task.objects.create(project=hidden, title='Thruster plans')
+        mine = Task.objects.create(project=self.project, title='Thruster repair')
+
+        self.assertEqual(self.results('thruster'), [('task', mine.pk)])
+        self.assertEqual(self.search('thruster', project=hidden.pk)[0], 404)
+
+        hidden.team_members.add(self.owner)
+        self.assertEqual(len(self.results('thruster')), 3)
+
+    def test_kinds_and_projects_filter(self):
+        task = Task.objects.create(project=self.project, title='Valve check')
+        comment = Comment.objects.create(task=task, user=self.owner, content='The valve leaks')
+        Project.objects.create(name='Valve works', owner=self.owner)
+
+        self.assertEqual(self.results('valve', type='comment'), [('comment', comment.pk)])
+        self.assertEqual(
+            set(self.results('valve', project=self.project.pk)), {('task', task.pk), ('comment', comment.pk)}
+        )
+
+    def test_index_follows_edits(self):
+        task = Task.objects.create(project=self.project, title='Valve check')
+        comment = Comment.objects.create(task=task, user=self.owner, content='Leaking')
+
+        task.title = 'Pump check'
+        task.save()
+        self.assertEqual(self.results('valve'), [])
+        # Comment documents carry their task's title
+        self.assertEqual(set(self.results('pump')), {('task', task.pk), ('comment', comment.pk)})
+
+        comment.delete()
+        task.delete()
+        self.assertEqual(self.results('pump'), [])
+        self.assertFalse(SearchDocument.objects.exclude(kind='project').exists())
+
+    def test_messages_and_rebuild(self):
+        message = ProjectMessage.objects.create(project=self.project, sender=self.owner, message='Launch window moved')
+        self.assertEqual(self.results('window'), [('message', message.pk)])
+
+        SearchDocument.objects.all().delete()
+        self.assertEqual(rebuild_index([self.project.pk]), 2)
+        self.assertEqual(self.results('window'), [('message', message.pk)])
+
+    def test_paging(self):
+        Task.objects.bulk_create(Task(project=self.project, title=f'Valve {number}') for number in range(5))
+        rebuild_index()
+
+        status_code, first = self.search('valve', page_size=2)
+        self.assertEqual(len(first['results']), 2)
+        self.assertIsNone(first['previous'])
+        status_code, last = self.search('valve', page_size=2, page=3)
+        self.assertEqual(len(last['results']), 1)
+        self.assertIsNone(last['next'])
+
+    def test_bad_requests(self):
+        for params in ({'q': ''}, {'q': 'valve', 'type': 'sprint'}, {'q': 'valve', 'page': 'two'}):
+            with self.subTest(**params):
+                self.assertEqual(self.client.get(reverse('search'), params).status_code, 400)
+
+    def test_user_input_is_not_fts5_syntax(self):
+        self.assertEqual(fts5_query('valve OR "pump" -x'), '"valve" "OR" "pump" "x"*')
+        self.assertIsNone(fts5_query('*()'))
+        self.assertEqual(self.results('NEAR(valve'), [])
@@ -0,0 +1,10 @@
+"""
+URL Configuration for Search API
+"""
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('', views.SearchView.as_view(), name='search'),
+]
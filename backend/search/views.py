@@ -0,0 +1,104 @@
+"""
+REST API view for full-text search
+"""
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import APIView
+
+from projects.access import accessible_project_ids
+from projects.models import Project
+
+from .models import SearchDocument
+from .query import search
+
+
+class SearchView(APIView):
+    """Ranked, highlighted search over the caller's tasks, comments, messages and projects"""
+    permission_classes = [IsAuthenticated]
+    
+    page_size = 20
+    max_page_size = 50
+    max_page = 50
+    
+    def get(self, request):
+        """
+        GET /api/search/?q=login+bug&type=task,comment&project=3&page=1&page_size=20
+        """
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response(
+                {'error': 'q parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        kinds = {
+            kind.strip()
+            for value in request.query_params.getlist('type')
+            for kind in value.split(',') if kind.strip()
+        }
+        valid_kinds = {choice for choice, _ in SearchDocument.KIND_CHOICES}
+        if kinds - valid_kinds:
+            return Response(
+                {'error': f'type must be one of: {", ".join(sorted(valid_kinds))}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            page = max(1, int(request.query_params.get('page', 1)))
+            page_size = max(1, min(int(request.query_params.get('page_size', self.page_size)),
+                                   self.max_page_size))
+        except ValueError:
+            return Response(
+                {'error': 'page and page_size must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if page > self.max_page:
+            return Response(
+                {'error': f'Only the first {self.max_page} pages of results are available'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        project_ids = accessible_project_ids(request.user)
+        project_id = request.query_params.get('project')
+        if project_id:
+            if not project_id.isdigit() or int(project_id) not in project_ids:
+                return Response(
+                    {'error': 'Project not found or access denied'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            project_ids = {int(project_id)}
+        
+        hits = search(text, project_ids, kinds, limit=page_size + 1, offset=(page - 1) * page_size)
+        has_more = len(hits) > page_size
+        hits = hits[:page_size]
+        
+        project_names = dict(
+            Project.objects.filter(id__in={hit.project_id for hit in hits}).values_list('id', 'name')
+        )
+        url = request.build_absolute_uri()
+        return Response({
+            'query': text,
+            'page': page,
+            'next': replace_query_param(url, 'page', page + 1) if has_more and page < self.max_page else None,
+            'previous': (
+                None if page == 1 else
+                remove_query_param(url, 'page') if page == 2 else
+                replace_query_param(url, 'page', page - 1)
+            ),
+            'results': [
+                {
+                    'type': hit.kind,
+                    'id': hit.object_id,
+                    'project_id': hit.project_id,
+                    'project_name': project_names.get(hit.project_id, ''),
+                    'task_id': hit.task_id,
+                    'title': hit.title,
+                    'snippet': hit.snippet,
+                    'rank': hit.rank,
+                    'updated_at': hit.updated_at,
+                }
+                for hit in hits
+            ],
+        })
@@ -113,6 +113,7 @@ class WebhookDelivery(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['webhook', 'status']),
+            models.Index(fields=['webhook', '-created_at', '-id']),
             models.Index(fields=['created_at']),
             models.Index(fields=['event_type']),
         ]
@@ -146,6 +146,34 @@ def trigger_webhook_event(event_type, payload, user_id=None):
     }
 
 
+@shared_task
+def trigger_webhook_events(events):
+    """
+    Trigger webhooks for a batch of events with one webhook lookup
+    
+    Args:
+        events: List of (event_type, payload, user_id) tuples
+    """
+    from .models import Webhook
+    
+    user_ids = {user_id for _, _, user_id in events}
+    webhooks_by_user = {}
+    for webhook in Webhook.objects.filter(is_active=True, user_id__in=user_ids):
+        webhooks_by_user.setdefault(webhook.user_id, []).append(webhook)
+    
+    triggered_count = 0
+    for event_type, payload, user_id in events:
+        for webhook in webhooks_by_user.get(user_id, []):
+            if '*' in webhook.events or event_type in webhook.events:
+                deliver_webhook.delay(str(webhook.id), event_type, payload)
+                triggered_count += 1
+    
+    return {
+        'events': len(events),
+        'triggered_webhooks': triggered_count
+    }
+
+
 @shared_task
 def cleanup_expired_webhooks():
     """
@@ -1,7 +1,7 @@
 """
 Utility functions for triggering webhooks
 """
-from .tasks import trigger_webhook_event
+from .tasks import trigger_webhook_event, trigger_webhook_events
 
 
 def trigger_project_webhook(event_type, project, user=None):
@@ -37,15 +37,8 @@ def trigger_project_webhook(event_type, project, user=None):
     )
 
 
-def trigger_task_webhook(event_type, task, user=None):
-    """
-    Trigger webhook for task events
-    
-    Args:
-        event_type: Type of event ('task.created', 'task.updated', etc.)
-        task: Task instance
-        user: Optional user to limit webhooks
-    """
+def _task_payload(event_type, task):
+    """Webhook payload for a task event"""
     payload = {
         'event': event_type,
         'timestamp': task.updated_at.isoformat() if hasattr(task, 'updated_at') else None,
@@ -69,13 +62,42 @@ def trigger_task_webhook(event_type, task, user=None):
             'email': task.assigned_to.email
         }
     
+    return payload
+
+
+def trigger_task_webhook(event_type, task, user=None):
+    """
+    Trigger webhook for task events
+    
+    Args:
+        event_type: Type of event ('task.created', 'task.updated', etc.)
+        task: Task instance
+        user: Optional user to limit webhooks
+    """
     trigger_webhook_event.delay(
         event_type=event_type,
-        payload=payload,
+        payload=_task_payload(event_type, task),
         user_id=user.id if user else task.project.owner.id
     )
 
 
+def trigger_task_webhooks(event_type, tasks, user=None):
+    """
+    Trigger webhooks for the same event on many tasks with a single Celery message
+    
+    Args:
+        event_type: Type of event ('task.updated', 'task.completed', etc.)
+        tasks: Task instances (with project and owner loaded)
+        user: Optional user to limit webhooks
+    """
+    events = [
+        (event_type, _task_payload(event_type, task), user.id if user else task.project.owner_id)
+        for task in tasks
+    ]
+    if events:
+        trigger_webhook_events.delay(events)
+
+
 def trigger_member_webhook(event_type, user, project=None, data=None):
     """
     Trigger webhook for member events
@@ -6,6 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from SynergyOS.pagination import KeysetPagination
 from .models import Webhook, WebhookDelivery, WebhookEvent
 from .serializers import (
     WebhookSerializer, WebhookCreateSerializer,
@@ -157,6 +158,7 @@ class WebhookDeliveryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = WebhookDeliverySerializer
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Return deliveries for current user's webhooks only"""